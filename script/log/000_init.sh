@@ -151,7 +151,9 @@ fi
 
 export maxBlocksPerRequest=4096  # RPC rejects larger eth_getLogs windows during full rebuilds
 export maxRetries=5
-export maxConcurrentJobs=10  # Reduced concurrency to avoid RPC rate limiting
+# Concurrency ceilings: the processors adapt the live limit below these to RPC latency and errors
+export maxConcurrentJobs=10
+export maxBlockConcurrency=20
 
 # Script directory for Python processor
 export PYTHON_PROCESSOR="$LOG_SCRIPT_DIR/event_processor.py"
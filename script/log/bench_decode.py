@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Decode micro-benchmark for event_processor.
+
+Times decoding of recorded eth_getLogs results twice: with the static-word fast path,
+and with every data section forced through eth_abi. Both passes must produce the same
+rows. The data-section figures isolate the part the fast path changes; end-to-end
+figures also include topic decoding, address checksumming and the rows' JSON payloads.
+
+Record logs of the configured contracts from a node first:
+    python bench_decode.py --config contracts.json --logs logs.json --record --rpc URL -f 0 -t 100000
+Then benchmark them:
+    python bench_decode.py --config contracts.json --logs logs.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+from event_processor import (
+    EventDecoder,
+    RangeSizer,
+    build_event_def_map,
+    decode_raw_logs,
+    fetch_logs_with_split,
+    log,
+    to_checksum_address,
+)
+from rpc_client import RpcPool, parse_rpc_urls
+
+
+async def record_logs(rpc_url: str, addresses: list[str], from_block: int, to_block: int) -> list[dict]:
+    async with RpcPool(parse_rpc_urls(rpc_url), timeout=httpx.Timeout(30.0, connect=10.0)) as rpc:
+        return await fetch_logs_with_split(rpc, addresses, from_block, to_block, 0, sizer=RangeSizer(4000))
+
+
+def best_of(repeat: int, fn, *args):
+    """Best-of-repeat seconds for fn(*args), and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def decode_data_sections(items: list[tuple[EventDecoder, str]]) -> list[list]:
+    return [decoder.decode_data(data) for decoder, data in items]
+
+
+def report(label: str, count: int, fast: float, slow: float):
+    log(f"{label}: fast path {count / fast:,.0f} logs/s, eth_abi {count / slow:,.0f} logs/s, speedup {slow / fast:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event decoding on recorded logs")
+    parser.add_argument("--config", required=True, help="Contracts JSON config (same as event_processor)")
+    parser.add_argument("--logs", required=True, help="JSON file of raw eth_getLogs results")
+    parser.add_argument("--record", action="store_true", help="Fetch logs from --rpc into --logs instead of benchmarking")
+    parser.add_argument("--rpc", "-r", help="RPC URL for --record")
+    parser.add_argument("--from-block", "-f", type=int, default=0, help="First block to record")
+    parser.add_argument("--to-block", "-t", type=int, help="Last block to record")
+    parser.add_argument("--repeat", type=int, default=3, help="Decode passes per mode (best is reported)")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        addr_map = build_event_def_map(json.load(f), 0)
+
+    if args.record:
+        if not args.rpc or args.to_block is None:
+            parser.error("--record needs --rpc and --to-block")
+        raw_logs = asyncio.run(record_logs(args.rpc, list(addr_map), args.from_block, args.to_block))
+        with open(args.logs, "w") as f:
+            json.dump(raw_logs, f)
+        log(f"💾 Recorded {len(raw_logs):,} logs to {args.logs}")
+        return
+
+    with open(args.logs) as f:
+        raw_logs = json.load(f)
+    decoders: list[EventDecoder] = [ed.decoder for defs in addr_map.values() for ed in defs.values()]
+    static = sum(1 for d in decoders if d.static_words is not None)
+    log(f"📖 {len(raw_logs):,} logs, {static}/{len(decoders)} events on the static fast path")
+
+    items = []
+    for raw_log in raw_logs:
+        topics = raw_log.get("topics") or []
+        event_def = addr_map.get(to_checksum_address(raw_log.get("address", "")), {}).get(topics[0] if topics else None)
+        if event_def is not None:
+            items.append((event_def.decoder, raw_log.get("data", "0x")))
+
+    def run_all() -> tuple[float, list, float, list[dict]]:
+        data_time, data_values = best_of(args.repeat, decode_data_sections, items)
+        full_time, (rows, _) = best_of(args.repeat, decode_raw_logs, raw_logs, addr_map, 0, 0)
+        return data_time, data_values, full_time, rows
+
+    fast = run_all()
+    saved = [(d, d.static_words) for d in decoders]
+    for d in decoders:
+        d.static_words = None
+    try:
+        slow = run_all()
+    finally:
+        for d, static_words in saved:
+            d.static_words = static_words
+
+    if fast[1] != slow[1] or fast[3] != slow[3]:
+        log("❌ Fast path and eth_abi results differ")
+        sys.exit(1)
+    report("📈 Data sections", len(items), fast[0], slow[0])
+    report("📈 End to end", len(raw_logs), fast[2], slow[2])
+
+
+if __name__ == "__main__":
+    main()
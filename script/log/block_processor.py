@@ -18,6 +18,10 @@ from pathlib import Path
 
 import httpx
 
+from database import writer
+from event_processor import EventRecord, insert_events, migrate_schema
+from rpc_client import RpcPool, parse_rpc_urls, read_json, retry_delay
+
 _log_lock = threading.Lock()
 
 
@@ -26,80 +30,70 @@ def log(msg: str):
         print(msg, file=sys.stderr, flush=True)
 
 
-def connect_db(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, timeout=30.0)
-    conn.execute("PRAGMA busy_timeout = 30000")
-    return conn
-
-
 def init_db(db_path: str):
-    """Ensure blocks table exists by running init SQL."""
-    conn = connect_db(db_path)
-    script_dir = Path(__file__).resolve().parent
-    sql_init_dir = script_dir / 'sql' / 'init'
-    if sql_init_dir.exists() and sql_init_dir.is_dir():
-        for f in sorted(sql_init_dir.glob('*.sql')):
-            try:
-                with open(f, 'r', encoding='utf-8') as sql_file:
-                    conn.executescript(sql_file.read())
-                log(f"   Init: {f.name}")
-            except Exception as e:
-                conn.rollback()
-                conn.close()
-                raise RuntimeError(f"error executing {f.name}: {e}") from e
-    conn.commit()
-    conn.close()
+    """Migrate an existing schema, then ensure blocks table exists by running init SQL."""
+    with writer(db_path) as conn:
+        try:
+            migrate_schema(conn)
+        except Exception as e:
+            raise RuntimeError(f"error migrating schema: {e}") from e
+
+        script_dir = Path(__file__).resolve().parent
+        sql_init_dir = script_dir / 'sql' / 'init'
+        if sql_init_dir.exists() and sql_init_dir.is_dir():
+            for f in sorted(sql_init_dir.glob('*.sql')):
+                try:
+                    with open(f, 'r', encoding='utf-8') as sql_file:
+                        conn.executescript(sql_file.read())
+                    log(f"   Init: {f.name}")
+                except Exception as e:
+                    raise RuntimeError(f"error executing {f.name}: {e}") from e
+        conn.commit()
 
 
 def get_last_block_in_db(db_path: str) -> int | None:
     """Return MAX(block_number) from blocks, or None if empty."""
-    conn = connect_db(db_path)
-    try:
-        c = conn.execute("SELECT MAX(block_number) FROM blocks")
-        row = c.fetchone()
-        conn.close()
-        return row[0] if row and row[0] is not None else None
-    except sqlite3.OperationalError:
-        conn.close()
-        return None
+    with writer(db_path) as conn:
+        try:
+            c = conn.execute("SELECT MAX(block_number) FROM blocks")
+            row = c.fetchone()
+            return row[0] if row and row[0] is not None else None
+        except sqlite3.OperationalError:
+            return None
 
 
 def get_last_transaction_block(db_path: str) -> int | None:
     """Return MAX(block_number) from transactions, or None if empty."""
-    conn = connect_db(db_path)
-    try:
-        c = conn.execute("SELECT MAX(block_number) FROM transactions")
-        row = c.fetchone()
-        conn.close()
-        return row[0] if row and row[0] is not None else None
-    except sqlite3.OperationalError:
-        conn.close()
-        return None
+    with writer(db_path) as conn:
+        try:
+            c = conn.execute("SELECT MAX(block_number) FROM transactions")
+            row = c.fetchone()
+            return row[0] if row and row[0] is not None else None
+        except sqlite3.OperationalError:
+            return None
 
 
 def get_gap_block_rows(db_path: str) -> list[tuple[int, int]]:
     """Return (block_number, missing_tx_rows) for blocks whose tx rows are fewer than block.tx_count."""
-    conn = connect_db(db_path)
-    try:
-        c = conn.execute(
-            """SELECT b.block_number, (b.tx_count - COALESCE(t.tx_rows, 0)) AS missing_rows
-               FROM blocks b
-               LEFT JOIN (
-                   SELECT block_number, COUNT(*) AS tx_rows
-                   FROM transactions
-                   GROUP BY block_number
-               ) t ON t.block_number = b.block_number
-               WHERE b.tx_count > 0
-                 AND COALESCE(t.tx_rows, 0) < b.tx_count
-               ORDER BY b.block_number
-               LIMIT 10000"""
-        )
-        rows = c.fetchall()
-        conn.close()
-        return [(r[0], r[1]) for r in rows]
-    except sqlite3.OperationalError:
-        conn.close()
-        return []
+    with writer(db_path) as conn:
+        try:
+            c = conn.execute(
+                """SELECT b.block_number, (b.tx_count - COALESCE(t.tx_rows, 0)) AS missing_rows
+                   FROM blocks b
+                   LEFT JOIN (
+                       SELECT block_number, COUNT(*) AS tx_rows
+                       FROM transactions
+                       GROUP BY block_number
+                   ) t ON t.block_number = b.block_number
+                   WHERE b.tx_count > 0
+                     AND COALESCE(t.tx_rows, 0) < b.tx_count
+                   ORDER BY b.block_number
+                   LIMIT 10000"""
+            )
+            rows = c.fetchall()
+            return [(r[0], r[1]) for r in rows]
+        except sqlite3.OperationalError:
+            return []
 
 
 def get_gap_blocks(db_path: str) -> list[int]:
@@ -112,8 +106,7 @@ def get_block_numbers_for_tx_hashes(db_path: str, tx_hashes: list[str]) -> set[i
     if not tx_hashes:
         return set()
 
-    conn = connect_db(db_path)
-    try:
+    with writer(db_path) as conn:
         block_numbers: set[int] = set()
         chunk_size = 500
         for i in range(0, len(tx_hashes), chunk_size):
@@ -125,13 +118,10 @@ def get_block_numbers_for_tx_hashes(db_path: str, tx_hashes: list[str]) -> set[i
             ).fetchall()
             block_numbers.update(int(r[0]) for r in rows if r and r[0] is not None)
         return block_numbers
-    finally:
-        conn.close()
 
 
 async def fetch_blocks_batch(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     block_numbers: list[int],
     max_retries: int = 5,
 ) -> list[dict | None]:
@@ -142,8 +132,8 @@ async def fetch_blocks_batch(
     ]
     for attempt in range(max_retries):
         try:
-            resp = await client.post(rpc_url, json=payload, timeout=60.0)
-            data = resp.json()
+            resp = await rpc.post(payload, timeout=60.0)
+            data = await read_json(resp)
             if isinstance(data, dict) and "error" in data:
                 raise RuntimeError(data["error"].get("message", str(data["error"])))
             if not isinstance(data, list):
@@ -165,12 +155,12 @@ async def fetch_blocks_batch(
             return result
         except httpx.TimeoutException:
             if attempt < max_retries - 1:
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(retry_delay(attempt))
                 continue
             raise
         except Exception as e:
             if attempt < max_retries - 1:
-                await asyncio.sleep(0.2)
+                await asyncio.sleep(retry_delay(attempt, e))
                 continue
             raise
 
@@ -185,8 +175,7 @@ def hex_to_int(h: str | None) -> int | None:
 
 
 async def fetch_receipts_batch(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     tx_hashes: list[str],
     max_retries: int = 5,
 ) -> dict[str, dict | None]:
@@ -201,8 +190,8 @@ async def fetch_receipts_batch(
 
     for attempt in range(max_retries):
         try:
-            resp = await client.post(rpc_url, json=payload, timeout=60.0)
-            data = resp.json()
+            resp = await rpc.post(payload, timeout=60.0)
+            data = await read_json(resp)
             if isinstance(data, dict) and "error" in data:
                 raise RuntimeError(data["error"].get("message", str(data["error"])))
             if not isinstance(data, list):
@@ -224,12 +213,12 @@ async def fetch_receipts_batch(
             return result
         except httpx.TimeoutException:
             if attempt < max_retries - 1:
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(retry_delay(attempt))
                 continue
             raise
         except Exception as e:
             if attempt < max_retries - 1:
-                await asyncio.sleep(0.2)
+                await asyncio.sleep(retry_delay(attempt, e))
                 continue
             raise
 
@@ -237,8 +226,7 @@ async def fetch_receipts_batch(
 
 
 async def fetch_receipts_chunked(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     tx_hashes: list[str],
     max_retries: int = 5,
     chunk_size: int = 100,
@@ -250,7 +238,7 @@ async def fetch_receipts_chunked(
     receipts: dict[str, dict | None] = {}
     for i in range(0, len(tx_hashes), chunk_size):
         chunk = tx_hashes[i : i + chunk_size]
-        receipts.update(await fetch_receipts_batch(client, rpc_url, chunk, max_retries))
+        receipts.update(await fetch_receipts_batch(rpc, chunk, max_retries))
     return receipts
 
 
@@ -387,174 +375,184 @@ def save_blocks(
     receipts: dict[str, dict | None] | None = None,
 ) -> int:
     """Insert or replace blocks. Returns inserted count."""
-    conn = connect_db(db_path)
-    c = conn.cursor()
-    inserted = 0
-    for b in blocks:
-        if not b:
-            continue
-        num = hex_to_int(b.get("number"))
-        if num is None:
-            continue
-        ts = hex_to_int(b.get("timestamp"))
-        if ts is None:
-            ts = 0
-        tx_count = get_canonical_tx_count(b, receipts)
-        try:
-            c.execute(
-                """INSERT OR REPLACE INTO blocks
-                   (block_number, block_hash, parent_hash, timestamp, gas_limit, gas_used,
-                    base_fee_per_gas, difficulty, total_difficulty, size, nonce, mix_hash,
-                    state_root, transactions_root, receipts_root, miner, extra_data,
-                    sha3_uncles, tx_count, created_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    num,
-                    b.get("hash"),
-                    b.get("parentHash"),
-                    ts,
-                    hex_to_int(b.get("gasLimit")),
-                    hex_to_int(b.get("gasUsed")),
-                    hex_to_int(b.get("baseFeePerGas")),
-                    b.get("difficulty"),
-                    b.get("totalDifficulty"),
-                    hex_to_int(b.get("size")),
-                    b.get("nonce"),
-                    b.get("mixHash"),
-                    b.get("stateRoot"),
-                    b.get("transactionsRoot"),
-                    b.get("receiptsRoot"),
-                    b.get("miner"),
-                    b.get("extraData"),
-                    b.get("sha3Uncles") or b.get("unclesHash"),
-                    tx_count,
-                    datetime.now().isoformat(),
-                ),
-            )
-            inserted += 1
-        except Exception as e:
-            conn.rollback()
-            conn.close()
-            raise RuntimeError(f"failed to insert block {num}: {e}") from e
-    conn.commit()
-    conn.close()
-    return inserted
-
-
-def save_transactions(db_path: str, blocks: list[dict], receipts: dict[str, dict | None] | None = None) -> int:
-    """Insert or refresh transactions from blocks (fullTx). Returns affected row count.
-
-    If receipts dict is provided (tx_hash -> receipt), also inserts status, gas_used, etc.
-    """
-    conn = connect_db(db_path)
-    c = conn.cursor()
-    inserted = 0
-    affected_block_numbers: set[int] = set()
-    ins = """INSERT INTO transactions
-        (block_number, block_hash, block_timestamp, tx_hash, tx_index, "from", "to",
-         value_wei, amount, gas, gas_price, max_fee_per_gas, max_priority_fee_per_gas,
-         type, chain_id, input, nonce, v, r, s, access_list,
-         gas_used, cumulative_gas_used, status, contract_address, effective_gas_price,
-         created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(tx_hash) DO UPDATE SET
-            block_number = excluded.block_number,
-            block_hash = excluded.block_hash,
-            block_timestamp = excluded.block_timestamp,
-            tx_index = excluded.tx_index,
-            "from" = excluded."from",
-            "to" = excluded."to",
-            value_wei = excluded.value_wei,
-            amount = excluded.amount,
-            gas = excluded.gas,
-            gas_price = excluded.gas_price,
-            max_fee_per_gas = excluded.max_fee_per_gas,
-            max_priority_fee_per_gas = excluded.max_priority_fee_per_gas,
-            type = excluded.type,
-            chain_id = excluded.chain_id,
-            input = excluded.input,
-            nonce = excluded.nonce,
-            v = excluded.v,
-            r = excluded.r,
-            s = excluded.s,
-            access_list = excluded.access_list,
-            gas_used = excluded.gas_used,
-            cumulative_gas_used = excluded.cumulative_gas_used,
-            status = excluded.status,
-            contract_address = excluded.contract_address,
-            effective_gas_price = excluded.effective_gas_price"""
-    for b in blocks:
-        if not b:
-            continue
-        num = hex_to_int(b.get("number"))
-        if num is None:
-            continue
-        bhash = b.get("hash")
-        ts = hex_to_int(b.get("timestamp"))
-        txs = b.get("transactions") or []
-        if not isinstance(txs, list):
-            continue
-        for tx in txs:
-            tx_hash = tx.get("hash")
-            receipt = receipts.get(tx_hash) if receipts else None
-            row = _parse_tx(tx, num, bhash, ts, receipt)
-            if not row:
+    with writer(db_path) as conn:
+        c = conn.cursor()
+        inserted = 0
+        for b in blocks:
+            if not b:
+                continue
+            num = hex_to_int(b.get("number"))
+            if num is None:
                 continue
+            ts = hex_to_int(b.get("timestamp"))
+            if ts is None:
+                ts = 0
+            tx_count = get_canonical_tx_count(b, receipts)
             try:
                 c.execute(
-                    ins,
+                    """INSERT OR REPLACE INTO blocks
+                       (block_number, block_hash, parent_hash, timestamp, gas_limit, gas_used,
+                        base_fee_per_gas, difficulty, total_difficulty, size, nonce, mix_hash,
+                        state_root, transactions_root, receipts_root, miner, extra_data,
+                        sha3_uncles, tx_count, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                     (
-                        row["block_number"],
-                        row["block_hash"],
-                        row["block_timestamp"],
-                        row["tx_hash"],
-                        row["tx_index"],
-                        row["from"],
-                        row["to"],
-                        row["value_wei"],
-                        row["amount"],
-                        row["gas"],
-                        row["gas_price"],
-                        row["max_fee_per_gas"],
-                        row["max_priority_fee_per_gas"],
-                        row["type"],
-                        row["chain_id"],
-                        row["input"],
-                        row["nonce"],
-                        row["v"],
-                        row["r"],
-                        row["s"],
-                        row["access_list"],
-                        row["gas_used"],
-                        row["cumulative_gas_used"],
-                        row["status"],
-                        row["contract_address"],
-                        row["effective_gas_price"],
+                        num,
+                        b.get("hash"),
+                        b.get("parentHash"),
+                        ts,
+                        hex_to_int(b.get("gasLimit")),
+                        hex_to_int(b.get("gasUsed")),
+                        hex_to_int(b.get("baseFeePerGas")),
+                        b.get("difficulty"),
+                        b.get("totalDifficulty"),
+                        hex_to_int(b.get("size")),
+                        b.get("nonce"),
+                        b.get("mixHash"),
+                        b.get("stateRoot"),
+                        b.get("transactionsRoot"),
+                        b.get("receiptsRoot"),
+                        b.get("miner"),
+                        b.get("extraData"),
+                        b.get("sha3Uncles") or b.get("unclesHash"),
+                        tx_count,
                         datetime.now().isoformat(),
                     ),
                 )
-                if c.rowcount > 0:
-                    inserted += c.rowcount
-                affected_block_numbers.add(row["block_number"])
+                inserted += 1
             except Exception as e:
-                conn.rollback()
-                conn.close()
-                raise RuntimeError(f"failed to insert tx {row.get('tx_hash')}: {e}") from e
-    refresh_transaction_block_context(conn, affected_block_numbers)
-    conn.commit()
-    conn.close()
-    return inserted
+                raise RuntimeError(f"failed to insert block {num}: {e}") from e
+        conn.commit()
+        return inserted
+
+
+def save_transactions(db_path: str, blocks: list[dict], receipts: dict[str, dict | None] | None = None) -> int:
+    """Insert or refresh transactions from blocks (fullTx). Returns affected row count.
+
+    If receipts dict is provided (tx_hash -> receipt), also inserts status, gas_used, etc.
+    """
+    with writer(db_path) as conn:
+        c = conn.cursor()
+        inserted = 0
+        affected_block_numbers: set[int] = set()
+        ins = """INSERT INTO transactions
+            (block_number, block_hash, block_timestamp, tx_hash, tx_index, "from", "to",
+             value_wei, amount, gas, gas_price, max_fee_per_gas, max_priority_fee_per_gas,
+             type, chain_id, input, nonce, v, r, s, access_list,
+             gas_used, cumulative_gas_used, status, contract_address, effective_gas_price,
+             created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(tx_hash) DO UPDATE SET
+                block_number = excluded.block_number,
+                block_hash = excluded.block_hash,
+                block_timestamp = excluded.block_timestamp,
+                tx_index = excluded.tx_index,
+                "from" = excluded."from",
+                "to" = excluded."to",
+                value_wei = excluded.value_wei,
+                amount = excluded.amount,
+                gas = excluded.gas,
+                gas_price = excluded.gas_price,
+                max_fee_per_gas = excluded.max_fee_per_gas,
+                max_priority_fee_per_gas = excluded.max_priority_fee_per_gas,
+                type = excluded.type,
+                chain_id = excluded.chain_id,
+                input = excluded.input,
+                nonce = excluded.nonce,
+                v = excluded.v,
+                r = excluded.r,
+                s = excluded.s,
+                access_list = excluded.access_list,
+                gas_used = excluded.gas_used,
+                cumulative_gas_used = excluded.cumulative_gas_used,
+                status = excluded.status,
+                contract_address = excluded.contract_address,
+                effective_gas_price = excluded.effective_gas_price"""
+        for b in blocks:
+            if not b:
+                continue
+            num = hex_to_int(b.get("number"))
+            if num is None:
+                continue
+            bhash = b.get("hash")
+            ts = hex_to_int(b.get("timestamp"))
+            txs = b.get("transactions") or []
+            if not isinstance(txs, list):
+                continue
+            for tx in txs:
+                tx_hash = tx.get("hash")
+                receipt = receipts.get(tx_hash) if receipts else None
+                row = _parse_tx(tx, num, bhash, ts, receipt)
+                if not row:
+                    continue
+                try:
+                    c.execute(
+                        ins,
+                        (
+                            row["block_number"],
+                            row["block_hash"],
+                            row["block_timestamp"],
+                            row["tx_hash"],
+                            row["tx_index"],
+                            row["from"],
+                            row["to"],
+                            row["value_wei"],
+                            row["amount"],
+                            row["gas"],
+                            row["gas_price"],
+                            row["max_fee_per_gas"],
+                            row["max_priority_fee_per_gas"],
+                            row["type"],
+                            row["chain_id"],
+                            row["input"],
+                            row["nonce"],
+                            row["v"],
+                            row["r"],
+                            row["s"],
+                            row["access_list"],
+                            row["gas_used"],
+                            row["cumulative_gas_used"],
+                            row["status"],
+                            row["contract_address"],
+                            row["effective_gas_price"],
+                            datetime.now().isoformat(),
+                        ),
+                    )
+                    if c.rowcount > 0:
+                        inserted += c.rowcount
+                    affected_block_numbers.add(row["block_number"])
+                except Exception as e:
+                    raise RuntimeError(f"failed to insert tx {row.get('tx_hash')}: {e}") from e
+        refresh_transaction_block_context(conn, affected_block_numbers)
+        conn.commit()
+        return inserted
+
+
+def load_configured_addresses(db_path: str) -> set[str]:
+    """Lowercase addresses of contracts.json (v_contract view written by event_processor)."""
+    with writer(db_path) as conn:
+        try:
+            return {row[0].lower() for row in conn.execute("SELECT address FROM v_contract") if row[0]}
+        except sqlite3.OperationalError:
+            return set()
+
+
+def save_receipt_events(db_path: str, decoded_events: list[EventRecord]) -> int:
+    """Insert receipt logs decoded by the topic index into receipt_events. Returns inserted count."""
+    with writer(db_path) as conn:
+        inserted = insert_events(conn, decoded_events, table="receipt_events")
+        conn.commit()
+        return inserted
 
 
 def update_transaction_sync(db_path: str, last_block: int):
     """Update transaction_sync with last processed block."""
-    conn = connect_db(db_path)
-    conn.execute(
-        "INSERT OR REPLACE INTO transaction_sync (id, last_block, updated_at) VALUES (1, ?, ?)",
-        (last_block, datetime.now().isoformat()),
-    )
-    conn.commit()
-    conn.close()
+    with writer(db_path) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO transaction_sync (id, last_block, updated_at) VALUES (1, ?, ?)",
+            (last_block, datetime.now().isoformat()),
+        )
+        conn.commit()
 
 
 async def run(
@@ -566,6 +564,9 @@ async def run(
     max_concurrent: int = 5,
     max_retries: int = 5,
     skip_gap_fill: bool = False,
+    hedge: bool = False,
+    rps: float = 0.0,
+    receipt_events: bool = False,
 ) -> bool:
     log("")
     log("━" * 50)
@@ -598,12 +599,31 @@ async def run(
     )
     total = to_block_eff - from_block + 1 if need_main_sync else 0
 
-    limits = httpx.Limits(max_connections=max_concurrent + 20, max_keepalive_connections=50)
-    timeout = httpx.Timeout(60.0, connect=10.0)
     total_blocks = 0
     total_txs = 0
+    total_receipt_events = 0
+    undecoded_receipt_logs = 0
+
+    topic_index = None
+    configured_addresses: set[str] = set()
+    if receipt_events and need_main_sync:
+        from topic_index import INDEX_FILE_NAME, decode_receipt_logs, load_topic_index
+
+        topic_index = load_topic_index(os.path.join(os.path.dirname(db_path) or ".", INDEX_FILE_NAME))
+        configured_addresses = load_configured_addresses(db_path)
+        log(
+            f"📚 Decoding receipt logs of unconfigured emitters with {len(topic_index):,} known topics "
+            f"({len(configured_addresses)} configured contracts skipped)"
+        )
 
-    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+    async with RpcPool(
+        parse_rpc_urls(rpc_url),
+        max_connections=max_concurrent + 20,
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        hedge=hedge,
+        rps=rps,
+        concurrency=max_concurrent,
+    ) as rpc:
         if need_main_sync:
             log(f"📦 Fetching blocks {from_block} → {to_block_eff} ({total:,} blocks)")
             ranges = []
@@ -613,14 +633,17 @@ async def run(
                 ranges.append((cur, end))
                 cur = end + 1
             write_lock = asyncio.Lock()
-            sem = asyncio.Semaphore(max_concurrent)
+            # Requests are paced by the pool's adaptive limit; this only bounds ranges held in memory
+            ranges_in_flight = asyncio.Semaphore(max_concurrent * 2)
 
             async def fetch_and_save(lo: int, hi: int) -> tuple[int, int]:
-                async with sem:
+                nonlocal total_receipt_events, undecoded_receipt_logs
+                async with ranges_in_flight:
                     nums = list(range(lo, hi + 1))
-                    results = await fetch_blocks_batch(client, rpc_url, nums, max_retries)
+                    results = await fetch_blocks_batch(rpc, nums, max_retries)
                     blocks = [r for r in results if r is not None]
-                if blocks:
+                    if not blocks:
+                        return 0, 0
                     # Collect all tx hashes for receipt fetching
                     all_tx_hashes = []
                     for b in blocks:
@@ -630,13 +653,18 @@ async def run(
                                 all_tx_hashes.append(tx["hash"])
 
                     # Fetch receipts in batch
-                    receipts = await fetch_receipts_chunked(client, rpc_url, all_tx_hashes, max_retries)
-
-                    async with write_lock:
-                        blk_count = save_blocks(db_path, blocks, receipts)
-                        tx_count = save_transactions(db_path, blocks, receipts)
-                        return blk_count, tx_count
-                return 0, 0
+                    receipts = await fetch_receipts_chunked(rpc, all_tx_hashes, max_retries)
+                    decoded_logs: list[EventRecord] = []
+                    if topic_index is not None:
+                        decoded_logs, undecoded = decode_receipt_logs(receipts, topic_index, configured_addresses)
+                        undecoded_receipt_logs += undecoded
+
+                async with write_lock:
+                    blk_count = save_blocks(db_path, blocks, receipts)
+                    tx_count = save_transactions(db_path, blocks, receipts)
+                    if decoded_logs:
+                        total_receipt_events += save_receipt_events(db_path, decoded_logs)
+                    return blk_count, tx_count
 
             start_time = datetime.now()
             tasks = [asyncio.create_task(fetch_and_save(lo, hi)) for lo, hi in ranges]
@@ -650,7 +678,10 @@ async def run(
                     if done % 100 == 0 or done == len(ranges):
                         elapsed = (datetime.now() - start_time).total_seconds()
                         rate = total_blocks / elapsed if elapsed > 0 else 0
-                        log(f"   Progress: {done}/{len(ranges)} ranges | {total_blocks:,} blocks | {total_txs:,} txs | {rate:.0f} blocks/s | {elapsed:.1f}s")
+                        log(
+                            f"   Progress: {done}/{len(ranges)} ranges | {total_blocks:,} blocks | {total_txs:,} txs | "
+                            f"{rate:.0f} blocks/s | {rpc.concurrency_status()} | {elapsed:.1f}s"
+                        )
             except Exception:
                 for task in tasks:
                     task.cancel()
@@ -661,19 +692,29 @@ async def run(
             log("")
             log("📊 Block processing complete")
             log(f"✅ Inserted {total_blocks:,} blocks, {total_txs:,} transactions in {elapsed:.2f}s")
+            if topic_index is not None:
+                log(
+                    f"📚 Inserted {total_receipt_events:,} receipt events "
+                    f"({undecoded_receipt_logs:,} logs with unknown topics skipped)"
+                )
         else:
             log("")
 
         if not skip_gap_fill:
-            await run_gap_fill(client, rpc_url, db_path, max_retries)
+            await run_gap_fill(rpc, db_path, max_retries)
+
+        if len(rpc.endpoints) > 1:
+            for line in rpc.summary().splitlines():
+                log(f"🌐 {line}")
+        elif rpc.limiter is not None:
+            log(f"🚦 {rpc.concurrency_status().capitalize()} ({rpc.limiter.drops} overload backoffs)")
 
     log(f"📁 DB: {db_path}")
     return True
 
 
 async def run_gap_fill(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     db_path: str,
     max_retries: int = 5,
 ) -> int:
@@ -715,7 +756,7 @@ async def run_gap_fill(
             while pending_blocks:
                 frontier = sorted(pending_blocks)
                 pending_blocks = set()
-                results = await fetch_blocks_batch(client, rpc_url, frontier, max_retries)
+                results = await fetch_blocks_batch(rpc, frontier, max_retries)
                 blocks = [r for r in results if r is not None]
                 if not blocks:
                     continue
@@ -747,7 +788,7 @@ async def run_gap_fill(
                             all_tx_hashes.append(tx["hash"])
 
                 # Fetch receipts in batch
-                receipts = await fetch_receipts_chunked(client, rpc_url, all_tx_hashes, max_retries)
+                receipts = await fetch_receipts_chunked(rpc, all_tx_hashes, max_retries)
 
                 save_blocks(db_path, blocks, receipts)
                 pass_txs += save_transactions(db_path, blocks, receipts)
@@ -762,14 +803,21 @@ async def run_gap_fill(
 
 def main():
     parser = argparse.ArgumentParser(description="LOVE20 Block Processor")
-    parser.add_argument("--rpc", "-r", required=True, help="RPC URL")
+    parser.add_argument("--rpc", "-r", required=True, help="RPC URL, or comma-separated URLs for the RPC pool")
     parser.add_argument("--to-block", "-t", type=int, required=True, help="Ending block number")
     parser.add_argument("--db-path", required=True, help="SQLite database path")
     parser.add_argument("--origin-blocks", type=int, default=0, help="Origin block (first block to consider)")
     parser.add_argument("--batch-size", type=int, default=500, help="Blocks per RPC batch request")
-    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent batch requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Ceiling for concurrent batch requests (adapted below it at runtime)")
     parser.add_argument("--retries", type=int, default=5, help="Max retries per batch")
     parser.add_argument("--skip-gap-fill", action="store_true", help="Skip filling gap blocks")
+    parser.add_argument("--hedge", action="store_true", help="Re-send requests slower than p95 to a second RPC endpoint")
+    parser.add_argument("--rps", type=float, default=0.0, help="Max requests per second per RPC endpoint (0 = unlimited)")
+    parser.add_argument(
+        "--receipt-events",
+        action="store_true",
+        help="Decode receipt logs of contracts missing from contracts.json into receipt_events, using every ABI under abi/",
+    )
     args = parser.parse_args()
 
     try:
@@ -783,6 +831,9 @@ def main():
                 max_concurrent=args.concurrency,
                 max_retries=args.retries,
                 skip_gap_fill=args.skip_gap_fill,
+                hedge=args.hedge,
+                rps=args.rps,
+                receipt_events=args.receipt_events,
             )
         )
     except Exception as e:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Rebuild the events table clustered by chain order.
+
+The default events table is a rowid table in insert order. Range scans by block_number or log_round
+go through a secondary index and then make one random rowid lookup per row. This tool rebuilds it
+as a WITHOUT ROWID table keyed by (block_number, log_index), so rows sit in chain order. Scans by
+block, and by log_round (which rises with block_number), then read consecutive pages.
+
+log_index is the block-level index eth_getLogs returns, so the key is unique per log. id becomes a
+generated column (block_number * 2^20 + log_index): still unique, and ascending in chain order.
+The processors, views and dashboards work unchanged on either layout; indexes and views are kept.
+
+Works on an existing database, or on a new path to start it in the clustered layout:
+    python cluster_events.py --db-path events.db
+"""
+
+import argparse
+import sqlite3
+import sys
+
+from database import table_key, writer
+from event_processor import init_db, log
+
+CLUSTERED_KEY = ("block_number", "log_index")
+ID_EXPRESSION = "block_number * 1048576 + log_index"
+
+
+def is_clustered(conn: sqlite3.Connection) -> bool:
+    return table_key(conn, "events") == CLUSTERED_KEY
+
+
+def clustered_table_sql(conn: sqlite3.Connection, name: str) -> str:
+    """CREATE TABLE for name with the columns of events, keyed by CLUSTERED_KEY."""
+    defs = []
+    for _, column, decl, notnull, default, _, _ in conn.execute("PRAGMA table_xinfo(events)"):
+        if column == "id":
+            defs.append(f"id INTEGER GENERATED ALWAYS AS ({ID_EXPRESSION}) VIRTUAL")
+            continue
+        default = f" DEFAULT ({default})" if default is not None else ""
+        defs.append(f"{column} {decl}{' NOT NULL' if notnull or column in CLUSTERED_KEY else ''}{default}")
+    defs.append(f"PRIMARY KEY ({', '.join(CLUSTERED_KEY)})")
+    return f"CREATE TABLE {name} (\n    " + ",\n    ".join(defs) + "\n) WITHOUT ROWID"
+
+
+def check_clustered_key(conn: sqlite3.Connection):
+    """Raise if existing rows would collide (or lack a value) under CLUSTERED_KEY."""
+    missing = conn.execute("SELECT COUNT(*) FROM events WHERE log_index IS NULL").fetchone()[0]
+    if missing:
+        raise RuntimeError(f"{missing:,} events rows have no log_index")
+    duplicate = conn.execute(
+        f"""SELECT block_number, log_index, COUNT(*) FROM events
+            GROUP BY {', '.join(CLUSTERED_KEY)} HAVING COUNT(*) > 1 LIMIT 1"""
+    ).fetchone()
+    if duplicate:
+        raise RuntimeError(
+            f"block {duplicate[0]} has {duplicate[2]} events with log_index {duplicate[1]}; "
+            "log indexes are not block-level, so the clustered key would drop rows"
+        )
+
+
+def cluster_events(db_path: str) -> int:
+    """Rebuild events in the clustered layout in one transaction. Returns the number of rows moved."""
+    init_db(db_path)
+    with writer(db_path) as conn:
+        if is_clustered(conn):
+            log("   events is already clustered")
+            return 0
+        check_clustered_key(conn)
+        # Views are re-parsed by the rename below, and events' indexes go with the old table
+        saved = conn.execute(
+            """SELECT type, name, sql FROM sqlite_master
+               WHERE sql IS NOT NULL AND (type = 'view' OR (type IN ('index', 'trigger') AND tbl_name = 'events'))
+               ORDER BY rowid"""
+        ).fetchall()
+        columns = ", ".join(row[1] for row in conn.execute("PRAGMA table_info(events)") if row[1] != "id")
+
+        conn.execute("BEGIN")
+        for kind, name, _ in saved:
+            if kind == "view":
+                conn.execute(f'DROP VIEW "{name}"')
+        conn.execute(clustered_table_sql(conn, "events_clustered"))
+        moved = conn.execute(
+            f"INSERT INTO events_clustered ({columns}) SELECT {columns} FROM events ORDER BY {', '.join(CLUSTERED_KEY)}"
+        ).rowcount
+        conn.execute("DROP TABLE events")
+        conn.execute("ALTER TABLE events_clustered RENAME TO events")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'events'")
+        for _, _, sql in saved:
+            conn.execute(sql)
+        conn.commit()
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the events table clustered by (block_number, log_index)")
+    parser.add_argument("--db-path", required=True, help="Path to SQLite db (created if missing)")
+    args = parser.parse_args()
+
+    log(f"🧱 Clustering events of {args.db_path} by {', '.join(CLUSTERED_KEY)}")
+    try:
+        moved = cluster_events(args.db_path)
+    except (RuntimeError, sqlite3.Error) as e:
+        log(f"❌ {e}")
+        sys.exit(1)
+    log(f"✅ Moved {moved:,} events; run VACUUM to return the old table's pages to the filesystem")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Write a compact copy of an events.db for read-side consumers (dashboards, exports).
+
+In the copy:
+- every address of events, receipt_events and transactions is stored once in addresses(id, addr)
+  and referenced by an integer <column>_id;
+- tx and block hashes are 32-byte BLOBs;
+- views named events, receipt_events and transactions render the original hex columns from the
+  compact_* tables, so the v_* views and dashboard SQL run unchanged on the copy. The views also
+  return each hash as <column>_blob.
+
+Addresses keep their stored text (checksummed or lowercase), so the views return what the source
+tables held. Filters on an address column of the views still use an index (through
+addresses.addr). A filter or join on a hex hash column of the views compares rendered text and
+cannot use an index; filter and join on <column>_blob (e.g. x'ab..' literals) to reach the
+compact_* indexes.
+
+Limits: this is an offline copy, not a schema the processors write. decoded_data is copied as
+is, since the views json_extract it, and it is most of an events row: the events table shrinks
+by about a third, not half (hash indexes about half). Every other table, index and view is
+copied verbatim.
+
+The processors keep writing the hex schema; rerun this to refresh the copy:
+    python compact_db.py --db-path events.db --output events.compact.db
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+from database import connect_db
+from event_processor import log
+
+# Hex columns replaced in the compact copy, per table
+ADDRESS_COLUMNS = {
+    "events": ("address", "account", "from_address", "to_address", "token_address"),
+    "receipt_events": ("address", "account", "from_address", "to_address", "token_address"),
+    "transactions": ("from", "to", "contract_address"),
+}
+HASH_COLUMNS = {
+    "events": ("tx_hash", "block_hash"),
+    "receipt_events": ("tx_hash", "block_hash"),
+    "transactions": ("tx_hash", "block_hash"),
+}
+
+COPY_BATCH_ROWS = 10000
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def hash_to_blob(value: str | None) -> bytes | None:
+    if not value:
+        return None
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+class AddressDictionary:
+    """addr -> id for the output's addresses table, inserting unseen addresses as they come (case kept)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.ids: dict[str, int] = {}
+
+    def id_of(self, value: str | None) -> int | None:
+        if value is None:
+            return None
+        address_id = self.ids.get(value)
+        if address_id is None:
+            address_id = self.ids[value] = len(self.ids) + 1
+            self.conn.execute("INSERT INTO addresses(id, addr) VALUES (?, ?)", (address_id, value))
+        return address_id
+
+
+class CompactTable:
+    """Column mapping of one compacted table: source columns -> compact_<table> columns and back."""
+
+    def __init__(self, table: str, columns: list[tuple]):
+        self.table = table
+        self.compact = f"compact_{table}"
+        self.columns = columns  # PRAGMA table_xinfo rows of the source table (generated columns copied as values)
+        self.addresses = set(ADDRESS_COLUMNS[table])
+        self.hashes = set(HASH_COLUMNS[table])
+
+    def compact_name(self, column: str) -> str:
+        return f"{column}_id" if column in self.addresses else column
+
+    def create_table_sql(self) -> str:
+        defs = []
+        single_pk = sum(1 for column in self.columns if column[5]) == 1
+        for _, name, decl, notnull, _, pk, _ in self.columns:
+            if pk and single_pk:
+                defs.append(f"{quote(name)} INTEGER PRIMARY KEY")
+                continue
+            if name in self.addresses:
+                decl = "INTEGER"
+            elif name in self.hashes:
+                decl = "BLOB"
+            defs.append(f"{quote(self.compact_name(name))} {decl}{' NOT NULL' if notnull else ''}")
+        return f"CREATE TABLE {quote(self.compact)} (\n    " + ",\n    ".join(defs) + "\n)"
+
+    def create_view_sql(self) -> str:
+        selects, joins = [], []
+        for _, name, *_ in self.columns:
+            column = f"c.{quote(self.compact_name(name))}"
+            if name in self.addresses:
+                alias = f"a{len(joins)}"
+                joins.append(f"LEFT JOIN addresses {alias} ON {alias}.id = {column}")
+                selects.append(f"{alias}.addr AS {quote(name)}")
+            elif name in self.hashes:
+                selects.append(f"CASE WHEN {column} IS NOT NULL THEN '0x' || lower(hex({column})) END AS {quote(name)}")
+                selects.append(f"{column} AS {quote(name + '_blob')}")
+            else:
+                selects.append(f"{column} AS {quote(name)}")
+        return (
+            f"CREATE VIEW {quote(self.table)} AS\nSELECT\n    " + ",\n    ".join(selects)
+            + f"\nFROM {quote(self.compact)} c\n" + "\n".join(joins)
+        )
+
+    def convert_row(self, row: tuple, addresses: AddressDictionary) -> tuple:
+        out = []
+        for (_, name, *_), value in zip(self.columns, row):
+            if name in self.addresses:
+                value = addresses.id_of(value)
+            elif name in self.hashes:
+                value = hash_to_blob(value)
+            out.append(value)
+        return tuple(out)
+
+
+def copy_compact_table(conn: sqlite3.Connection, table: CompactTable, addresses: AddressDictionary) -> int:
+    source_columns = ", ".join(quote(name) for _, name, *_ in table.columns)
+    target_columns = ", ".join(quote(table.compact_name(name)) for _, name, *_ in table.columns)
+    insert_sql = (
+        f"INSERT INTO {quote(table.compact)} ({target_columns}) "
+        f"VALUES ({', '.join('?' for _ in table.columns)})"
+    )
+    # Table order: rowid, or chain order for a clustered events table
+    reader = conn.execute(f"SELECT {source_columns} FROM src.{quote(table.table)}")
+    copied = 0
+    while True:
+        rows = reader.fetchmany(COPY_BATCH_ROWS)
+        if not rows:
+            return copied
+        conn.executemany(insert_sql, [table.convert_row(row, addresses) for row in rows])
+        copied += len(rows)
+
+
+def copy_compact_indexes(conn: sqlite3.Connection, table: CompactTable):
+    """Recreate the source table's column indexes on compact_<table> (expression indexes are dropped)."""
+    for _, name, unique, origin, _ in conn.execute(f"PRAGMA src.index_list({quote(table.table)})").fetchall():
+        columns = [row[2] for row in conn.execute(f"PRAGMA src.index_info({quote(name)})")]
+        if not columns or None in columns:
+            continue
+        if origin != "c":
+            name = f"idx_{table.compact}_{'_'.join(columns)}"
+        conn.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {quote(name)} ON {quote(table.compact)} "
+            f"({', '.join(quote(table.compact_name(column)) for column in columns)})"
+        )
+
+
+def compact_database(db_path: str, output_path: str):
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(db_path)
+    if os.path.exists(output_path):
+        raise FileExistsError(f"{output_path} exists; remove it to rebuild the compact copy")
+
+    conn = connect_db(output_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS src", (db_path,))
+        schema = conn.execute(
+            "SELECT type, name, tbl_name, sql FROM src.sqlite_master WHERE sql IS NOT NULL ORDER BY rowid"
+        ).fetchall()
+        tables = {name for kind, name, _, _ in schema if kind == "table"}
+
+        conn.execute("BEGIN")
+        conn.execute("CREATE TABLE addresses (id INTEGER PRIMARY KEY, addr TEXT NOT NULL UNIQUE)")
+        addresses = AddressDictionary(conn)
+        compacted = set()
+        for name in ADDRESS_COLUMNS:
+            if name not in tables:
+                continue
+            table = CompactTable(name, conn.execute(f"PRAGMA src.table_xinfo({quote(name)})").fetchall())
+            conn.execute(table.create_table_sql())
+            log(f"   Compacted {copy_compact_table(conn, table, addresses):,} {name} rows")
+            copy_compact_indexes(conn, table)
+            conn.execute(table.create_view_sql())
+            compacted.add(name)
+
+        for kind, name, tbl_name, sql in schema:
+            if kind == "table" and name not in compacted and not name.startswith("sqlite_"):
+                conn.execute(sql)
+                conn.execute(f"INSERT INTO main.{quote(name)} SELECT * FROM src.{quote(name)}")
+        for kind, name, tbl_name, sql in schema:
+            if kind == "index" and tbl_name not in compacted:
+                conn.execute(sql)
+            elif kind == "view" and name not in compacted:
+                conn.execute(sql)
+        conn.commit()
+        log(f"   {len(addresses.ids):,} distinct addresses")
+        conn.execute("DETACH DATABASE src")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a compact copy of an events.db (address dictionary, BLOB hashes)")
+    parser.add_argument("--db-path", required=True, help="Path to the source SQLite db")
+    parser.add_argument("--output", required=True, help="Path of the compact db to create")
+    args = parser.parse_args()
+
+    log(f"🗜️  Compacting {args.db_path} → {args.output}")
+    try:
+        compact_database(args.db_path, args.output)
+    except (OSError, sqlite3.Error, ValueError) as e:
+        log(f"❌ {e}")
+        sys.exit(1)
+    before, after = os.path.getsize(args.db_path), os.path.getsize(args.output)
+    log(f"✅ {before / 2**20:,.1f} MiB → {after / 2**20:,.1f} MiB ({after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,21 @@
 import argparse
 import json
 import sqlite3
+import sys
 import threading
 from datetime import datetime, timezone
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from timeline_runtime import TIMELINE_INDEX_DEFINITIONS, load_contract_map, now_iso, query_activity_rows_by_account
+from timeline_runtime import (
+    OBSOLETE_TIMELINE_INDEXES,
+    PROMOTED_EVENT_COLUMNS,
+    TIMELINE_INDEX_DEFINITIONS,
+    load_contract_map,
+    now_iso,
+    query_activity_rows_by_account,
+)
 from tusdt_flow_runtime import (
     parse_tusdt_flow_mode,
     parse_tusdt_flow_recent_rounds,
@@ -45,6 +53,15 @@ def resolve_db_path(network: str | None = None, *, db_path: str | None = None) -
     return path
 
 
+def migrate_events_db(conn: sqlite3.Connection) -> None:
+    """Add and backfill the promoted events columns of an events.db written before they existed."""
+    if str(LOG_DIR) not in sys.path:
+        sys.path.append(str(LOG_DIR))
+    from event_processor import migrate_schema
+
+    migrate_schema(conn)
+
+
 def ensure_events_db_indexes(db_path: Path) -> None:
     resolved = db_path.expanduser().resolve()
     db_mtime = resolved.stat().st_mtime
@@ -55,6 +72,11 @@ def ensure_events_db_indexes(db_path: Path) -> None:
 
         conn = sqlite3.connect(resolved, timeout=60.0)
         try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+            if not columns.issuperset(PROMOTED_EVENT_COLUMNS):
+                migrate_events_db(conn)
+            for name in OBSOLETE_TIMELINE_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
             for _, sql in TIMELINE_INDEX_DEFINITIONS:
                 conn.execute(sql)
             conn.commit()
@@ -0,0 +1,46 @@
+import json
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import dashboard_server
+
+
+class EnsureEventsDbIndexesTest(unittest.TestCase):
+    def test_old_events_db_is_migrated_before_indexing(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "events.db"
+            conn = sqlite3.connect(db_path)
+            conn.executescript(
+                """
+                CREATE TABLE events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, block_number INTEGER, tx_hash TEXT, tx_index INTEGER,
+                    log_index INTEGER, contract_name TEXT, event_name TEXT, log_round INTEGER, round INTEGER,
+                    address TEXT, decoded_data TEXT, created_at TEXT
+                );
+                CREATE INDEX idx_events_event_account_expr ON events(event_name, lower(json_extract(decoded_data, '$.account')));
+                """
+            )
+            conn.execute(
+                "INSERT INTO events(tx_hash, log_index, event_name, decoded_data) VALUES ('0x1', 0, 'Join', ?)",
+                (json.dumps({"account": "0xAAA", "actionId": 3, "amount": 9}),),
+            )
+            conn.commit()
+            conn.close()
+
+            dashboard_server.ensure_events_db_indexes(db_path)
+
+            conn = sqlite3.connect(db_path)
+            try:
+                indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+                rows = conn.execute("SELECT account, action_id, amount_raw FROM events").fetchall()
+            finally:
+                conn.close()
+        self.assertEqual(rows, [("0xaaa", 3, "9")])
+        self.assertIn("idx_events_event_account", indexes)
+        self.assertNotIn("idx_events_event_account_expr", indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
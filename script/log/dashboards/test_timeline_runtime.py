@@ -60,7 +60,13 @@ def make_conn() -> sqlite3.Connection:
             round INTEGER,
             address TEXT,
             decoded_data TEXT,
-            created_at TEXT
+            created_at TEXT,
+            account TEXT,
+            from_address TEXT,
+            to_address TEXT,
+            amount_raw TEXT,
+            token_address TEXT,
+            action_id INTEGER
         );
         """
     )
@@ -119,6 +125,19 @@ def insert_tx(
     )
 
 
+def promoted(payload: dict, *names: str):
+    """The first of names present in payload, as event_processor promotes it at ingest."""
+    for name in names:
+        if name in payload:
+            value = payload[name]
+            if name in ("value", "wad", "amount"):
+                return str(value) if isinstance(value, int) else None
+            if name == "actionId":
+                return value if isinstance(value, int) and 0 <= value < 2**63 else None
+            return value.lower() if isinstance(value, str) else None
+    return None
+
+
 def insert_event(
     conn: sqlite3.Connection,
     *,
@@ -134,10 +153,19 @@ def insert_event(
     conn.execute(
         """
         INSERT INTO events(
-            block_number, tx_hash, tx_index, log_index, contract_name, event_name, log_round, round, address, decoded_data, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            block_number, tx_hash, tx_index, log_index, contract_name, event_name, log_round, round, address, decoded_data, created_at,
+            account, from_address, to_address, amount_raw, token_address, action_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (block_number, tx_hash, tx_index, log_index, contract_name, event_name, None, None, address, json.dumps(payload), "2026-04-15T00:00:00+00:00"),
+        (
+            block_number, tx_hash, tx_index, log_index, contract_name, event_name, None, None, address, json.dumps(payload), "2026-04-15T00:00:00+00:00",
+            promoted(payload, "account"),
+            promoted(payload, "from", "src", "_from"),
+            promoted(payload, "to", "dst", "_to"),
+            promoted(payload, "value", "wad", "amount"),
+            promoted(payload, "tokenAddress", "token"),
+            promoted(payload, "actionId"),
+        ),
     )
 
 
@@ -1041,6 +1069,36 @@ class TimelineRuntimeTest(unittest.TestCase):
         self.assertEqual(row["transaction"]["from"], ACCOUNT)
         self.assertEqual(row["events"], [])
 
+    def test_membership_seed_selects_join_exit_rows_like_decoded_data(self) -> None:
+        conn = make_conn()
+        payloads = {
+            "tokenJoinJoin": {"tokenAddress": TOKEN, "actionId": 1, "account": ACCOUNT, "amount": 5},
+            "joinWithoutAmount": {"tokenAddress": TOKEN, "actionId": 2, "account": ACCOUNT},
+            "valueNotAmount": {"tokenAddress": TOKEN, "actionId": 3, "account": ACCOUNT, "value": 5},
+            "valueAndAmount": {"tokenAddress": TOKEN, "actionId": 4, "account": ACCOUNT, "value": 5, "amount": 6},
+            "hugeActionId": {"tokenAddress": TOKEN, "actionId": 2**64, "account": ACCOUNT, "amount": 7},
+            "textAmount": {"tokenAddress": TOKEN, "actionId": 5, "account": ACCOUNT, "amount": "8"},
+        }
+        for log_index, (contract_name, payload) in enumerate(payloads.items()):
+            for event_name in ("Join", "Exit"):
+                insert_event(
+                    conn, tx_hash=f"0x{log_index:064x}", block_number=10, tx_index=0,
+                    log_index=log_index * 2 + (event_name == "Exit"), contract_name=contract_name,
+                    event_name=event_name, address=TOKEN, payload=payload,
+                )
+        params = {"address": ACCOUNT, "oldest_block_number": 11, "oldest_tx_index": 0, "oldest_tx_hash": ""}
+
+        # The membership filter from before the participant columns were promoted
+        decoded_data_sql = timeline_runtime.SEED_MEMBERSHIP_EVENTS_SQL.replace(
+            "WHERE e.account = :address", "WHERE lower(json_extract(e.decoded_data, '$.account')) = :address"
+        )
+        selected = [tuple(row) for row in conn.execute(timeline_runtime.SEED_MEMBERSHIP_EVENTS_SQL, params)]
+        self.assertEqual(selected, [tuple(row) for row in conn.execute(decoded_data_sql, params)])
+        self.assertEqual(
+            sorted({row["contract_name"] for row in conn.execute(timeline_runtime.SEED_MEMBERSHIP_EVENTS_SQL, params)}),
+            ["hugeActionId", "textAmount", "tokenJoinJoin", "valueAndAmount"],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
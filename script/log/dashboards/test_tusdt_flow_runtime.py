@@ -23,7 +23,8 @@ def make_conn() -> sqlite3.Connection:
             tx_hash TEXT,
             contract_name TEXT,
             event_name TEXT,
-            decoded_data TEXT
+            decoded_data TEXT,
+            to_address TEXT
         );
 
         CREATE TABLE v_love20_tusdt_swap (
@@ -120,8 +121,8 @@ def insert_tx(conn: sqlite3.Connection, tx_hash: str, tx_from: str) -> None:
 
 def insert_event(conn: sqlite3.Connection, *, tx_hash: str, contract_name: str, event_name: str, payload: dict) -> None:
     conn.execute(
-        "INSERT INTO events(log_round, tx_hash, contract_name, event_name, decoded_data) VALUES (10, ?, ?, ?, ?)",
-        (tx_hash, contract_name, event_name, json.dumps(payload)),
+        "INSERT INTO events(log_round, tx_hash, contract_name, event_name, decoded_data, to_address) VALUES (10, ?, ?, ?, ?, ?)",
+        (tx_hash, contract_name, event_name, json.dumps(payload), payload["to"].lower() if "to" in payload else None),
     )
 
 
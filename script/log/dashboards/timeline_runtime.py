@@ -71,33 +71,30 @@ RELEVANT_EVENT_NAMES = (
     "SubmitOriginScores",
 )
 RELEVANT_EVENT_NAMES_SQL = ", ".join(f"'{name}'" for name in RELEVANT_EVENT_NAMES)
+# Participant columns are promoted from decoded_data by event_processor at ingest
+PROMOTED_EVENT_COLUMNS = ("account", "from_address", "to_address", "amount_raw", "token_address", "action_id")
 TIMELINE_INDEX_DEFINITIONS = (
     (
-        "idx_events_event_account_expr",
-        "CREATE INDEX IF NOT EXISTS idx_events_event_account_expr "
-        "ON events(event_name, lower(json_extract(decoded_data, '$.account')))",
+        "idx_events_event_account",
+        "CREATE INDEX IF NOT EXISTS idx_events_event_account ON events(event_name, account)",
     ),
     (
-        "idx_events_event_from_expr",
-        "CREATE INDEX IF NOT EXISTS idx_events_event_from_expr "
-        "ON events(event_name, lower(json_extract(decoded_data, '$.from')))",
+        "idx_events_event_from_address",
+        "CREATE INDEX IF NOT EXISTS idx_events_event_from_address ON events(event_name, from_address)",
     ),
     (
-        "idx_events_event_to_expr",
-        "CREATE INDEX IF NOT EXISTS idx_events_event_to_expr "
-        "ON events(event_name, lower(json_extract(decoded_data, '$.to')))",
-    ),
-    (
-        "idx_events_event_src_expr",
-        "CREATE INDEX IF NOT EXISTS idx_events_event_src_expr "
-        "ON events(event_name, lower(json_extract(decoded_data, '$.src')))",
-    ),
-    (
-        "idx_events_event_dst_expr",
-        "CREATE INDEX IF NOT EXISTS idx_events_event_dst_expr "
-        "ON events(event_name, lower(json_extract(decoded_data, '$.dst')))",
+        "idx_events_event_to_address",
+        "CREATE INDEX IF NOT EXISTS idx_events_event_to_address ON events(event_name, to_address)",
     ),
 )
+# json_extract expression indexes the promoted columns replaced; dropped so inserts stop paying for them
+OBSOLETE_TIMELINE_INDEXES = (
+    "idx_events_event_account_expr",
+    "idx_events_event_from_expr",
+    "idx_events_event_to_expr",
+    "idx_events_event_src_expr",
+    "idx_events_event_dst_expr",
+)
 
 
 def now_iso() -> str:
@@ -2321,35 +2318,21 @@ UNION
 SELECT tx_hash
 FROM events
 WHERE event_name IN ('ClaimReward', 'MintActionReward', 'MintGovReward', 'Join', 'Exit', 'Withdraw', 'Withdrawal')
-  AND lower(json_extract(decoded_data, '$.account')) = :address
-
-UNION
-
-SELECT tx_hash
-FROM events
-WHERE event_name = 'Transfer'
-  AND lower(json_extract(decoded_data, '$.from')) = :address
+  AND account = :address
 
 UNION
 
 SELECT tx_hash
 FROM events
 WHERE event_name = 'Transfer'
-  AND lower(json_extract(decoded_data, '$.to')) = :address
+  AND from_address = :address
 
 UNION
 
 SELECT tx_hash
 FROM events
 WHERE event_name = 'Transfer'
-  AND lower(json_extract(decoded_data, '$.src')) = :address
-
-UNION
-
-SELECT tx_hash
-FROM events
-WHERE event_name = 'Transfer'
-  AND lower(json_extract(decoded_data, '$.dst')) = :address
+  AND to_address = :address
 """
 
 
@@ -2545,6 +2528,42 @@ def load_all_event_rows_by_tx(
     return event_rows_by_tx
 
 
+# The Join/Exit residual checks read decoded_data: amount_raw prefers value/wad over amount, and
+# action_id is NULL past the INTEGER range, so those columns are not the same predicate
+SEED_MEMBERSHIP_EVENTS_SQL = """
+SELECT
+    e.block_number,
+    COALESCE(e.tx_index, t.tx_index, 0) AS tx_index,
+    e.log_index,
+    e.tx_hash,
+    e.contract_name,
+    e.event_name,
+    e.address,
+    e.decoded_data,
+    t."from" AS tx_from,
+    t."to" AS tx_to,
+    COALESCE(t.input, '') AS input
+FROM events e
+LEFT JOIN transactions t ON t.tx_hash = e.tx_hash
+WHERE e.account = :address
+  AND (
+        (e.contract_name = 'groupJoin' AND e.event_name IN ('Join', 'Exit'))
+     OR (e.contract_name = 'join' AND e.event_name IN ('Join', 'Withdraw'))
+     OR (
+            e.event_name IN ('Join', 'Exit')
+        AND json_extract(e.decoded_data, '$.actionId') IS NOT NULL
+        AND json_extract(e.decoded_data, '$.amount') IS NOT NULL
+     )
+  )
+  AND (
+        e.block_number < :oldest_block_number
+     OR (e.block_number = :oldest_block_number AND COALESCE(e.tx_index, t.tx_index, 0) < :oldest_tx_index)
+     OR (e.block_number = :oldest_block_number AND COALESCE(e.tx_index, t.tx_index, 0) = :oldest_tx_index AND e.tx_hash < :oldest_tx_hash)
+  )
+ORDER BY e.block_number, COALESCE(e.tx_index, t.tx_index, 0), e.log_index, e.id
+"""
+
+
 def seed_membership_state(
     source: sqlite3.Connection,
     account: str,
@@ -2554,38 +2573,7 @@ def seed_membership_state(
     group_memberships: set[tuple[str, str, str, int, int]] = set()
     summaries: defaultdict[str, dict] = defaultdict(default_summary)
     for row in source.execute(
-        """
-        SELECT
-            e.block_number,
-            COALESCE(e.tx_index, t.tx_index, 0) AS tx_index,
-            e.log_index,
-            e.tx_hash,
-            e.contract_name,
-            e.event_name,
-            e.address,
-            e.decoded_data,
-            t."from" AS tx_from,
-            t."to" AS tx_to,
-            COALESCE(t.input, '') AS input
-        FROM events e
-        LEFT JOIN transactions t ON t.tx_hash = e.tx_hash
-        WHERE lower(json_extract(e.decoded_data, '$.account')) = :address
-          AND (
-                (e.contract_name = 'groupJoin' AND e.event_name IN ('Join', 'Exit'))
-             OR (e.contract_name = 'join' AND e.event_name IN ('Join', 'Withdraw'))
-             OR (
-                    e.event_name IN ('Join', 'Exit')
-                AND json_extract(e.decoded_data, '$.actionId') IS NOT NULL
-                AND json_extract(e.decoded_data, '$.amount') IS NOT NULL
-             )
-          )
-          AND (
-                e.block_number < :oldest_block_number
-             OR (e.block_number = :oldest_block_number AND COALESCE(e.tx_index, t.tx_index, 0) < :oldest_tx_index)
-             OR (e.block_number = :oldest_block_number AND COALESCE(e.tx_index, t.tx_index, 0) = :oldest_tx_index AND e.tx_hash < :oldest_tx_hash)
-          )
-        ORDER BY e.block_number, COALESCE(e.tx_index, t.tx_index, 0), e.log_index, e.id
-        """,
+        SEED_MEMBERSHIP_EVENTS_SQL,
         {
             "address": account,
             "oldest_block_number": int(oldest_row["block_number"]),
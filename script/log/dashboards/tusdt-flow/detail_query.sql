@@ -15,7 +15,7 @@ flow_rows AS (
     SELECT *
     FROM (
         SELECT
-            LOWER(COALESCE(t."from", json_extract(e.decoded_data, '$.to'))) AS address,
+            COALESCE(LOWER(t."from"), e.to_address) AS address,
             p.swap_bucket AS bucket,
             'swap' AS flow_kind,
             'chain' AS flow_scope,
@@ -0,0 +1,92 @@
+"""
+SQLite connections shared by the log processors.
+
+Every connection gets the same pragmas:
+- WAL journaling, so the dashboard server keeps reading while a processor writes;
+- synchronous=NORMAL: a power loss can drop the last commits but never corrupts the file;
+- a sized page cache, memory-mapped reads and in-memory temp tables.
+
+Each process keeps one long-lived writer connection per database (writer()), which every
+helper borrows instead of paying a connect + schema parse per call.
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+BUSY_TIMEOUT_MS = 30000
+CACHE_SIZE_KIB = 64 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+
+PRAGMAS = (
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KIB}",
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def connect_db(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """A new connection with the shared pragmas applied."""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=check_same_thread)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class _SharedWriter:
+    def __init__(self, db_path: str):
+        # Used from the event loop and from writer threads, one at a time under the lock
+        self.conn = connect_db(db_path, check_same_thread=False)
+        self.lock = threading.RLock()
+
+
+_writers: dict[str, _SharedWriter] = {}
+_writers_lock = threading.Lock()
+
+
+@contextmanager
+def writer(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    This process's writer connection to db_path, held exclusively for the block.
+    Committing is up to the caller; an open transaction is rolled back if the block raises.
+    """
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        shared = _writers.get(key)
+        if shared is None:
+            shared = _writers[key] = _SharedWriter(db_path)
+    with shared.lock:
+        try:
+            yield shared.conn
+        except BaseException:
+            if shared.conn.in_transaction:
+                shared.conn.rollback()
+            raise
+
+
+def table_key(conn: sqlite3.Connection, table: str) -> tuple[str, ...]:
+    """Columns that identify a row of table: ('rowid',), or the primary key of a WITHOUT ROWID table."""
+    listed = conn.execute(f"PRAGMA table_list({table})").fetchone()
+    if listed is None or not listed[4]:  # wr: WITHOUT ROWID
+        return ("rowid",)
+    pk = sorted((row[5], row[1]) for row in conn.execute(f"PRAGMA table_info({table})") if row[5])
+    return tuple(name for _, name in pk)
+
+
+def close_writers():
+    """Close every writer connection (the last close checkpoints the WAL into the database)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for shared in writers:
+        with shared.lock:
+            shared.conn.close()
+
+
+atexit.register(close_writers)
@@ -373,8 +373,18 @@ def reset_sync_status(conn: sqlite3.Connection, contract_names: list[str]) -> in
         f"DELETE FROM sync_status WHERE contract_name IN ({placeholders})",
         tuple(contract_names),
     )
+    deleted = int(cursor.rowcount or 0)
+    try:
+        # Ranges checkpointed ahead of sync_status would otherwise be skipped on resync
+        conn.execute(
+            f"DELETE FROM sync_ranges WHERE contract_name IN ({placeholders})",
+            tuple(contract_names),
+        )
+    except sqlite3.OperationalError:
+        # Databases created before sync_ranges existed have nothing to clear
+        pass
     conn.commit()
-    return int(cursor.rowcount or 0)
+    return deleted
 
 
 def write_status_file(
@@ -3,7 +3,8 @@
 LOVE20 Event Log Processor - High Performance Python Implementation
 
 Decodes all event logs for given contracts and stores them directly into SQLite.
-Features intelligent batch fetching with per-contract sync status.
+Features intelligent batch fetching streamed through a bounded fetch -> decode -> save
+pipeline, with per-contract sync status.
 """
 
 import argparse
@@ -11,18 +12,27 @@ import asyncio
 import json
 import os
 import re
+import signal
 import sqlite3
 import sys
 import threading
-from dataclasses import dataclass
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, NamedTuple
 
 import httpx
-from eth_abi import decode
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry as abi_registry
 from eth_utils import event_abi_to_log_topic, to_checksum_address
 
+from database import table_key, writer
+from rpc_client import RpcPool, parse_rpc_urls, read_json, retry_delay
+
 # Force unbuffered output for real-time logging
 # Use stderr to avoid interleaving with any RPC/debug output on stdout
 _log_lock = threading.Lock()
@@ -32,12 +42,6 @@ def log(msg: str):
         print(msg, file=sys.stderr, flush=True)
 
 
-def connect_db(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, timeout=30.0)
-    conn.execute("PRAGMA busy_timeout = 30000")
-    return conn
-
-
 # ============================================================================
 # Data Classes
 # ============================================================================
@@ -59,6 +63,37 @@ class EventDef:
     topic0: str  # Keccak256 hash of event signature
     contract_name: str # The name of the contract this event belongs to
     start_block: int
+    decoder: 'EventDecoder' = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Compiled once here so decoding a log is a single call on the prepared plan
+        self.decoder = EventDecoder(self.contract_name, self.name, self.params)
+
+
+class EventRecord(NamedTuple):
+    """One decoded log, laid out like the events table row it is inserted as"""
+    contract_name: str
+    event_name: str
+    log_round: int | None
+    round: Any  # the event's own round / currentRound param, if any
+    block_number: int
+    block_hash: str | None
+    tx_hash: str
+    tx_index: int
+    log_index: int
+    address: str
+    decoded_data: str  # JSON object of the event's params
+    # Hot params promoted to indexed columns (see PROMOTED_COLUMNS)
+    account: str | None = None
+    from_address: str | None = None
+    to_address: str | None = None
+    amount_raw: str | None = None
+    token_address: str | None = None
+    action_id: int | None = None
+
+    def fields(self) -> dict:
+        """Decoded params by column name."""
+        return json.loads(self.decoded_data)
 
 
 @dataclass
@@ -75,28 +110,51 @@ class ProcessContractConfig:
 class ProcessConfig:
     """Global processing configuration"""
     config_file: str         # Path to JSON config file containing contract info
-    rpc_url: str
-    to_block: int
-    max_blocks_per_request: int = 50000
-    max_concurrent_jobs: int = 50
+    rpc_url: str  # one endpoint or a comma-separated list for the RPC pool
+    to_block: int | None  # None resolves the chain head (minus confirmations) at startup
+    max_blocks_per_request: int = 50000  # initial window; adapted at runtime
+    min_blocks_per_request: int = 1
+    max_range_blocks: int = 500000
+    target_logs_per_request: int = 5000
+    target_request_latency: float = 5.0
+    max_concurrent_jobs: int = 50  # ceiling of the adaptive in-flight request limit
     max_retries: int = 5
+    logs_batch_size: int = 1  # eth_getLogs ranges per JSON-RPC batch POST (1 = no batching)
+    # Send a topics[0] OR-list built from the EventDefs. Logs with other topic0s are then never
+    # fetched, so they cannot reach quarantined_logs; turn it off to keep unknown events recoverable.
+    topic_filter: bool = True
     db_path: str = None
     origin_blocks: int = 0
     phase_blocks: int = 0
+    follow: bool = False  # stay resident and ingest new blocks as the head advances
+    poll_interval: float = 5.0  # seconds between eth_blockNumber polls in follow mode
+    confirmations: int = 0  # blocks kept behind the head
+    reorg_window: int = 64  # recent blocks whose hashes are checked for reorgs (0 disables)
+    hedge_requests: bool = False  # duplicate requests slower than the endpoint's p95 to another endpoint
+    rps: float = 0.0  # per-endpoint request rate cap (0 = unlimited)
+    decode_workers: int = 0  # worker processes for decoding (0 or 1 = a thread in this process)
+    abi_cache: str | None = None  # compiled ABI event tables (default: abi_cache.json next to the DB; '' disables)
+    redecode_quarantine: bool = False  # decode quarantined_logs with the current ABIs instead of syncing
+    raw_first: bool = False  # store fetched logs in raw_logs and decode them behind the writer
+    decode_raw: str | None = None  # 'pending' or 'all': decode raw_logs instead of syncing
 
 
 # ============================================================================
 # ABI Parsing
 # ============================================================================
 
+def resolve_abi_path(abi_file: str) -> str:
+    """ABI paths in the config are relative to this script's directory."""
+    if not os.path.isabs(abi_file):
+        script_dir = Path(__file__).resolve().parent
+        abi_file = os.path.join(script_dir, abi_file)
+    return os.path.normpath(abi_file)
+
+
 def load_abi(abi_file: str) -> list[dict]:
     """Load ABI from JSON file"""
     try:
-        # Resolve path relative to script directory if not absolute
-        if not os.path.isabs(abi_file):
-            script_dir = Path(__file__).resolve().parent
-            abi_file = os.path.join(script_dir, abi_file)
-            
+        abi_file = resolve_abi_path(abi_file)
         with open(abi_file, 'r') as f:
             data = json.load(f)
         return data.get('abi', data)  # Handle both {abi: [...]} and [...] formats
@@ -125,9 +183,9 @@ def resolve_contract_start_block(contract_info: dict, default_origin_blocks: int
     return default_origin_blocks
 
 
-def get_all_event_defs(abi: list[dict], contract_name: str, start_block: int) -> dict[str, EventDef]:
-    """Extract all event definitions from ABI, returning topic0 -> EventDef map"""
-    events = {}
+def compile_event_table(abi: list[dict]) -> list[tuple[str, str, list[EventParam]]]:
+    """(topic0, event name, params) for every event of an ABI, in ABI order"""
+    table = []
     for item in abi:
         if item.get('type') == 'event':
             event_name = item.get('name', 'Unknown')
@@ -142,16 +200,177 @@ def get_all_event_defs(abi: list[dict], contract_name: str, start_block: int) ->
             
             # Calculate topic0 (event signature hash)
             topic0 = '0x' + event_abi_to_log_topic(item).hex()
-            
-            events[topic0] = EventDef(
-                name=event_name,
-                params=params,
-                topic0=topic0,
-                contract_name=contract_name,
-                start_block=start_block,
-            )
-            
-    return events
+            table.append((topic0, event_name, params))
+    return table
+
+
+def event_defs_from_table(
+    table: list[tuple[str, str, list[EventParam]]], contract_name: str, start_block: int
+) -> dict[str, EventDef]:
+    return {
+        topic0: EventDef(
+            name=event_name,
+            params=params,
+            topic0=topic0,
+            contract_name=contract_name,
+            start_block=start_block,
+        )
+        for topic0, event_name, params in table
+    }
+
+
+def get_all_event_defs(abi: list[dict], contract_name: str, start_block: int) -> dict[str, EventDef]:
+    """Extract all event definitions from ABI, returning topic0 -> EventDef map"""
+    return event_defs_from_table(compile_event_table(abi), contract_name, start_block)
+
+
+# Bump when the cached table layout changes
+ABI_CACHE_VERSION = 1
+
+
+class AbiRegistry:
+    """
+    Event tables of ABI files, parsed once per process however many contracts share a file.
+
+    With a cache_file, tables persist across runs keyed by the ABI's resolved path, mtime
+    and size, so an unchanged abi/ tree starts without JSON parsing or keccak hashing.
+    """
+
+    def __init__(self, cache_file: str | None = None):
+        self.cache_file = cache_file
+        self.tables: dict[str, list[tuple[str, str, list[EventParam]]]] = {}
+        self.cached: dict[str, dict] = self._read_cache() if cache_file else {}
+        self.dirty = False
+        self.cache_hits = 0
+        self.parsed = 0
+
+    def _read_cache(self) -> dict[str, dict]:
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != ABI_CACHE_VERSION:
+            return {}
+        return data.get('abis', {})
+
+    def event_table(self, abi_file: str) -> list[tuple[str, str, list[EventParam]]]:
+        path = resolve_abi_path(abi_file)
+        table = self.tables.get(path)
+        if table is not None:
+            return table
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        entry = self.cached.get(path)
+        if stat and entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            table = [
+                (event['topic0'], event['name'], [EventParam(**param) for param in event['params']])
+                for event in entry['events']
+            ]
+            self.cache_hits += 1
+        else:
+            abi = load_abi(path)
+            table = compile_event_table(abi)
+            self.parsed += 1
+            if stat and abi:
+                self.cached[path] = {
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'events': [
+                        {'topic0': topic0, 'name': name, 'params': [param.__dict__ for param in params]}
+                        for topic0, name, params in table
+                    ],
+                }
+                self.dirty = True
+        self.tables[path] = table
+        return table
+
+    def event_defs(self, abi_file: str, contract_name: str, start_block: int) -> dict[str, EventDef]:
+        return event_defs_from_table(self.event_table(abi_file), contract_name, start_block)
+
+    def save(self):
+        """Write new or changed tables back to the cache file (atomically)."""
+        if not self.cache_file or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': ABI_CACHE_VERSION, 'abis': self.cached}, f)
+        os.replace(tmp_path, self.cache_file)
+        self.dirty = False
+
+
+def _parse_event_name_list(contract_info: dict, field_name: str) -> set[str] | None:
+    value = contract_info.get(field_name)
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{field_name} must be a list of event names")
+    return set(value)
+
+
+def filter_event_defs(event_defs: dict[str, EventDef], contract_info: dict) -> dict[str, EventDef]:
+    """Apply a contract's include_events / exclude_events lists (by event name) to its topic0 -> EventDef map."""
+    include = _parse_event_name_list(contract_info, 'include_events')
+    exclude = _parse_event_name_list(contract_info, 'exclude_events')
+    if include is None and exclude is None:
+        return event_defs
+
+    known = {ed.name for ed in event_defs.values()}
+    unknown = ((include or set()) | (exclude or set())) - known
+    if unknown:
+        log(f"⚠️  {contract_info.get('name')}: unknown events in include/exclude lists: {', '.join(sorted(unknown))}")
+
+    return {
+        topic0: ed for topic0, ed in event_defs.items()
+        if (include is None or ed.name in include) and (exclude is None or ed.name not in exclude)
+    }
+
+
+def build_event_def_map(
+    contracts_info: list[dict],
+    origin_blocks: int,
+    registry: AbiRegistry | None = None,
+) -> dict[str, dict[str, EventDef]]:
+    """address -> topic0 -> EventDef for every usable contract in the JSON config; raises ValueError on bad entries."""
+    registry = registry or AbiRegistry()
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]] = {}
+    for c in contracts_info:
+        name = c['name']
+        try:
+            contract_start_block = resolve_contract_start_block(c, origin_blocks)
+        except ValueError as e:
+            raise ValueError(f"Invalid start block for {name}: {e}") from e
+        env_var = c.get('address_env_var')
+        if env_var:
+            raw_address = os.environ.get(env_var)
+            if not raw_address:
+                log(f"⚠️  Skipping {name}: Environment variable {env_var} not found")
+                continue
+        else:
+            raw_address = c.get('address')
+        if not raw_address:
+            log(f"⚠️  Skipping {name}: No address provided")
+            continue
+
+        address = to_checksum_address(raw_address)
+        abi_files = c.get('abi_files')
+        if not abi_files:
+            log(f"⚠️  Skipping {name}: No abi_files provided")
+            continue
+        event_defs = {}
+        for abi_path in abi_files:
+            event_defs.update(registry.event_defs(abi_path, name, contract_start_block))
+        try:
+            event_defs = filter_event_defs(event_defs, c)
+        except ValueError as e:
+            raise ValueError(f"Invalid event filter for {name}: {e}") from e
+        if address not in addr_topic_to_event_def:
+            addr_topic_to_event_def[address] = {}
+        addr_topic_to_event_def[address].update(event_defs)
+    return addr_topic_to_event_def
 
 
 # ============================================================================
@@ -198,59 +417,120 @@ def _build_contract_address_name_view_sql(config_file: str) -> str | None:
     return f"DROP VIEW IF EXISTS v_contract;\nCREATE VIEW v_contract AS\n{body};\n"
 
 
-def init_db(db_path: str, contracts_config_file: str | None = None):
-    """Initialize DB by executing SQL files from script/log/sql/init, then optionally create contract mapping view."""
-    conn = connect_db(db_path)
-
-    script_dir = Path(__file__).resolve().parent
-    sql_init_dir = script_dir / 'sql' / 'init'
+# Columns added to existing tables after their first release. CREATE TABLE IF NOT EXISTS
+# leaves old databases alone, so init_db adds these before running the init SQL.
+SCHEMA_COLUMN_MIGRATIONS = [
+    ("events", "block_hash", "TEXT"),
+    *((table, column, decl) for table in ("events", "receipt_events") for column, decl in (
+        ("account", "TEXT"),
+        ("from_address", "TEXT"),
+        ("to_address", "TEXT"),
+        ("amount_raw", "TEXT"),
+        ("token_address", "TEXT"),
+        ("action_id", "INTEGER"),
+    )),
+]
+
+# Rows read and updated per statement when backfilling promoted columns
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_promoted_columns(conn: sqlite3.Connection, table: str) -> int:
+    """Fill PROMOTED_COLUMNS of existing rows from their decoded_data (no commit). Returns row count."""
+    assignments = ", ".join(f"{column} = ?" for column, _, _ in PROMOTED_COLUMNS)
+    # rowid, or (block_number, log_index) for a clustered events table (cluster_events.py)
+    key_columns = table_key(conn, table)
+    key = ", ".join(key_columns)
+    key_params = ", ".join("?" for _ in key_columns)
+    updated = 0
+    last_key = None
+    while True:
+        after = f"WHERE ({key}) > ({key_params})" if last_key is not None else ""
+        rows = conn.execute(
+            f"SELECT {key}, decoded_data FROM {table} {after} ORDER BY {key} LIMIT ?",
+            (*(last_key or ()), BACKFILL_BATCH_SIZE),
+        ).fetchall()
+        if not rows:
+            return updated
+        last_key = rows[-1][:-1]
+        params = []
+        for *row_key, decoded_data in rows:
+            values = json.loads(decoded_data)
+            params.append(promoted_values(values, promoted_param_names(values)) + tuple(row_key))
+        conn.executemany(f"UPDATE {table} SET {assignments} WHERE ({key}) = ({key_params})", params)
+        updated += len(rows)
+
+
+def migrate_schema(conn: sqlite3.Connection):
+    """
+    Add columns from SCHEMA_COLUMN_MIGRATIONS that an existing database lacks, and backfill
+    newly added promoted columns, in one transaction so an interrupted run redoes both.
+    """
+    pending = []
+    for table, column, decl in SCHEMA_COLUMN_MIGRATIONS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if existing and column not in existing:
+            pending.append((table, column, decl))
+    if not pending:
+        return
+    promoted = {column for column, _, _ in PROMOTED_COLUMNS}
+    conn.execute("BEGIN")
+    for table, column, decl in pending:
+        log(f"   Adding column {table}.{column}")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    for table in dict.fromkeys(table for table, column, _ in pending if column in promoted):
+        log(f"   Backfilled promoted columns of {backfill_promoted_columns(conn, table):,} {table} rows")
+    conn.commit()
 
-    if sql_init_dir.exists() and sql_init_dir.is_dir():
-        sql_files = sorted(sql_init_dir.glob('*.sql'))
-        for f in sql_files:
-            log(f"   Executing SQL init file: {f.name}")
-            try:
-                with open(f, 'r', encoding='utf-8') as sql_file:
-                    conn.executescript(sql_file.read())
-            except Exception as e:
-                conn.rollback()
-                conn.close()
-                raise RuntimeError(f"error executing {f.name}: {e}") from e
-    else:
-        log(f"⚠️ SQL init directory not found: {sql_init_dir}")
 
-    if contracts_config_file:
-        view_sql = _build_contract_address_name_view_sql(contracts_config_file)
-        if view_sql:
-            log("   Creating v_contract from contracts config")
-            try:
-                conn.executescript(view_sql)
-            except Exception as e:
-                conn.rollback()
-                conn.close()
-                raise RuntimeError(f"error creating v_contract: {e}") from e
+def init_db(db_path: str, contracts_config_file: str | None = None):
+    """Initialize DB by executing SQL files from script/log/sql/init, then optionally create contract mapping view."""
+    with writer(db_path) as conn:
+        try:
+            migrate_schema(conn)
+        except Exception as e:
+            raise RuntimeError(f"error migrating schema: {e}") from e
+
+        script_dir = Path(__file__).resolve().parent
+        sql_init_dir = script_dir / 'sql' / 'init'
+
+        if sql_init_dir.exists() and sql_init_dir.is_dir():
+            sql_files = sorted(sql_init_dir.glob('*.sql'))
+            for f in sql_files:
+                log(f"   Executing SQL init file: {f.name}")
+                try:
+                    with open(f, 'r', encoding='utf-8') as sql_file:
+                        conn.executescript(sql_file.read())
+                except Exception as e:
+                    raise RuntimeError(f"error executing {f.name}: {e}") from e
         else:
-            log("⚠️ No resolved addresses for v_contract (env vars may be missing)")
+            log(f"⚠️ SQL init directory not found: {sql_init_dir}")
+
+        if contracts_config_file:
+            view_sql = _build_contract_address_name_view_sql(contracts_config_file)
+            if view_sql:
+                log("   Creating v_contract from contracts config")
+                try:
+                    conn.executescript(view_sql)
+                except Exception as e:
+                    raise RuntimeError(f"error creating v_contract: {e}") from e
+            else:
+                log("⚠️ No resolved addresses for v_contract (env vars may be missing)")
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
 
 def get_last_synced_block(db_path: str, contract_name: str, event_name: str) -> int | None:
     """Query the last synced block for a specific contract+event"""
-    conn = connect_db(db_path)
-    c = conn.cursor()
-    try:
-        c.execute(
-            "SELECT last_block FROM sync_status WHERE contract_name = ? AND event_name = ?",
-            (contract_name, event_name)
-        )
-        row = c.fetchone()
-        conn.close()
-        return row[0] if row else None
-    except sqlite3.OperationalError:
-        conn.close()
-        return None
+    with writer(db_path) as conn:
+        try:
+            row = conn.execute(
+                "SELECT last_block FROM sync_status WHERE contract_name = ? AND event_name = ?",
+                (contract_name, event_name)
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.OperationalError:
+            return None
 
 
 def get_min_from_block_for_address(
@@ -269,93 +549,437 @@ def get_min_from_block_for_address(
     return min_from
 
 
+# Rows per multi-row sync_status statement (4 parameters each, under SQLite's 999-variable floor)
+SYNC_STATUS_ROWS_PER_STATEMENT = 200
+
+# Events per transaction when save_events_to_db bulk-loads a large batch
+INSERT_TRANSACTION_ROWS = 50000
+
+
+def insert_events(conn: sqlite3.Connection, decoded_events: list[EventRecord], table: str = 'events') -> int:
+    """Insert decoded events with one executemany (no commit). Returns inserted count (duplicates are ignored)."""
+    sql = f'''INSERT OR IGNORE INTO {table}
+             (contract_name, event_name, log_round, round, block_number, block_hash, tx_hash, tx_index, log_index, address, decoded_data,
+              account, from_address, to_address, amount_raw, token_address, action_id)
+             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+    before = conn.total_changes
+    try:
+        conn.executemany(sql, decoded_events)
+    except sqlite3.Error as e:
+        # Rows before the failing one are in; retry one by one to name it
+        for event in decoded_events:
+            try:
+                conn.execute(sql, event)
+            except sqlite3.Error:
+                raise RuntimeError(
+                    f"failed to insert event {event.contract_name}.{event.event_name} at {event.block_number}: {e}"
+                ) from e
+        raise RuntimeError(f"failed to insert events into {table}: {e}") from e
+    return conn.total_changes - before
+
+
+def upsert_sync_status(conn: sqlite3.Connection, rows: list[tuple[str, str, int]], advance_only: bool = False):
+    """
+    Write (contract_name, event_name, last_block) rows to sync_status, one multi-row statement
+    per SYNC_STATUS_ROWS_PER_STATEMENT rows. advance_only never moves last_block back (no commit).
+    """
+    now = datetime.now().isoformat()
+    last_block = "MAX(last_block, excluded.last_block)" if advance_only else "excluded.last_block"
+    for start in range(0, len(rows), SYNC_STATUS_ROWS_PER_STATEMENT):
+        chunk = rows[start:start + SYNC_STATUS_ROWS_PER_STATEMENT]
+        try:
+            conn.execute(
+                f'''INSERT INTO sync_status (contract_name, event_name, last_block, updated_at)
+                    VALUES {", ".join(["(?, ?, ?, ?)"] * len(chunk))}
+                    ON CONFLICT(contract_name, event_name) DO UPDATE SET
+                        last_block = {last_block},
+                        updated_at = excluded.updated_at''',
+                [value for contract_name, event_name, block in chunk for value in (contract_name, event_name, block, now)],
+            )
+        except sqlite3.Error as e:
+            names = ", ".join(f"{contract_name}.{event_name}" for contract_name, event_name, _ in chunk[:5])
+            raise RuntimeError(f"failed to update sync_status for {names}: {e}") from e
+
+
+def load_synced_ranges(conn: sqlite3.Connection, contract_names: set[str]) -> dict[str, list[tuple[int, int]]]:
+    """Ranges committed ahead of sync_status, per contract_name."""
+    ranges: dict[str, list[tuple[int, int]]] = {name: [] for name in contract_names}
+    if not contract_names:
+        return ranges
+    placeholders = ",".join("?" for _ in contract_names)
+    rows = conn.execute(
+        f"SELECT contract_name, from_block, to_block FROM sync_ranges "
+        f"WHERE contract_name IN ({placeholders}) ORDER BY from_block",
+        tuple(contract_names),
+    ).fetchall()
+    for contract_name, from_block, to_block in rows:
+        ranges[contract_name].append((from_block, to_block))
+    return ranges
+
+
+def record_synced_range(conn: sqlite3.Connection, contract_names: set[str], from_block: int, to_block: int):
+    """Remember a range committed ahead of sync_status (no commit)."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO sync_ranges (contract_name, from_block, to_block) VALUES (?, ?, ?)",
+        [(name, from_block, to_block) for name in contract_names],
+    )
+
+
+def prune_synced_ranges(conn: sqlite3.Connection, contract_names: set[str], last_block: int):
+    """Drop ranges that sync_status now covers (no commit)."""
+    conn.executemany(
+        "DELETE FROM sync_ranges WHERE contract_name = ? AND to_block <= ?",
+        [(name, last_block) for name in contract_names],
+    )
+
+
+def raw_log_row(raw_log: dict) -> tuple:
+    """(block_number, block_hash, tx_hash, tx_index, log_index, address, topics JSON, data) of a raw RPC log"""
+    return (
+        int(raw_log.get('blockNumber', '0x0'), 16), raw_log.get('blockHash'),
+        raw_log.get('transactionHash', ''), int(raw_log.get('transactionIndex', '0x0'), 16),
+        int(raw_log.get('logIndex', '0x0'), 16), raw_log.get('address', ''),
+        json.dumps(raw_log.get('topics') or []), raw_log.get('data', '0x'),
+    )
+
+
+def quarantine_logs(conn: sqlite3.Connection, raw_logs: list[dict]) -> int:
+    """Store raw logs no EventDef matched in quarantined_logs (no commit). Returns inserted count."""
+    before = conn.total_changes
+    conn.executemany(
+        '''INSERT OR IGNORE INTO quarantined_logs
+           (block_number, block_hash, tx_hash, tx_index, log_index, address, topics, data, topic0)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        (raw_log_row(raw_log) + ((raw_log.get('topics') or [None])[0],) for raw_log in raw_logs),
+    )
+    return conn.total_changes - before
+
+
+def store_raw_logs(conn: sqlite3.Connection, raw_logs: list[dict]):
+    """Append fetched logs to raw_logs, undecoded (no commit)."""
+    conn.executemany(
+        '''INSERT OR IGNORE INTO raw_logs
+           (block_number, block_hash, tx_hash, tx_index, log_index, address, topics, data)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        (raw_log_row(raw_log) for raw_log in raw_logs),
+    )
+
+
+def _load_stored_logs(conn: sqlite3.Connection, table: str, after_rowid: int, limit: int) -> list[tuple[int, dict]]:
+    rows = conn.execute(
+        f'''SELECT rowid, block_number, block_hash, tx_hash, tx_index, log_index, address, topics, data
+            FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?''',
+        (after_rowid, limit),
+    ).fetchall()
+    return [
+        (rowid, {
+            'blockNumber': hex(block_number),
+            'blockHash': block_hash,
+            'transactionHash': tx_hash,
+            'transactionIndex': hex(tx_index or 0),
+            'logIndex': hex(log_index),
+            'address': address,
+            'topics': json.loads(topics),
+            'data': data,
+        })
+        for rowid, block_number, block_hash, tx_hash, tx_index, log_index, address, topics, data in rows
+    ]
+
+
+def load_quarantined_logs(conn: sqlite3.Connection, after_rowid: int, limit: int) -> list[tuple[int, dict]]:
+    """(rowid, raw RPC log) pairs of quarantined logs after after_rowid, oldest first."""
+    return _load_stored_logs(conn, 'quarantined_logs', after_rowid, limit)
+
+
+def load_raw_logs(conn: sqlite3.Connection, after_id: int, limit: int) -> list[tuple[int, dict]]:
+    """(id, raw RPC log) pairs of raw_logs after after_id, in fetch order."""
+    return _load_stored_logs(conn, 'raw_logs', after_id, limit)
+
+
+def load_decode_watermark(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT last_raw_id FROM decode_status WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def save_block_hashes(conn: sqlite3.Connection, hashes: dict[int, str], keep_from: int | None = None):
+    """Record canonical block hashes near the head, dropping entries below keep_from (no commit)."""
+    conn.executemany(
+        "INSERT OR REPLACE INTO recent_block_hashes (block_number, block_hash) VALUES (?, ?)",
+        list(hashes.items()),
+    )
+    if keep_from is not None:
+        conn.execute("DELETE FROM recent_block_hashes WHERE block_number < ?", (keep_from,))
+
+
+def load_recent_block_hashes(conn: sqlite3.Connection, window: int) -> dict[int, str]:
+    """Stored hashes within window blocks of the newest one."""
+    rows = conn.execute(
+        '''SELECT block_number, block_hash FROM recent_block_hashes
+           WHERE block_number > (SELECT MAX(block_number) FROM recent_block_hashes) - ?''',
+        (window,),
+    ).fetchall()
+    return dict(rows)
+
+
+def rollback_after_block(conn: sqlite3.Connection, block: int) -> int:
+    """
+    Forget everything above block: delete its events, raw and quarantined logs, rewind
+    sync_status, trim sync_ranges and drop recorded hashes. Returns deleted event count (no commit).
+    """
+    deleted = conn.execute("DELETE FROM events WHERE block_number > ?", (block,)).rowcount
+    conn.execute("DELETE FROM raw_logs WHERE block_number > ?", (block,))
+    conn.execute("DELETE FROM quarantined_logs WHERE block_number > ?", (block,))
+    now = datetime.now().isoformat()
+    conn.execute(
+        "UPDATE sync_status SET last_block = ?, updated_at = ? WHERE last_block > ?",
+        (block, now, block),
+    )
+    conn.execute("DELETE FROM sync_ranges WHERE from_block > ?", (block,))
+    conn.execute("UPDATE OR IGNORE sync_ranges SET to_block = ? WHERE to_block > ?", (block, block))
+    conn.execute("DELETE FROM sync_ranges WHERE to_block > ?", (block,))
+    conn.execute("DELETE FROM recent_block_hashes WHERE block_number > ?", (block,))
+    return deleted
+
+
 def save_events_to_db(
     db_path: str,
-    decoded_events: list[dict],
+    decoded_events: list[EventRecord],
     to_block: int,
     all_synced_keys: set[tuple[str, str]] | None = None,
 ) -> int:
-    """Batch insert decoded events and update sync_status. Use to_block (processed range end) for last_block. Returns inserted count."""
-    base_fields = {'blockNumber', 'transactionHash', 'transactionIndex', 'logIndex', 'address', 'log_round', 'event_name', 'contract_name'}
-    conn = connect_db(db_path)
-    c = conn.cursor()
+    """
+    Bulk insert decoded events in INSERT_TRANSACTION_ROWS-sized transactions, then update
+    sync_status. Use to_block (processed range end) for last_block. Returns inserted count.
+    """
     inserted = 0
+    with writer(db_path) as conn:
+        for start in range(0, len(decoded_events), INSERT_TRANSACTION_ROWS):
+            inserted += insert_events(conn, decoded_events[start:start + INSERT_TRANSACTION_ROWS])
+            conn.commit()
+        keys_to_update = {
+            (event.contract_name, event.event_name) for event in decoded_events
+        } | (all_synced_keys or set())
+        upsert_sync_status(conn, [(contract_name, event_name, to_block) for contract_name, event_name in sorted(keys_to_update)])
+        conn.commit()
+    return inserted
 
-    # Track max block per (contract_name, event_name)
-    event_max_block: dict[tuple[str, str], int] = {}
 
-    for event in decoded_events:
-        event_name = event.get('event_name', 'Unknown')
-        contract_name = event.get('contract_name', 'Unknown')
-        block_num = event.get('blockNumber', 0)
-        key = (contract_name, event_name)
-        event_max_block[key] = max(event_max_block.get(key, 0), block_num)
+# Node messages meaning "fewer logs per request", e.g. geth's
+# "query returned more than 10000 results" or "response size exceeded"
+RESULT_LIMIT_MARKERS = ("limit", "too many", "more than", "response size", "response is too big")
+# Node messages meaning "fewer blocks per request" regardless of density
+BLOCK_RANGE_LIMIT_MARKERS = ("block range", "range too large", "range is too large", "range is too wide", "maximum range")
+# Provider throttling reported as a JSON-RPC error (or a 429): wait, don't split
+RATE_LIMIT_MARKERS = ("rate limit", "too many requests", "request limit", "exceeded the quota", "capacity exceeded")
+# Backoff base for throttled retries, above the default so the provider window can pass
+RATE_LIMIT_BASE_DELAY = 1.0
 
-        decoded_data = {k: v for k, v in event.items() if k not in base_fields}
-        decoded_json = json.dumps(decoded_data, default=str)
-        round_val = event.get('round') or event.get('currentRound')
 
-        try:
-            c.execute('''INSERT OR IGNORE INTO events
-                        (contract_name, event_name, log_round, round, block_number, tx_hash, tx_index, log_index, address, decoded_data)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (contract_name, event_name, event.get('log_round'), round_val,
-                       block_num, event.get('transactionHash'),
-                       event.get('transactionIndex'), event.get('logIndex'),
-                       event.get('address'), decoded_json))
-            inserted += c.rowcount
-        except Exception as e:
-            conn.rollback()
-            conn.close()
-            raise RuntimeError(
-                f"failed to insert event {contract_name}.{event_name} at {block_num}: {e}"
-            ) from e
+def is_rate_limit_error(error_msg: str | None) -> bool:
+    """True when the provider is throttling us; a smaller range would not help."""
+    if not error_msg:
+        return False
+    lower = error_msg.lower()
+    return any(marker in lower for marker in RATE_LIMIT_MARKERS)
 
-    keys_to_update = event_max_block.keys() | (all_synced_keys or set())
-    for (contract_name, event_name) in keys_to_update:
-        try:
-            c.execute('''INSERT OR REPLACE INTO sync_status (contract_name, event_name, last_block, updated_at)
-                        VALUES (?, ?, ?, ?)''',
-                      (contract_name, event_name, to_block, datetime.now().isoformat()))
-        except Exception as e:
-            conn.rollback()
-            conn.close()
-            raise RuntimeError(
-                f"failed to update sync_status for {contract_name}.{event_name}: {e}"
-            ) from e
 
-    conn.commit()
-    conn.close()
-    return inserted
+def fetch_retry_delay(attempt: int, error: BaseException | str | None = None) -> float:
+    """Jittered backoff before retry `attempt`, longer when the error was throttling."""
+    if isinstance(error, BaseException):
+        throttled = is_rate_limit_error(str(error))
+        return retry_delay(attempt, error, base=RATE_LIMIT_BASE_DELAY if throttled else None)
+    return retry_delay(attempt, base=RATE_LIMIT_BASE_DELAY if is_rate_limit_error(error) else None)
+
+
+def is_block_range_limit_error(error_msg: str | None) -> bool:
+    """True when the node rejects the block span itself rather than the result size."""
+    if not error_msg:
+        return False
+    lower = error_msg.lower()
+    return any(marker in lower for marker in BLOCK_RANGE_LIMIT_MARKERS)
 
 
 def should_split_fetch_error(error_msg: str | None) -> bool:
     """Only split ranges for errors that can plausibly improve with a smaller window."""
-    if not error_msg:
+    if not error_msg or is_rate_limit_error(error_msg):
         return False
 
     lower = error_msg.lower()
     return (
         error_msg.startswith("RANGE_TOO_LARGE:")
         or "timeout" in lower
-        or "too many" in lower
-        or "limit" in lower
+        or any(marker in lower for marker in RESULT_LIMIT_MARKERS)
+        or is_block_range_limit_error(error_msg)
         or "height out of range" in lower
     )
 
 
+# ============================================================================
+# Adaptive Range Sizing
+# ============================================================================
+
+class RangeSizer:
+    """
+    AIMD controller for the eth_getLogs block window.
+
+    Quiet responses grow the window additively (bounded by the density just observed),
+    heavy or failed responses shrink it multiplicatively. The window is shared by all
+    fetch jobs, so what one range learns carries over to its neighbours.
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        min_size: int = 1,
+        max_size: int = 500000,
+        target_logs: int = 5000,
+        target_bytes: int = 8 * 1024 * 1024,
+        target_latency: float = 5.0,
+    ):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.step = max(self.min_size, initial_size)
+        self.size = min(max(initial_size, self.min_size), self.max_size)
+        self.target_logs = target_logs
+        self.target_bytes = target_bytes
+        self.target_latency = target_latency
+        self.ceiling: int | None = None  # learned from block-range rejections
+        self.grows = 0
+        self.shrinks = 0
+
+    def _clamp(self, size: int) -> int:
+        upper = self.max_size if self.ceiling is None else min(self.max_size, self.ceiling)
+        return max(self.min_size, min(int(size), upper))
+
+    def next_size(self) -> int:
+        return self._clamp(self.size)
+
+    def observe(self, blocks: int, logs: int, nbytes: int, latency: float):
+        """Feed back one successful response covering `blocks` blocks."""
+        load = max(
+            logs / self.target_logs if self.target_logs > 0 else 0.0,
+            nbytes / self.target_bytes if self.target_bytes > 0 else 0.0,
+            latency / self.target_latency if self.target_latency > 0 else 0.0,
+        )
+        if load > 1.0:
+            # Multiplicative decrease, straight to the size that would have met the targets
+            self.size = self._clamp(min(self.size // 2, blocks / load))
+            self.shrinks += 1
+        elif load < 0.5 and blocks >= self.size // 2:
+            # Additive increase, never past what the observed density says is safe
+            projected = blocks * 0.8 / load if load > 0 else self.max_size
+            self.size = self._clamp(min(self.size + self.step, max(self.size, projected)))
+            self.grows += 1
+
+    def on_failure(self, blocks: int, error_msg: str | None):
+        """Shrink after a split-worthy failure on a range of `blocks` blocks."""
+        if is_block_range_limit_error(error_msg):
+            limit = max(self.min_size, blocks // 2)
+            self.ceiling = limit if self.ceiling is None else min(self.ceiling, limit)
+        self.size = self._clamp(min(self.size, blocks) // 2)
+        self.shrinks += 1
+
+
 # ============================================================================
 # Event Log Fetching (Direct RPC - High Performance)
 # ============================================================================
 
+def build_get_logs_filter(
+    contract_addresses: list[str],
+    from_block: int,
+    to_block: int,
+    topic0s: list[str] | None = None,
+) -> dict:
+    """eth_getLogs filter object for one block range, optionally restricted to an OR-list of topic0s."""
+    log_filter = {
+        "address": contract_addresses,
+        "fromBlock": hex(from_block),
+        "toBlock": hex(to_block)
+    }
+    if topic0s:
+        log_filter["topics"] = [topic0s]
+    return log_filter
+
+
+def classify_rpc_error(error: Any) -> str:
+    """Error message from a JSON-RPC error object, tagged RANGE_TOO_LARGE: when a smaller window may help."""
+    error_msg = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+    lower = error_msg.lower()
+    if is_rate_limit_error(error_msg):
+        return error_msg
+    if any(marker in lower for marker in RESULT_LIMIT_MARKERS) or is_block_range_limit_error(error_msg):
+        return f"RANGE_TOO_LARGE:{error_msg}"
+    return error_msg
+
+
+async def fetch_block_number(rpc: RpcPool, max_retries: int = 5) -> int:
+    """Latest block number via eth_blockNumber."""
+    payload = {"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 0}
+    last_error: str | Exception = "Max retries exceeded"
+    for attempt in range(max_retries):
+        try:
+            response = await rpc.post(payload, timeout=10.0)
+            data = await read_json(response)
+            if "error" in data:
+                last_error = classify_rpc_error(data["error"])
+            else:
+                return int(data["result"], 16)
+        except httpx.TimeoutException:
+            last_error = "Timeout"
+        except Exception as e:
+            last_error = e
+        if attempt < max_retries - 1:
+            await asyncio.sleep(fetch_retry_delay(attempt, last_error))
+    raise RuntimeError(f"eth_blockNumber failed: {last_error}")
+
+
+async def fetch_block_hashes(
+    rpc: RpcPool,
+    block_numbers: list[int],
+    max_retries: int = 5,
+) -> dict[int, str | None]:
+    """Canonical hashes of the given blocks in one JSON-RPC batch (None for blocks the node does not have)."""
+    payload = [
+        {"jsonrpc": "2.0", "method": "eth_getBlockByNumber", "params": [hex(n), False], "id": i}
+        for i, n in enumerate(block_numbers)
+    ]
+    if not payload:
+        return {}
+    last_error: str | Exception = "Max retries exceeded"
+    for attempt in range(max_retries):
+        try:
+            response = await rpc.post(payload, timeout=30.0)
+            data = await read_json(response)
+            if isinstance(data, dict):
+                # Whole-batch error object
+                raise RuntimeError(classify_rpc_error(data.get("error", data)))
+            by_id = {item.get("id"): item for item in data}
+            hashes: dict[int, str | None] = {}
+            for i, n in enumerate(block_numbers):
+                item = by_id.get(i)
+                if item is None or "error" in item:
+                    raise RuntimeError(classify_rpc_error(item["error"]) if item else f"missing reply for block {n}")
+                block = item.get("result")
+                hashes[n] = block.get("hash", "").lower() if block else None
+            return hashes
+        except httpx.TimeoutException:
+            last_error = "Timeout"
+        except Exception as e:
+            last_error = e
+        if attempt < max_retries - 1:
+            await asyncio.sleep(fetch_retry_delay(attempt, last_error))
+    raise RuntimeError(f"eth_getBlockByNumber failed: {last_error}")
+
+
 async def fetch_logs_range_rpc(
-    client: httpx.AsyncClient,
+    rpc: RpcPool,
     contract_addresses: list[str],
     from_block: int,
     to_block: int,
-    rpc_url: str,
     request_id: int,
-    max_retries: int = 5
+    max_retries: int = 5,
+    sizer: RangeSizer | None = None,
+    topic0s: list[str] | None = None,
 ) -> tuple[int, int, list[dict] | None, str | None]:
     """
     Fetch all logs for a specific block range for multiple contracts.
@@ -363,67 +987,184 @@ async def fetch_logs_range_rpc(
     payload = {
         "jsonrpc": "2.0",
         "method": "eth_getLogs",
-        "params": [{
-            "address": contract_addresses,
-            "fromBlock": hex(from_block),
-            "toBlock": hex(to_block)
-        }],
+        "params": [build_get_logs_filter(contract_addresses, from_block, to_block, topic0s)],
         "id": request_id
     }
     
     for attempt in range(max_retries):
         try:
-            response = await client.post(rpc_url, json=payload, timeout=30.0)
-            data = response.json()
+            started = time.monotonic()
+            response = await rpc.post(payload, timeout=30.0)
+            data = await read_json(response)
             
             if "error" in data:
-                error_msg = data["error"].get("message", str(data["error"]))
-                if "limit" in error_msg.lower() or "too many" in error_msg.lower():
-                    return (from_block, to_block, None, f"RANGE_TOO_LARGE:{error_msg}")
+                error_msg = classify_rpc_error(data["error"])
+                if error_msg.startswith("RANGE_TOO_LARGE:"):
+                    return (from_block, to_block, None, error_msg)
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(0.2)
+                    await asyncio.sleep(fetch_retry_delay(attempt, error_msg))
                     continue
                 return (from_block, to_block, None, error_msg)
             
             logs = data.get("result", [])
+            if sizer is not None:
+                sizer.observe(
+                    to_block - from_block + 1, len(logs), len(response.content),
+                    time.monotonic() - started
+                )
             return (from_block, to_block, logs, None)
             
         except httpx.TimeoutException:
             if attempt < max_retries - 1:
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(fetch_retry_delay(attempt))
                 continue
             return (from_block, to_block, None, "Timeout")
             
         except Exception as e:
             if attempt < max_retries - 1:
-                await asyncio.sleep(0.2)
+                await asyncio.sleep(fetch_retry_delay(attempt, e))
                 continue
             return (from_block, to_block, None, str(e))
     
     return (from_block, to_block, None, "Max retries exceeded")
 
 
+# Sub-ranges of one failed range fetched at the same time
+SPLIT_FANOUT = 4
+
+
+async def gather_cancelling(*coros) -> list:
+    """Like asyncio.gather, but the first failure cancels the remaining coroutines."""
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def fetch_logs_batch_rpc(
+    rpc: RpcPool,
+    contract_addresses: list[str],
+    ranges: list[tuple[int, int]],
+    request_id: int,
+    max_retries: int = 5,
+    sizer: RangeSizer | None = None,
+    topic0s: list[str] | None = None,
+) -> list[tuple[int, int, list[dict] | None, str | None]]:
+    """
+    Fetch several block ranges in one JSON-RPC batch POST.
+
+    Returns one (from, to, logs, error) tuple per range. Item errors are reported per
+    range so only the failing ranges are retried or split; transport errors retry the batch.
+    """
+    payload = [
+        {
+            "jsonrpc": "2.0",
+            "method": "eth_getLogs",
+            "params": [build_get_logs_filter(contract_addresses, lo, hi, topic0s)],
+            "id": i
+        }
+        for i, (lo, hi) in enumerate(ranges)
+    ]
+
+    error_msg = "Max retries exceeded"
+    for attempt in range(max_retries):
+        try:
+            started = time.monotonic()
+            response = await rpc.post(payload, timeout=60.0)
+            data = await read_json(response)
+            if isinstance(data, dict) and "error" in data:
+                raise RuntimeError(classify_rpc_error(data["error"]))
+            if not isinstance(data, list):
+                raise RuntimeError(f"Expected batch response list, got {type(data)}")
+            latency = time.monotonic() - started
+            by_id = {r.get("id"): r for r in data if isinstance(r, dict)}
+            total_logs = sum(
+                len(r["result"]) for r in by_id.values() if isinstance(r.get("result"), list)
+            )
+
+            results = []
+            for i, (lo, hi) in enumerate(ranges):
+                r = by_id.get(i)
+                if not isinstance(r, dict):
+                    results.append((lo, hi, None, "Missing batch item"))
+                elif "error" in r:
+                    results.append((lo, hi, None, classify_rpc_error(r["error"])))
+                elif not isinstance(r.get("result"), list):
+                    results.append((lo, hi, None, f"Unexpected result: {r.get('result')!r}"))
+                else:
+                    logs = r["result"]
+                    if sizer is not None:
+                        # Attribute the batch's bytes by log share and its latency evenly
+                        share = len(logs) / total_logs if total_logs else 1 / len(ranges)
+                        sizer.observe(hi - lo + 1, len(logs), int(len(response.content) * share), latency / len(ranges))
+                    results.append((lo, hi, logs, None))
+            return results
+
+        except httpx.TimeoutException:
+            error_msg = "Timeout"
+            if attempt < max_retries - 1:
+                await asyncio.sleep(fetch_retry_delay(attempt))
+                continue
+
+        except Exception as e:
+            error_msg = str(e)
+            if attempt < max_retries - 1:
+                await asyncio.sleep(fetch_retry_delay(attempt, e))
+                continue
+
+    return [(lo, hi, None, error_msg) for lo, hi in ranges]
+
+
 async def fetch_logs_with_split(
-    client: httpx.AsyncClient,
+    rpc: RpcPool,
     contract_addresses: list[str],
     from_block: int,
     to_block: int,
-    rpc_url: str,
     request_id: int,
-    max_retries: int = 5
+    max_retries: int = 5,
+    sizer: RangeSizer | None = None,
+    batch_size: int = 1,
+    topic0s: list[str] | None = None,
 ) -> list[dict]:
     """
     Fetch logs with automatic range splitting on failure.
     """
     result = await fetch_logs_range_rpc(
-        client, contract_addresses, from_block, to_block, 
-        rpc_url, request_id, max_retries
+        rpc, contract_addresses, from_block, to_block, 
+        request_id, max_retries, sizer, topic0s
     )
     
     if result[2] is not None:
         return result[2]
 
-    error_msg = result[3] or "Unknown error"
+    return await split_failed_range(
+        rpc, contract_addresses, from_block, to_block, result[3] or "Unknown error",
+        request_id, max_retries, sizer, batch_size, topic0s
+    )
+
+
+async def split_failed_range(
+    rpc: RpcPool,
+    contract_addresses: list[str],
+    from_block: int,
+    to_block: int,
+    error_msg: str,
+    request_id: int,
+    max_retries: int = 5,
+    sizer: RangeSizer | None = None,
+    batch_size: int = 1,
+    topic0s: list[str] | None = None,
+) -> list[dict]:
+    """
+    Re-fetch a failed range in smaller pieces.
+
+    With a sizer, the range is re-cut at the newly learned window and the pieces are
+    fetched concurrently (batched when batch_size > 1); without one it is bisected.
+    """
     if not should_split_fetch_error(error_msg):
         raise RuntimeError(f"failed to fetch logs for blocks {from_block}->{to_block}: {error_msg}")
 
@@ -431,281 +1172,1481 @@ async def fetch_logs_with_split(
         raise RuntimeError(
             f"failed to fetch logs for blocks {from_block}->{to_block} after retries: {error_msg}"
         )
-    
-    mid = (from_block + to_block) // 2
-    logs1 = await fetch_logs_with_split(
-        client, contract_addresses, from_block, mid,
-        rpc_url, request_id * 2, max_retries
-    )
-    logs2 = await fetch_logs_with_split(
-        client, contract_addresses, mid + 1, to_block,
-        rpc_url, request_id * 2 + 1, max_retries
-    )
-    
-    return logs1 + logs2
 
+    span = to_block - from_block + 1
+    if sizer is not None:
+        sizer.on_failure(span, error_msg)
+        piece = min(sizer.next_size(), (span + 1) // 2)
+    else:
+        piece = (span + 1) // 2
+
+    pieces = []
+    start = from_block
+    while start <= to_block:
+        end = min(start + piece - 1, to_block)
+        pieces.append((start, end))
+        start = end + 1
+
+    if batch_size > 1:
+        return await fetch_logs_batch_with_split(
+            rpc, contract_addresses, pieces, request_id * len(pieces), max_retries, sizer, batch_size,
+            topic0s
+        )
+
+    fanout = asyncio.Semaphore(SPLIT_FANOUT)
+
+    async def fetch_piece(i: int, lo: int, hi: int) -> list[dict]:
+        async with fanout:
+            return await fetch_logs_with_split(
+                rpc, contract_addresses, lo, hi,
+                request_id * len(pieces) + i, max_retries, sizer, topic0s=topic0s
+            )
+
+    results = await gather_cancelling(*(fetch_piece(i, lo, hi) for i, (lo, hi) in enumerate(pieces)))
+    return [entry for logs in results for entry in logs]
 
-async def fetch_all_logs_rpc(config: ProcessConfig, contracts: list[ProcessContractConfig]) -> list[dict]:
+
+async def fetch_logs_batch_with_split(
+    rpc: RpcPool,
+    contract_addresses: list[str],
+    ranges: list[tuple[int, int]],
+    request_id: int,
+    max_retries: int = 5,
+    sizer: RangeSizer | None = None,
+    batch_size: int = 10,
+    topic0s: list[str] | None = None,
+) -> list[dict]:
     """
-    Fetch logs intelligently. For each chunk, only include contracts that need syncing.
+    Fetch consecutive ranges as JSON-RPC batches of up to batch_size items, in block order.
+
+    Only the items that fail are split or retried on their own.
     """
-    # Find the global minimum start block across all contracts
-    min_from_block = min((c.from_block for c in contracts), default=config.to_block + 1)
-    
-    if min_from_block > config.to_block:
-        return []
-        
-    ranges = []
-    current = min_from_block
-    while current <= config.to_block:
-        end = min(current + config.max_blocks_per_request - 1, config.to_block)
-        ranges.append((current, end))
-        current = end + 1
-    
-    total_ranges = len(ranges)
-    total_blocks = config.to_block - min_from_block + 1
-    log(f"📦 Intelligent Block range: {min_from_block} → {config.to_block} ({total_blocks:,} blocks)")
-    log(f"⚙️  Processing {total_ranges} ranges with {config.max_concurrent_jobs} concurrent jobs...")
-    
-    semaphore = asyncio.Semaphore(config.max_concurrent_jobs)
-    limits = httpx.Limits(max_connections=config.max_concurrent_jobs + 20, max_keepalive_connections=50)
-    timeout = httpx.Timeout(30.0, connect=10.0)
-    
-    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
-        # Test connection with one address
-        test_address = contracts[0].address if contracts else None
-        if test_address:
-            log("🔗 Testing RPC connection...")
-            test_result = await fetch_logs_range_rpc(
-                client, [test_address],
-                min_from_block, min(min_from_block + 100, config.to_block),
-                config.rpc_url, 0, 1
+    batches = [ranges[i : i + batch_size] for i in range(0, len(ranges), batch_size)]
+    fanout = asyncio.Semaphore(SPLIT_FANOUT)
+
+    async def fetch_batch(i: int, batch: list[tuple[int, int]]) -> list[dict]:
+        async with fanout:
+            results = await fetch_logs_batch_rpc(
+                rpc, contract_addresses, batch, request_id + i, max_retries, sizer, topic0s
             )
-            if test_result[3]:
-                raise RuntimeError(f"RPC connection failed: {test_result[3]}")
-            log(f"✅ RPC connection OK")
-            
-        async def fetch_with_semaphore_and_split(chunk_start: int, chunk_end: int, req_id: int) -> list[dict]:
-            async with semaphore:
-                # Find contracts that actually need syncing in this chunk
-                # i.e., their from_block is <= chunk_end
-                active_contracts = [c for c in contracts if c.from_block <= chunk_end]
-                
-                if not active_contracts:
-                    return []
-                    
-                addresses = [c.address for c in active_contracts]
-                
-                logs = await fetch_logs_with_split(
-                    client,
-                    addresses,
-                    chunk_start,
-                    chunk_end,
-                    config.rpc_url,
-                    req_id,
-                    config.max_retries
-                )
-                
-                # Filter out logs that are older than the specific contract's from_block
-                # (since eth_getLogs might return logs for the whole chunk even if a contract only needed from the middle of the chunk)
-                valid_logs = []
-                for log_entry in logs:
-                    log_addr = to_checksum_address(log_entry.get('address', ''))
-                    log_block = int(log_entry.get('blockNumber', '0x0'), 16)
-                    
-                    contract = next((c for c in active_contracts if c.address == log_addr), None)
-                    if contract and log_block >= contract.from_block:
-                        valid_logs.append(log_entry)
-                        
-                return valid_logs
-        
-        tasks = [asyncio.create_task(fetch_with_semaphore_and_split(start, end, i)) for i, (start, end) in enumerate(ranges)]
-        
-        completed = 0
-        all_logs = []
-        start_time = datetime.now()
-        last_log_time = start_time
-        
-        log("🚀 Starting intelligent parallel fetch...")
-        try:
-            for coro in asyncio.as_completed(tasks):
-                logs = await coro
-                all_logs.extend(logs)
-                completed += 1
-                now = datetime.now()
-                if (now - last_log_time).total_seconds() >= 2 or completed == total_ranges or completed == 1:
-                    progress = completed * 100 // total_ranges
-                    elapsed = (now - start_time).total_seconds()
-                    rate = completed / elapsed if elapsed > 0 else 0
-                    eta = (total_ranges - completed) / rate if rate > 0 else 0
-                    log(f"🔄 Progress: {progress}% ({completed}/{total_ranges}) | {rate:.1f} req/s | ETA: {eta:.0f}s | Logs: {len(all_logs):,}")
-                    last_log_time = now
-        except Exception:
-            for task in tasks:
-                task.cancel()
-            await asyncio.gather(*tasks, return_exceptions=True)
-            raise
-    
-    return all_logs
-
+        logs: list[dict] = []
+        for j, (lo, hi, item_logs, error_msg) in enumerate(results):
+            if item_logs is not None:
+                logs.extend(item_logs)
+            elif should_split_fetch_error(error_msg) and lo < hi:
+                logs.extend(await split_failed_range(
+                    rpc, contract_addresses, lo, hi, error_msg,
+                    (request_id + i) * batch_size + j, max_retries, sizer, batch_size, topic0s
+                ))
+            else:
+                # Item-level errors that a smaller window won't fix get plain single-request retries
+                logs.extend(await fetch_logs_with_split(
+                    rpc, contract_addresses, lo, hi,
+                    (request_id + i) * batch_size + j, max_retries, sizer, topic0s=topic0s
+                ))
+        return logs
 
-def convert_rpc_log_to_event(log: dict) -> dict:
-    """Convert RPC log format to internal event format"""
-    return {
-        'blockNumber': int(log.get('blockNumber', '0x0'), 16),
-        'transactionHash': log.get('transactionHash', ''),
-        'transactionIndex': int(log.get('transactionIndex', '0x0'), 16),
-        'logIndex': int(log.get('logIndex', '0x0'), 16),
-        'address': log.get('address', ''),
-        'topics': log.get('topics', []),
-        'data': log.get('data', '0x')
-    }
+    results = await gather_cancelling(*(fetch_batch(i, batch) for i, batch in enumerate(batches)))
+    return [entry for logs in results for entry in logs]
 
 
 # ============================================================================
 # Event Decoding
 # ============================================================================
 
-def decode_event(event: dict, addr_topic_to_event_def: dict[str, dict[str, EventDef]]) -> dict | None:
-    """Decode a single event log into a dict of field values."""
-    topics = event.get('topics', [])
+# Distinct addresses whose checksum form is kept; logs repeat a small set of contracts and holders
+ADDRESS_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _checksum_lowercase_address(address: str) -> str:
+    return to_checksum_address(address)
+
+
+def checksum_address(address: Any) -> str:
+    """to_checksum_address, memoised by lowercased hex so each address is hashed once."""
+    if isinstance(address, str):
+        return _checksum_lowercase_address(address.lower())
+    return to_checksum_address(address)
+
+
+# Row columns a param of the same name overrides (log_round is always recomputed)
+RECORD_OVERRIDES = {
+    'contract_name': 'contract_name',
+    'event_name': 'event_name',
+    'blockNumber': 'block_number',
+    'blockHash': 'block_hash',
+    'transactionHash': 'tx_hash',
+    'transactionIndex': 'tx_index',
+    'logIndex': 'log_index',
+    'address': 'address',
+}
+RESERVED_COLUMNS = frozenset(RECORD_OVERRIDES) | {'log_round'}
+
+
+def _promote_address(value: Any) -> str | None:
+    return value.lower() if isinstance(value, str) else None
+
+
+def _promote_amount(value: Any) -> str | None:
+    # Decimal text: uint256 amounts overflow SQLite integers
+    return str(value) if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _promote_id(value: Any) -> int | None:
+    return value if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < 2**63 else None
+
+
+# Decoded params copied into real events columns at ingest, so dashboards filter on plain
+# B-tree indexes instead of json_extract. Candidates are tried in order and the first param the
+# event has wins: amount_raw takes value, then wad, then amount. Addresses are lowercased. A
+# column is NULL when its param has another JSON type, and action_id also past the signed 64-bit
+# INTEGER range. A column matches json_extract of one param only for events that have no earlier
+# candidate and an in-range value.
+PROMOTED_COLUMNS = (
+    ('account', ('account',), _promote_address),
+    ('from_address', ('from', 'src', '_from'), _promote_address),
+    ('to_address', ('to', 'dst', '_to'), _promote_address),
+    ('amount_raw', ('value', 'wad', 'amount'), _promote_amount),
+    ('token_address', ('tokenAddress', 'token'), _promote_address),
+    ('action_id', ('actionId',), _promote_id),
+)
+
+
+def promoted_param_names(param_names: Iterable[str]) -> tuple[str | None, ...]:
+    """Per PROMOTED_COLUMNS entry, the param feeding it (None if the event has none)."""
+    names = set(param_names)
+    return tuple(next((n for n in candidates if n in names), None) for _, candidates, _ in PROMOTED_COLUMNS)
+
+
+def promoted_values(values: dict, names: tuple[str | None, ...]) -> tuple:
+    """PROMOTED_COLUMNS values of one event's decoded params."""
+    return tuple(
+        promote(values.get(name)) if name is not None else None
+        for name, (_, _, promote) in zip(names, PROMOTED_COLUMNS)
+    )
+
+
+# json.dumps(..., default=str) without building an encoder per call
+_encode_json = json.JSONEncoder(default=str).encode
+
+# Field kinds in an EventDecoder plan
+FIELD_TOPIC = 0  # indexed param, read from topics[slot]
+FIELD_DATA = 1  # non-indexed param, element slot of the decoded data tuple
+FIELD_TUPLE = 2  # non-indexed tuple param, expanded into "name.component" columns
+
+
+def _topic_address(raw_value: str) -> Any:
+    if not raw_value: return None
+    try:
+        return checksum_address('0x' + raw_value[-40:])
+    except Exception:
+        return raw_value
+
+
+def _topic_int(raw_value: str) -> Any:
+    if not raw_value: return None
+    try:
+        return int(raw_value, 16)
+    except Exception:
+        return raw_value
+
+
+def _topic_bool(raw_value: str) -> Any:
+    if not raw_value: return None
+    try:
+        return int(raw_value, 16) != 0
+    except Exception:
+        return raw_value
+
+
+def _topic_raw(raw_value: str) -> Any:
+    return raw_value if raw_value else None
+
+
+def topic_decoder(param_type: str) -> Callable[[str], Any]:
+    """Converter for an indexed topic word of param_type."""
+    if param_type == 'address':
+        return _topic_address
+    if param_type.startswith('uint') or param_type.startswith('int'):
+        return _topic_int
+    if param_type == 'bool':
+        return _topic_bool
+    # bytesN, and hashes of dynamic types
+    return _topic_raw
+
+
+def _format_address(value: Any) -> Any:
+    if value is None: return ''
+    try:
+        return checksum_address(value) if value else ''
+    except Exception:
+        return str(value)
+
+
+def _format_array(value: Any) -> Any:
+    if value is None: return ''
+    try:
+        if isinstance(value, (list, tuple)):
+            return '[' + ';'.join(str(v) for v in value) + ']'
+        return str(value)
+    except Exception:
+        return str(value)
+
+
+def _format_bytes(value: Any) -> Any:
+    if value is None: return ''
+    if isinstance(value, bytes): return '0x' + value.hex()
+    return str(value)
+
+
+def _format_bool(value: Any) -> Any:
+    if value is None: return ''
+    return 'true' if value else 'false'
+
+
+def _format_plain(value: Any) -> Any:
+    if value is None: return ''
+    if isinstance(value, bytes): return '0x' + value.hex()
+    return value
+
+
+def value_formatter(param_type: str) -> Callable[[Any], Any]:
+    """Formatter turning an eth_abi value of param_type into its stored form."""
+    if param_type == 'address':
+        return _format_address
+    if param_type.endswith('[]'):
+        return _format_array
+    if param_type.startswith('bytes'):
+        return _format_bytes
+    if param_type == 'bool':
+        return _format_bool
+    return _format_plain
+
+
+_ZERO_WORD = bytes(32)
+
+
+def _word_uint(word: memoryview, bits: int) -> int:
+    value = int.from_bytes(word, 'big')
+    if value >> bits:
+        raise ValueError("non-empty padding bytes")
+    return value
+
+
+def _word_int(word: memoryview, bits: int) -> int:
+    value = int.from_bytes(word, 'big', signed=True)
+    if not -(1 << (bits - 1)) <= value < 1 << (bits - 1):
+        raise ValueError("non-empty padding bytes")
+    return value
+
+
+def _word_address(word: memoryview, _: int) -> str:
+    if word[:12] != _ZERO_WORD[:12]:
+        raise ValueError("non-empty padding bytes")
+    return '0x' + word[12:].hex()
+
+
+def _word_bool(word: memoryview, _: int) -> bool:
+    value = int.from_bytes(word, 'big')
+    if value > 1:
+        raise ValueError("non-empty padding bytes")
+    return value == 1
+
+
+def _word_fixed_bytes(word: memoryview, size: int) -> bytes:
+    if word[size:] != _ZERO_WORD[size:]:
+        raise ValueError("non-empty padding bytes")
+    return bytes(word[:size])
+
+
+_STATIC_TYPE_RE = re.compile(r'^(uint|int|bytes)(\d+)$')
+
+
+def static_word_decoder(param_type: str) -> tuple[Callable[[memoryview, int], Any], int] | None:
+    """(decoder, size) for a type that fills exactly one 32-byte word, None for anything else."""
+    if param_type == 'address':
+        return _word_address, 160
+    if param_type == 'bool':
+        return _word_bool, 1
+    match = _STATIC_TYPE_RE.match(param_type)
+    if not match:
+        return None
+    kind, size = match.group(1), int(match.group(2))
+    if kind == 'bytes':
+        return (_word_fixed_bytes, size) if 1 <= size <= 32 else None
+    if not 8 <= size <= 256 or size % 8:
+        return None
+    return (_word_uint, size) if kind == 'uint' else (_word_int, size)
+
+
+class EventDecoder:
+    """
+    Decoding plan for one event, compiled from its ABI params when the EventDef is built:
+    the eth_abi types of the data section, the topic / data slot of every param, tuple
+    column names and a converter per field. Holds no closures, so it pickles with its
+    EventDef; the eth_abi tuple decoder is rebuilt lazily after unpickling.
+
+    When every data field is a one-word static type (uintN, intN, address, bool, bytesN),
+    the data section is decoded by slicing 32-byte words, with the same padding checks
+    as eth_abi's strict mode. Dynamic types, tuples and any word that fails a check go
+    through eth_abi.
+
+    A log decodes to an EventRecord: the flat column values are zipped with the
+    precomputed column names straight into the decoded_data JSON. Columns named like a
+    row field (address, logIndex, ...) override that field and stay out of the JSON.
+    Params listed in PROMOTED_COLUMNS are also copied into their own columns.
+    """
+
+    def __init__(self, contract_name: str, event_name: str, params: list[EventParam]):
+        self.contract_name = contract_name
+        self.event_name = event_name
+        data_types = []
+        fields = []
+        topic_slot = 1
+        for param in params:
+            if param.indexed:
+                fields.append((FIELD_TOPIC, param.name, topic_slot, topic_decoder(param.type)))
+                topic_slot += 1
+            elif param.type == 'tuple' and param.components:
+                columns = tuple(
+                    (f"{param.name}.{comp.get('name', '')}", value_formatter(comp.get('type', '')))
+                    for comp in param.components
+                )
+                fields.append((FIELD_TUPLE, columns, len(data_types), None))
+                data_types.append(f"({','.join(comp.get('type', '') for comp in param.components)})")
+            else:
+                fields.append((FIELD_DATA, param.name, len(data_types), value_formatter(param.type)))
+                data_types.append(param.type)
+        self.data_types = tuple(data_types)
+        self.fields = tuple(fields)
+        columns = []
+        for kind, name, _, _ in fields:
+            if kind == FIELD_TUPLE:
+                columns.extend(col_name for col_name, _ in name)
+            else:
+                columns.append(name)
+        self.columns = tuple(columns)
+        self.reserved = tuple(c for c in dict.fromkeys(columns) if c in RESERVED_COLUMNS)
+        self.promoted = promoted_param_names(c for c in columns if c not in RESERVED_COLUMNS)
+        static_words = [static_word_decoder(t) for t in self.data_types]
+        self.static_words = tuple(static_words) if None not in static_words else None
+        self._tuple_decoder: TupleDecoder | None = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_tuple_decoder'] = None
+        return state
+
+    def decode_data(self, data: str) -> list:
+        """Non-indexed values in data order; all None when the data does not decode."""
+        if data == '0x' or not self.data_types:
+            return []
+        if self.static_words is not None:
+            try:
+                return self.decode_static_data(data)
+            except ValueError:
+                # Odd hex, short data or dirty padding: eth_abi decides what that means
+                pass
+        return self.decode_abi_data(data)
+
+    def decode_static_data(self, data: str) -> list:
+        buf = memoryview(bytes.fromhex(data[2:]))
+        if len(buf) < 32 * len(self.static_words):
+            raise ValueError("insufficient data bytes")
+        return [
+            decode_word(buf[offset:offset + 32], size)
+            for offset, (decode_word, size) in zip(range(0, len(buf), 32), self.static_words)
+        ]
+
+    def decode_abi_data(self, data: str) -> list:
+        try:
+            if self._tuple_decoder is None:
+                self._tuple_decoder = TupleDecoder(
+                    decoders=tuple(abi_registry.get_decoder(t) for t in self.data_types)
+                )
+            return list(self._tuple_decoder(ContextFramesBytesIO(bytes.fromhex(data[2:]))))
+        except Exception:
+            return [None] * len(self.data_types)
+
+    def decode_values(self, topics: list[str], data: str) -> list:
+        """Column values in self.columns order."""
+        values = []
+        decoded_data = self.decode_data(data)
+        for kind, name, slot, convert in self.fields:
+            if kind == FIELD_TOPIC:
+                values.append(convert(topics[slot]) if slot < len(topics) else None)
+            elif kind == FIELD_DATA:
+                values.append(convert(decoded_data[slot]) if slot < len(decoded_data) else None)
+            else:
+                raw_value = decoded_data[slot] if slot < len(decoded_data) else None
+                if isinstance(raw_value, (list, tuple)):
+                    for i, (_, format_column) in enumerate(name):
+                        values.append(format_column(raw_value[i] if i < len(raw_value) else None))
+                else:
+                    values.extend(None for _ in name)
+        return values
+
+    def record(
+        self,
+        block_number: int,
+        block_hash: str | None,
+        tx_hash: str,
+        tx_index: int,
+        log_index: int,
+        address: str,
+        topics: list[str],
+        data: str,
+        log_round: int | None = None,
+    ) -> EventRecord:
+        """Decode one log given its fields."""
+        values = dict(zip(self.columns, self.decode_values(topics, data)))
+        round_value = values.get('round') or values.get('currentRound')
+        if not self.reserved:
+            return EventRecord(
+                self.contract_name, self.event_name, log_round, round_value,
+                block_number, block_hash, tx_hash, tx_index, log_index, address, _encode_json(values),
+                *promoted_values(values, self.promoted),
+            )
+        overrides = {name: values.pop(name) for name in self.reserved}
+        record = EventRecord(
+            self.contract_name, self.event_name, log_round, round_value,
+            block_number, block_hash, tx_hash, tx_index, log_index, address, _encode_json(values),
+            *promoted_values(values, self.promoted),
+        )
+        return record._replace(**{
+            RECORD_OVERRIDES[name]: value for name, value in overrides.items() if name in RECORD_OVERRIDES
+        })
+
+    def decode(self, raw_log: dict, log_round: int | None = None) -> EventRecord:
+        """Decode one raw RPC log (eth_getLogs or receipt format)."""
+        return self.record(
+            int(raw_log.get('blockNumber', '0x0'), 16),
+            raw_log.get('blockHash'),
+            raw_log.get('transactionHash', ''),
+            int(raw_log.get('transactionIndex', '0x0'), 16),
+            int(raw_log.get('logIndex', '0x0'), 16),
+            raw_log.get('address', ''),
+            raw_log.get('topics') or [],
+            raw_log.get('data', '0x'),
+            log_round,
+        )
+
+
+def decode_event(raw_log: dict, addr_topic_to_event_def: dict[str, dict[str, EventDef]]) -> EventRecord | None:
+    """Decode a single raw RPC log."""
+    topics = raw_log.get('topics') or []
     if not topics:
         return None
-        
-    topic0 = topics[0]
-    address = to_checksum_address(event.get('address', ''))
-    
-    topic_to_event_def = addr_topic_to_event_def.get(address)
+
+    topic_to_event_def = addr_topic_to_event_def.get(checksum_address(raw_log.get('address', '')))
     if not topic_to_event_def:
         return None
-        
-    event_def = topic_to_event_def.get(topic0)
+
+    event_def = topic_to_event_def.get(topics[0])
     if not event_def:
         return None
-        
-    result = {
-        'contract_name': event_def.contract_name,
-        'event_name': event_def.name,
-        'blockNumber': event.get('blockNumber', ''),
-        'transactionHash': event.get('transactionHash', ''),
-        'transactionIndex': event.get('transactionIndex', ''),
-        'logIndex': event.get('logIndex', ''),
-        'address': event.get('address', '')
-    }
-    
-    data = event.get('data', '0x')
-    topic_index = 1
-    
-    non_indexed_types = []
-    
-    for param in event_def.params:
-        if not param.indexed:
-            if param.type == 'tuple' and param.components:
-                comp_types = tuple(c.get('type', '') for c in param.components)
-                non_indexed_types.append(comp_types)
+
+    return event_def.decoder.decode(raw_log)
+
+
+def decode_raw_logs(
+    raw_logs: list[dict],
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    origin_blocks: int,
+    phase_blocks: int,
+) -> tuple[list[EventRecord], list[dict]]:
+    """
+    Decode raw RPC logs. Returns (decoded_events, undecoded_logs), the latter being the raw
+    logs no EventDef matched. Reads the RPC dicts directly; no intermediate event dict is
+    built per log.
+    """
+    decoded_events = []
+    undecoded_logs = []
+    for raw_log in raw_logs:
+        topics = raw_log.get('topics') or []
+        address = raw_log.get('address', '')
+        block_number = int(raw_log.get('blockNumber', '0x0'), 16)
+        event_def = None
+        if topics:
+            topic_to_event_def = addr_topic_to_event_def.get(checksum_address(address))
+            if topic_to_event_def:
+                event_def = topic_to_event_def.get(topics[0])
+        if event_def:
+            decoded_events.append(event_def.decoder.record(
+                block_number,
+                raw_log.get('blockHash'),
+                raw_log.get('transactionHash', ''),
+                int(raw_log.get('transactionIndex', '0x0'), 16),
+                int(raw_log.get('logIndex', '0x0'), 16),
+                address,
+                topics,
+                raw_log.get('data', '0x'),
+                calc_round(block_number, origin_blocks, phase_blocks),
+            ))
+        else:
+            undecoded_logs.append(raw_log)
+    return decoded_events, undecoded_logs
+
+
+def describe_logs(raw_logs: list[dict], limit: int = 5) -> str:
+    """Short "block/address/topic0" samples of raw logs for messages."""
+    samples = []
+    for raw_log in raw_logs[:limit]:
+        topics = raw_log.get('topics') or []
+        samples.append(
+            f"block={int(raw_log.get('blockNumber', '0x0'), 16)} address={raw_log.get('address', '')} "
+            f"topic0={topics[0] if topics else ''}"
+        )
+    return "; ".join(samples)
+
+
+# Smallest shard worth a round trip to a decode worker process
+DECODE_SHARD_MIN_LOGS = 500
+
+# Event map of a decode worker process, set once by its initializer
+_worker_event_defs: dict[str, dict[str, EventDef]] = {}
+
+
+def init_decode_worker(addr_topic_to_event_def: dict[str, dict[str, EventDef]]):
+    global _worker_event_defs
+    _worker_event_defs = addr_topic_to_event_def
+
+
+def decode_raw_logs_in_worker(
+    raw_logs: list[dict], origin_blocks: int, phase_blocks: int
+) -> tuple[list[EventRecord], list[dict]]:
+    return decode_raw_logs(raw_logs, _worker_event_defs, origin_blocks, phase_blocks)
+
+
+def open_decode_pool(workers: int, addr_topic_to_event_def: dict[str, dict[str, EventDef]]) -> ProcessPoolExecutor:
+    """Worker processes that receive the event map once, at startup, instead of with every task."""
+    return ProcessPoolExecutor(
+        max_workers=workers, initializer=init_decode_worker, initargs=(addr_topic_to_event_def,)
+    )
+
+
+async def decode_raw_logs_parallel(
+    pool: ProcessPoolExecutor,
+    workers: int,
+    raw_logs: list[dict],
+    origin_blocks: int,
+    phase_blocks: int,
+) -> tuple[list[EventRecord], list[dict]]:
+    """decode_raw_logs sharded across the pool; shards are reassembled in the original order."""
+    if not raw_logs:
+        return [], []
+    shards = max(1, min(workers, len(raw_logs) // DECODE_SHARD_MIN_LOGS))
+    shard_size = -(-len(raw_logs) // shards)
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(
+            pool, decode_raw_logs_in_worker, raw_logs[start:start + shard_size], origin_blocks, phase_blocks
+        )
+        for start in range(0, len(raw_logs), shard_size)
+    ))
+    decoded_events = [event for decoded, _ in results for event in decoded]
+    undecoded_logs = [raw_log for _, undecoded in results for raw_log in undecoded]
+    return decoded_events, undecoded_logs
+
+
+# ============================================================================
+# Streaming Pipeline (fetch -> decode -> save)
+# ============================================================================
+
+# Ranges allowed in flight (fetching, queued, decoding or awaiting the writer)
+# per concurrent fetch job. Bounds peak memory independently of chain length.
+PIPELINE_WINDOW_FACTOR = 4
+
+
+@dataclass
+class RangeResult:
+    """Logs (raw or decoded) for one contiguous block range"""
+    index: int
+    from_block: int
+    to_block: int
+    logs: list  # raw RPC dicts from fetch_stage, EventRecords from decode_stage
+    addresses: list[str]  # addresses the range was fetched for
+    quarantined: list[dict] = field(default_factory=list)  # raw logs decode_stage could not match
+
+
+@dataclass
+class PipelineStats:
+    """Counters and per-stage busy time for one pipeline run"""
+    ranges_total: int = 0  # ranges dispatched so far; sizes are chosen adaptively
+    ranges_saved: int = 0
+    blocks_total: int = 0
+    blocks_saved: int = 0
+    raw_logs: int = 0
+    decoded_events: int = 0
+    quarantined: int = 0
+    inserted: int = 0
+    fetch_elapsed: float = 0.0  # wall time until the last range arrived
+    decode_elapsed: float = 0.0
+    write_elapsed: float = 0.0
+
+
+def merge_intervals(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort and coalesce overlapping or adjacent inclusive block intervals."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_intervals(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Blocks covered by both interval lists (inputs must be merged)."""
+    result: list[tuple[int, int]] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start <= end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class AddressProgress:
+    """
+    Durable sync progress of one address: a watermark (everything up to it is committed)
+    plus ranges committed ahead of it, which fold into the watermark once the gap closes.
+    """
+
+    def __init__(self, contract: ProcessContractConfig, covered: list[tuple[int, int]]):
+        self.address = contract.address
+        self.from_block = contract.from_block
+        self.contract_names = {ed.contract_name for ed in contract.event_defs.values()}
+        self.keys = {(ed.contract_name, ed.name) for ed in contract.event_defs.values()}
+        self.watermark = contract.from_block - 1
+        self.ahead: list[tuple[int, int]] = []
+        for start, end in covered:
+            self.add(start, end)
+
+    def covered_until(self, block: int) -> int:
+        """Last block of the committed run starting at block (block - 1 if block is not committed)."""
+        end = self.watermark if block <= self.watermark else block - 1
+        extended = True
+        while extended:
+            extended = False
+            for start, stop in self.ahead:
+                if start <= end + 1 and stop > end:
+                    end = stop
+                    extended = True
+        return end
+
+    def add(self, start: int, end: int) -> bool:
+        """Mark [start, end] committed. Returns True when the watermark moved."""
+        start = max(start, self.from_block)
+        if end < start or end <= self.watermark:
+            return False
+        self.ahead.append((start, end))
+        watermark = self.covered_until(self.watermark + 1)
+        if watermark <= self.watermark:
+            return False
+        self.watermark = watermark
+        self.ahead = [r for r in self.ahead if r[1] > watermark]
+        return True
+
+
+@dataclass
+class SyncUpdate:
+    """sync_status / sync_ranges writes for one address, applied with the range's events"""
+    contract_names: set[str]
+    keys: set[tuple[str, str]]
+    watermark: int | None  # new sync_status.last_block, if it moved
+    ahead: tuple[int, int] | None  # range still ahead of the watermark
+
+
+class SyncProgress:
+    """Per-address checkpoints for one pipeline run, restored from sync_status + sync_ranges."""
+
+    def __init__(self, contracts: list[ProcessContractConfig], synced_ranges: dict[str, list[tuple[int, int]]]):
+        self.addresses: dict[str, AddressProgress] = {}
+        for contract in contracts:
+            names = {ed.contract_name for ed in contract.event_defs.values()}
+            covered: list[tuple[int, int]] | None = None
+            # An address shared by several contract entries is only covered where all of them are
+            for name in names:
+                ranges = merge_intervals(synced_ranges.get(name, []))
+                covered = ranges if covered is None else intersect_intervals(covered, ranges)
+            self.addresses[contract.address] = AddressProgress(contract, covered or [])
+
+    def covered_until(self, block: int) -> int:
+        """Last block of the run starting at block that no address still needs (block - 1 if none)."""
+        end: int | None = None
+        for progress in self.addresses.values():
+            if progress.from_block > block:
+                address_end = progress.from_block - 1
             else:
-                non_indexed_types.append(param.type)
-    
-    decoded_data = []
-    if data != '0x' and non_indexed_types:
+                address_end = progress.covered_until(block)
+            end = address_end if end is None else min(end, address_end)
+        return block - 1 if end is None else end
+
+    def needs(self, address: str, from_block: int, to_block: int) -> bool:
+        progress = self.addresses[address]
+        return progress.covered_until(max(from_block, progress.from_block)) < to_block
+
+    def restored(self) -> list[SyncUpdate]:
+        """Watermarks already advanced by ranges saved in an earlier run."""
+        return [
+            SyncUpdate(p.contract_names, p.keys, p.watermark, None)
+            for p in self.addresses.values()
+            if p.watermark >= p.from_block
+        ]
+
+    def complete(self, addresses: list[str], from_block: int, to_block: int) -> list[SyncUpdate]:
+        """Record a committed range for the addresses it was fetched for."""
+        updates = []
+        for address in addresses:
+            progress = self.addresses[address]
+            moved = progress.add(from_block, to_block)
+            ahead = None
+            if to_block > progress.watermark:
+                ahead = (max(from_block, progress.from_block), to_block)
+            if moved or ahead:
+                updates.append(SyncUpdate(
+                    progress.contract_names, progress.keys,
+                    progress.watermark if moved else None, ahead
+                ))
+        return updates
+
+
+def apply_sync_updates(conn: sqlite3.Connection, updates: list[SyncUpdate]):
+    """Persist checkpoint changes (no commit); every moved watermark goes out in one sync_status statement."""
+    upsert_sync_status(conn, [
+        (contract_name, event_name, update.watermark)
+        for update in updates if update.watermark is not None
+        for contract_name, event_name in sorted(update.keys)
+    ], advance_only=True)
+    for update in updates:
+        if update.watermark is not None:
+            prune_synced_ranges(conn, update.contract_names, update.watermark)
+        if update.ahead is not None:
+            record_synced_range(conn, update.contract_names, *update.ahead)
+
+
+async def fetch_stage(
+    rpc: RpcPool,
+    config: ProcessConfig,
+    contracts: list[ProcessContractConfig],
+    from_block: int,
+    sizer: RangeSizer,
+    progress: SyncProgress,
+    window: asyncio.Semaphore,
+    out_queue: asyncio.Queue,
+    stats: PipelineStats,
+):
+    """
+    Fetch ranges concurrently and push each completed RangeResult as soon as it arrives.
+    Requests in flight are bounded by the pool's adaptive limit, ranges by the window.
+    """
+
+    async def fetch_range(index: int, chunk_start: int, chunk_end: int):
         try:
-            type_strs = []
-            for t in non_indexed_types:
-                if isinstance(t, tuple):
-                    type_strs.append(f"({','.join(t)})")
+            # Find contracts that actually need syncing in this chunk
+            # i.e., their from_block is <= chunk_end and an earlier run did not already save it
+            active_contracts = [
+                c for c in contracts
+                if c.from_block <= chunk_end and progress.needs(c.address, chunk_start, chunk_end)
+            ]
+            valid_logs = []
+            if active_contracts:
+                addresses = [c.address for c in active_contracts]
+                # OR-list of every topic0 the active contracts can decode
+                topic0s = sorted({t for c in active_contracts for t in c.event_defs}) if config.topic_filter else None
+                requested_topics = set(topic0s or ())
+                if config.logs_batch_size > 1:
+                    # One batch POST carrying logs_batch_size windows of this chunk
+                    piece = -(-(chunk_end - chunk_start + 1) // config.logs_batch_size)
+                    sub_ranges = [
+                        (lo, min(lo + piece - 1, chunk_end))
+                        for lo in range(chunk_start, chunk_end + 1, piece)
+                    ]
+                    logs = await fetch_logs_batch_with_split(
+                        rpc,
+                        addresses,
+                        sub_ranges,
+                        index * config.logs_batch_size,
+                        config.max_retries,
+                        sizer,
+                        config.logs_batch_size,
+                        topic0s
+                    )
                 else:
-                    type_strs.append(t)
-            
-            decoded_data = list(decode(type_strs, bytes.fromhex(data[2:])))
-        except Exception:
-            decoded_data = [None] * len(non_indexed_types)
-    
-    data_index = 0
-    for param in event_def.params:
-        if param.indexed:
-            if topic_index < len(topics):
-                raw_value = topics[topic_index]
-                value = decode_indexed_value(raw_value, param.type)
-                topic_index += 1
+                    logs = await fetch_logs_with_split(
+                        rpc,
+                        addresses,
+                        chunk_start,
+                        chunk_end,
+                        index,
+                        config.max_retries,
+                        sizer,
+                        topic0s=topic0s
+                    )
+
+                # Filter out logs that are older than the specific contract's from_block
+                # (since eth_getLogs might return logs for the whole chunk even if a contract only needed from the middle of the chunk)
+                contracts_by_address = {c.address.lower(): c for c in active_contracts}
+                for log_entry in logs:
+                    contract = contracts_by_address.get(log_entry.get('address', '').lower())
+                    if not contract or int(log_entry.get('blockNumber', '0x0'), 16) < contract.from_block:
+                        continue
+                    # The topic OR-list is shared by all addresses in the request, so drop
+                    # topics requested for another contract that this one does not track
+                    if requested_topics:
+                        log_topics = log_entry.get('topics') or []
+                        if log_topics and log_topics[0] in requested_topics and log_topics[0] not in contract.event_defs:
+                            continue
+                    valid_logs.append(log_entry)
+            stats.raw_logs += len(valid_logs)
+            await out_queue.put(RangeResult(
+                index, chunk_start, chunk_end, valid_logs, [c.address for c in active_contracts]
+            ))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Hand the failure downstream so the pipeline aborts instead of waiting on this range
+            await out_queue.put(e)
+
+    # Finished fetches drop out, so the set holds only the ranges in flight (bounded by the window)
+    tasks: set[asyncio.Task] = set()
+    started = datetime.now()
+    try:
+        cursor = from_block
+        while cursor <= config.to_block:
+            # Jump over blocks that ranges saved by an interrupted run already cover
+            covered_end = min(progress.covered_until(cursor), config.to_block)
+            if covered_end >= cursor:
+                log(f"⏭️  Blocks {cursor} → {covered_end} already saved, skipping")
+                stats.blocks_saved += covered_end - cursor + 1
+                cursor = covered_end + 1
+                continue
+            # Window slots are released by the writer once a range is committed
+            await window.acquire()
+            # Size is read at dispatch time so each range uses the latest learned window;
+            # in batch mode one range carries logs_batch_size windows
+            end = min(cursor + sizer.next_size() * max(config.logs_batch_size, 1) - 1, config.to_block)
+            task = asyncio.create_task(fetch_range(stats.ranges_total, cursor, end))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            stats.ranges_total += 1
+            cursor = end + 1
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    stats.fetch_elapsed = (datetime.now() - started).total_seconds()
+    await out_queue.put(None)
+
+
+async def decode_off_loop(
+    raw_logs: list[dict],
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    config: ProcessConfig,
+    stats: PipelineStats,
+    decode_pool: ProcessPoolExecutor | None = None,
+) -> tuple[list[EventRecord], list[dict]]:
+    """
+    decode_raw_logs off the event loop so fetching keeps going: in a thread, or sharded
+    across worker processes with --decode-workers. Counts the results into stats.
+    """
+    started = datetime.now()
+    if decode_pool is not None:
+        decoded, undecoded = await decode_raw_logs_parallel(
+            decode_pool, config.decode_workers, raw_logs,
+            config.origin_blocks, config.phase_blocks
+        )
+    else:
+        decoded, undecoded = await asyncio.to_thread(
+            decode_raw_logs, raw_logs, addr_topic_to_event_def,
+            config.origin_blocks, config.phase_blocks
+        )
+    stats.decode_elapsed += (datetime.now() - started).total_seconds()
+    if undecoded:
+        if not stats.quarantined:
+            log(f"⚠️  Quarantining {len(undecoded)} undecodable logs. Samples: {describe_logs(undecoded)}")
+        stats.quarantined += len(undecoded)
+    stats.decoded_events += len(decoded)
+    return decoded, undecoded
+
+
+async def decode_stage(
+    in_queue: asyncio.Queue,
+    out_queue: asyncio.Queue,
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    config: ProcessConfig,
+    stats: PipelineStats,
+    decode_pool: ProcessPoolExecutor | None = None,
+):
+    """Decode ranges as they arrive and pass them on to the writer."""
+    while True:
+        item = await in_queue.get()
+        if item is None:
+            break
+        if isinstance(item, Exception):
+            raise item
+        decoded, undecoded = await decode_off_loop(item.logs, addr_topic_to_event_def, config, stats, decode_pool)
+        await out_queue.put(
+            RangeResult(item.index, item.from_block, item.to_block, decoded, item.addresses, undecoded)
+        )
+    await out_queue.put(None)
+
+
+# raw_logs decoded and committed per transaction behind the fetcher (--raw-first, --decode-raw)
+RAW_DECODE_BATCH_SIZE = 5000
+
+
+async def raw_decode_stage(
+    writer: "EventWriter",
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    config: ProcessConfig,
+    stats: PipelineStats,
+    committed: asyncio.Event,
+    writes_done: asyncio.Event,
+    decode_pool: ProcessPoolExecutor | None = None,
+):
+    """
+    Decode raw_logs past the decode watermark while the writer keeps storing new ones
+    (--raw-first). Woken by each raw commit; returns once the writer has finished and
+    the watermark has caught up with everything it stored.
+    """
+    last_id = await writer.call(load_decode_watermark)
+    while True:
+        committed.clear()
+        finished = writes_done.is_set()
+        batch = await writer.call(load_raw_logs, last_id, RAW_DECODE_BATCH_SIZE)
+        if not batch:
+            if finished:
+                break
+            await committed.wait()
+            continue
+        last_id = batch[-1][0]
+        decoded, undecoded = await decode_off_loop(
+            [raw_log for _, raw_log in batch], addr_topic_to_event_def, config, stats, decode_pool
+        )
+        started = datetime.now()
+        stats.inserted += await writer.call(commit_raw_decode, last_id, decoded, undecoded)
+        stats.write_elapsed += (datetime.now() - started).total_seconds()
+
+
+class EventWriter:
+    """A dedicated thread running database work on the process's writer connection, off the event loop."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-writer")
+
+    def _run(self, fn, *args):
+        with writer(self.db_path) as conn:
+            return fn(conn, *args)
+
+    async def open(self):
+        # Connect before the first range arrives
+        await self.call(lambda conn: None)
+
+    async def call(self, fn, *args):
+        """Run fn(conn, *args) on the writer thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._run, fn, *args)
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def commit_range(
+    conn: sqlite3.Connection,
+    events: list[EventRecord],
+    updates: list[SyncUpdate],
+    block_hashes: dict[int, str] | None = None,
+    quarantined: list[dict] | None = None,
+    raw_logs: list[dict] | None = None,
+) -> int:
+    """
+    Insert one range's events, quarantined logs and (--raw-first) raw logs together with
+    its checkpoint. Returns inserted event count.
+    """
+    try:
+        inserted = insert_events(conn, events)
+        if quarantined:
+            quarantine_logs(conn, quarantined)
+        if raw_logs:
+            store_raw_logs(conn, raw_logs)
+        apply_sync_updates(conn, updates)
+        if block_hashes:
+            save_block_hashes(conn, block_hashes)
+        conn.commit()
+        return inserted
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def commit_raw_decode(
+    conn: sqlite3.Connection,
+    last_id: int,
+    events: list[EventRecord],
+    undecoded: list[dict],
+    replaced: list[dict] | None = None,
+) -> int:
+    """
+    Commit one decoded batch of raw_logs and raise the decode watermark to last_id.
+    Rows of the replaced raw logs are deleted from events and quarantined_logs first
+    (re-decoding after an ABI fix). Returns inserted event count.
+    """
+    try:
+        if replaced:
+            keys = [(row[2], row[4]) for row in map(raw_log_row, replaced)]
+            conn.executemany("DELETE FROM events WHERE tx_hash = ? AND log_index = ?", keys)
+            conn.executemany("DELETE FROM quarantined_logs WHERE tx_hash = ? AND log_index = ?", keys)
+        inserted = insert_events(conn, events)
+        if undecoded:
+            quarantine_logs(conn, undecoded)
+        conn.execute(
+            '''INSERT INTO decode_status (id, last_raw_id, updated_at) VALUES (1, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   last_raw_id = MAX(last_raw_id, excluded.last_raw_id),
+                   updated_at = excluded.updated_at''',
+            (last_id, datetime.now().isoformat()),
+        )
+        conn.commit()
+        return inserted
+    except Exception:
+        conn.rollback()
+        raise
+
+
+@dataclass
+class PipelineSession:
+    """RPC pool, writer connection, decode workers and learned window reused across pipeline runs (--follow)"""
+    rpc: RpcPool
+    writer: EventWriter
+    sizer: RangeSizer
+    connection_checked: bool = False
+    runs: int = 0
+    decode_pool: ProcessPoolExecutor | None = None  # started by the first run that needs it
+
+
+def open_rpc_pool(config: ProcessConfig) -> RpcPool:
+    return RpcPool(
+        parse_rpc_urls(config.rpc_url),
+        max_connections=config.max_concurrent_jobs + 20,
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        hedge=config.hedge_requests,
+        rps=config.rps,
+        concurrency=config.max_concurrent_jobs,
+    )
+
+
+@asynccontextmanager
+async def open_pipeline_session(config: ProcessConfig):
+    sizer = RangeSizer(
+        config.max_blocks_per_request,
+        min_size=config.min_blocks_per_request,
+        max_size=config.max_range_blocks,
+        target_logs=config.target_logs_per_request,
+        target_latency=config.target_request_latency,
+    )
+    writer = EventWriter(config.db_path)
+    async with open_rpc_pool(config) as rpc:
+        await writer.open()
+        session = PipelineSession(rpc, writer, sizer)
+        try:
+            yield session
+        finally:
+            if session.decode_pool is not None:
+                session.decode_pool.shutdown(cancel_futures=True)
+            await writer.close()
+
+
+async def decode_pending_raw_logs(
+    session: PipelineSession,
+    config: ProcessConfig,
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+) -> PipelineStats:
+    """
+    Decode raw_logs from the decode watermark up to MAX(raw_logs.id) before a --raw-first sync.
+    A run that died after storing has already advanced sync_status past them, so without this
+    they would wait for the next range to fetch (or --decode-raw).
+    """
+    stats = PipelineStats()
+    committed, writes_done = asyncio.Event(), asyncio.Event()
+    writes_done.set()
+    await raw_decode_stage(
+        session.writer, addr_topic_to_event_def, config, stats, committed, writes_done, session.decode_pool
+    )
+    if stats.decoded_events or stats.quarantined:
+        log(
+            f"🧩 Decoded {stats.decoded_events + stats.quarantined} pending raw logs: "
+            f"{stats.inserted} new rows, {stats.quarantined} quarantined"
+        )
+    return stats
+
+
+async def write_stage(
+    in_queue: asyncio.Queue,
+    window: asyncio.Semaphore,
+    config: ProcessConfig,
+    writer: EventWriter,
+    progress: SyncProgress,
+    sizer: RangeSizer,
+    stats: PipelineStats,
+    verbose: bool = True,
+    rpc: RpcPool | None = None,
+    committed: asyncio.Event | None = None,
+):
+    """
+    Commit each decoded range as it arrives on the writer connection. Events and the
+    checkpoint move together: sync_status advances per address over the contiguous prefix,
+    later ranges are parked in sync_ranges until the gap below them is filled.
+    With --raw-first the ranges arrive undecoded and are stored in raw_logs; committed
+    is set after each one to wake the raw decoder.
+    """
+    # Fold in ranges an interrupted run saved right above its watermark
+    restored = progress.restored()
+    if restored:
+        await writer.call(commit_range, [], restored)
+
+    # Hashes of log blocks this close to the target join the reorg check window
+    hash_window_start = config.to_block - config.reorg_window + 1 if config.reorg_window > 0 else None
+    start_time = datetime.now()
+    last_log_time = start_time
+    while True:
+        item = await in_queue.get()
+        if item is None:
+            break
+        if isinstance(item, Exception):
+            raise item
+        updates = progress.complete(item.addresses, item.from_block, item.to_block)
+        block_hashes = None
+        if hash_window_start is not None and item.to_block >= hash_window_start:
+            if config.raw_first:
+                log_blocks = (
+                    (int(raw_log.get('blockNumber', '0x0'), 16), raw_log.get('blockHash')) for raw_log in item.logs
+                )
             else:
-                value = None
-            result[param.name] = value
+                log_blocks = ((event.block_number, event.block_hash) for event in item.logs)
+            block_hashes = {
+                number: block_hash.lower()
+                for number, block_hash in log_blocks
+                if number >= hash_window_start and block_hash
+            }
+        started = datetime.now()
+        if config.raw_first:
+            await writer.call(commit_range, [], updates, block_hashes, None, item.logs)
+            committed.set()
         else:
-            if data_index < len(decoded_data):
-                raw_value = decoded_data[data_index]
-                if param.type == 'tuple' and param.components:
-                    if isinstance(raw_value, (list, tuple)):
-                        for i, comp in enumerate(param.components):
-                            col_name = f"{param.name}.{comp.get('name', '')}"
-                            comp_value = raw_value[i] if i < len(raw_value) else None
-                            result[col_name] = format_value(comp_value, comp.get('type', ''))
-                    else:
-                        for comp in param.components:
-                            col_name = f"{param.name}.{comp.get('name', '')}"
-                            result[col_name] = None
-                else:
-                    result[param.name] = format_value(raw_value, param.type)
-                data_index += 1
-            else:
-                if param.type == 'tuple' and param.components:
-                    for comp in param.components:
-                        col_name = f"{param.name}.{comp.get('name', '')}"
-                        result[col_name] = None
-                else:
-                    result[param.name] = None
-    
-    return result
+            stats.inserted += await writer.call(commit_range, item.logs, updates, block_hashes, item.quarantined)
+        stats.write_elapsed += (datetime.now() - started).total_seconds()
+        stats.ranges_saved += 1
+        stats.blocks_saved += item.to_block - item.from_block + 1
+        window.release()
+
+        now = datetime.now()
+        milestone = verbose and (stats.ranges_saved == 1 or stats.blocks_saved == stats.blocks_total)
+        if (now - last_log_time).total_seconds() >= 2 or milestone:
+            progress_pct = stats.blocks_saved * 100 // stats.blocks_total if stats.blocks_total else 100
+            elapsed = (now - start_time).total_seconds()
+            rate = stats.blocks_saved / elapsed if elapsed > 0 else 0
+            eta = (stats.blocks_total - stats.blocks_saved) / rate if rate > 0 else 0
+            concurrency = rpc.concurrency_status() if rpc is not None else ""
+            log(
+                f"🔄 Progress: {progress_pct}% ({stats.ranges_saved} ranges, {stats.blocks_saved:,}/{stats.blocks_total:,} blocks) | "
+                f"{rate:,.0f} blocks/s | ETA: {eta:.0f}s | Window: {sizer.next_size():,} blocks | "
+                + (f"{concurrency.capitalize()} | " if concurrency else "")
+                + f"Logs: {stats.raw_logs:,} | Saved: {stats.inserted:,}"
+            )
+            last_log_time = now
 
+    if stats.ranges_saved != stats.ranges_total:
+        raise RuntimeError(f"pipeline ended after {stats.ranges_saved}/{stats.ranges_total} ranges")
+    behind = [p.address for p in progress.addresses.values() if p.watermark < config.to_block]
+    if behind:
+        raise RuntimeError(f"sync_status did not reach {config.to_block} for {', '.join(behind)}")
 
-def decode_indexed_value(raw_value: str, param_type: str) -> Any:
-    if not raw_value: return None
+
+async def run_pipeline(
+    config: ProcessConfig,
+    contracts: list[ProcessContractConfig],
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    session: PipelineSession | None = None,
+) -> PipelineStats:
+    """
+    Stream logs through fetch -> decode -> save. Ranges are decoded and committed as soon
+    as they arrive, so at most a bounded window of ranges is held in memory, and progress
+    is checkpointed per range so an interrupted run resumes where it stopped.
+    """
+    if session is None:
+        async with open_pipeline_session(config) as session:
+            return await run_pipeline(config, contracts, addr_topic_to_event_def, session)
+
+    # Follow-mode increments after the first run only log a one-line summary
+    verbose = session.runs == 0
+    session.runs += 1
+    stats = PipelineStats()
+    # Find the global minimum start block across all contracts
+    min_from_block = min((c.from_block for c in contracts), default=config.to_block + 1)
+    stats.blocks_total = max(config.to_block - min_from_block + 1, 0)
+    sizer = session.sizer
+
+    synced_ranges = await session.writer.call(
+        load_synced_ranges, {ed.contract_name for c in contracts for ed in c.event_defs.values()}
+    )
+    progress = SyncProgress(contracts, synced_ranges)
+
+    if verbose:
+        log(f"📦 Intelligent Block range: {min_from_block} → {config.to_block} ({stats.blocks_total:,} blocks)")
+        log(
+            f"⚙️  Adaptive windows of {sizer.min_size:,}-{sizer.max_size:,} blocks "
+            f"(initial {sizer.next_size():,}) with up to {config.max_concurrent_jobs} adaptive concurrent requests..."
+        )
+        if config.logs_batch_size > 1:
+            log(f"📨 JSON-RPC batch mode: {config.logs_batch_size} eth_getLogs ranges per POST")
+
+    # Test connection with one address
+    test_address = contracts[0].address if contracts else None
+    if test_address and stats.blocks_total and not session.connection_checked:
+        log("🔗 Testing RPC connection...")
+        test_result = await fetch_logs_range_rpc(
+            session.rpc, [test_address],
+            min_from_block, min(min_from_block + 100, config.to_block),
+            0, 1
+        )
+        if test_result[3]:
+            raise RuntimeError(f"RPC connection failed: {test_result[3]}")
+        session.connection_checked = True
+        log(f"✅ RPC connection OK")
+
+    if config.decode_workers > 1 and session.decode_pool is None:
+        session.decode_pool = open_decode_pool(config.decode_workers, addr_topic_to_event_def)
+        log(f"🧮 Decoding with {config.decode_workers} worker processes")
+
+    window = asyncio.Semaphore(max(config.max_concurrent_jobs * PIPELINE_WINDOW_FACTOR, 1))
+    fetched_queue: asyncio.Queue = asyncio.Queue(maxsize=max(config.max_concurrent_jobs, 1))
+    decoded_queue: asyncio.Queue = asyncio.Queue(maxsize=max(config.max_concurrent_jobs, 1))
+
+    fetch = fetch_stage(session.rpc, config, contracts, min_from_block, sizer, progress, window, fetched_queue, stats)
+    if config.raw_first:
+        # Store raw logs as fetched; decoding trails the writer and never holds up the window
+        committed = asyncio.Event()
+        writes_done = asyncio.Event()
+
+        async def write_raw():
+            await write_stage(
+                fetched_queue, window, config, session.writer, progress, sizer, stats, verbose, session.rpc, committed
+            )
+            writes_done.set()
+            committed.set()
+
+        if verbose:
+            log("🚀 Starting streaming fetch → save raw pipeline, decoding behind the writer...")
+        await gather_cancelling(
+            fetch,
+            write_raw(),
+            raw_decode_stage(
+                session.writer, addr_topic_to_event_def, config, stats, committed, writes_done, session.decode_pool
+            ),
+        )
+    else:
+        if verbose:
+            log("🚀 Starting streaming fetch → decode → save pipeline...")
+        await gather_cancelling(
+            fetch,
+            decode_stage(fetched_queue, decoded_queue, addr_topic_to_event_def, config, stats, session.decode_pool),
+            write_stage(decoded_queue, window, config, session.writer, progress, sizer, stats, verbose, session.rpc),
+        )
+    if verbose:
+        log(
+            f"📏 Range sizing: {stats.ranges_total} ranges, final window {sizer.next_size():,} blocks "
+            f"({sizer.grows} grows, {sizer.shrinks} shrinks"
+            + (f", node range ceiling {sizer.ceiling:,}" if sizer.ceiling is not None else "")
+            + ")"
+        )
+        if len(session.rpc.endpoints) > 1:
+            for line in session.rpc.summary().splitlines():
+                log(f"🌐 {line}")
+        elif session.rpc.limiter is not None:
+            log(f"🚦 {session.rpc.concurrency_status().capitalize()} ({session.rpc.limiter.drops} overload backoffs)")
+
+    return stats
+
+
+# ============================================================================
+# Reorg Handling
+# ============================================================================
+
+def commit_rollback(conn: sqlite3.Connection, block: int) -> int:
     try:
-        if param_type == 'address':
-            addr = '0x' + raw_value[-40:]
-            return to_checksum_address(addr)
-        elif param_type.startswith('uint') or param_type.startswith('int'):
-            return int(raw_value, 16)
-        elif param_type == 'bool':
-            return int(raw_value, 16) != 0
-        elif param_type.startswith('bytes'):
-            return raw_value
-        else:
-            return raw_value
+        deleted = rollback_after_block(conn, block)
+        conn.commit()
+        return deleted
     except Exception:
-        return raw_value
+        conn.rollback()
+        raise
 
 
-def format_value(value: Any, param_type: str) -> Any:
-    if value is None: return ''
+def commit_block_hashes(conn: sqlite3.Connection, hashes: dict[int, str], keep_from: int | None = None):
     try:
-        if param_type == 'address':
-            return to_checksum_address(value) if value else ''
-        elif param_type.endswith('[]'):
-            if isinstance(value, (list, tuple)):
-                return '[' + ';'.join(str(v) for v in value) + ']'
-            return str(value)
-        elif param_type.startswith('bytes'):
-            if isinstance(value, bytes): return '0x' + value.hex()
-            return str(value)
-        elif param_type == 'bool':
-            return 'true' if value else 'false'
-        elif isinstance(value, bytes):
-            return '0x' + value.hex()
-        else:
-            return value
+        save_block_hashes(conn, hashes, keep_from)
+        conn.commit()
     except Exception:
-        return str(value) if value is not None else ''
+        conn.rollback()
+        raise
+
+
+async def reconcile_head_window(session: PipelineSession, config: ProcessConfig) -> tuple[int | None, str | None]:
+    """
+    Check the stored recent block hashes against the node before syncing up to config.to_block.
+    On divergence, roll back everything above the newest stored block that still matches.
+    Returns (fork block or None, canonical hash of config.to_block). The target hash is read
+    before its logs, so a reorg racing the sync shows up as a mismatch on the next run.
+    """
+    if config.reorg_window <= 0:
+        return None, None
+    stored = await session.writer.call(load_recent_block_hashes, config.reorg_window)
+    newest = max(stored) if stored else None
+    probe = {config.to_block} | ({newest} if newest is not None else set())
+    canonical = await fetch_block_hashes(session.rpc, sorted(probe), config.max_retries)
+    tip_hash = canonical.get(config.to_block)
+    # A matching newest hash vouches for every block below it
+    if newest is None or canonical.get(newest) in (None, stored[newest]):
+        return None, tip_hash
+
+    canonical.update(await fetch_block_hashes(session.rpc, sorted(stored), config.max_retries))
+    diverged = [n for n, h in stored.items() if canonical.get(n) is not None and canonical[n] != h]
+    if not diverged:
+        return None, tip_hash
+    first_diverged = min(diverged)
+    matching = [n for n, h in stored.items() if n < first_diverged and canonical.get(n) == h]
+    if matching:
+        fork_block = max(matching)
+    else:
+        fork_block = min(stored) - 1
+        log(f"⚠️  Reorg reaches below the {config.reorg_window}-block hash window, rolling back to its start")
+    deleted = await session.writer.call(commit_rollback, fork_block)
+    log(f"♻️  Reorg detected at block {first_diverged}: rolled back to {fork_block}, deleted {deleted} events")
+    return fork_block, tip_hash
+
+
+async def record_sync_target(session: PipelineSession, config: ProcessConfig, tip_hash: str | None):
+    """Remember the hash of a fully synced target and prune the window below it."""
+    if tip_hash and config.reorg_window > 0:
+        await session.writer.call(
+            commit_block_hashes, {config.to_block: tip_hash}, config.to_block - config.reorg_window + 1
+        )
+
+
+def refresh_from_blocks(
+    config: ProcessConfig,
+    contracts: list[ProcessContractConfig],
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    to_block: int,
+):
+    """Re-read each address's from_block from sync_status after a rollback or failed run."""
+    for c in contracts:
+        c.from_block = get_min_from_block_for_address(config.db_path, c.address, addr_topic_to_event_def, to_block)
 
 
 # ============================================================================
 # Main Processing
 # ============================================================================
 
+# Quarantined logs decoded and committed per transaction by --redecode-quarantine
+REDECODE_BATCH_SIZE = 5000
+
+
+def redecode_quarantine(config: ProcessConfig, addr_topic_to_event_def: dict[str, dict[str, EventDef]]) -> bool:
+    """
+    Decode quarantined_logs with the current event map, without RPC. Logs that now match
+    move to events; the rest stay quarantined. sync_status is left alone. Only fetched logs
+    were quarantined: with the topic filter on (the default) that excludes events missing
+    from the ABIs at fetch time, which need --no-topic-filter for the blocks involved instead.
+    """
+    decoded_total = 0
+    samples: list[dict] = []
+    after_rowid = 0
+    with writer(config.db_path) as conn:
+        try:
+            while True:
+                batch = load_quarantined_logs(conn, after_rowid, REDECODE_BATCH_SIZE)
+                if not batch:
+                    break
+                after_rowid = batch[-1][0]
+                decoded, undecoded = decode_raw_logs(
+                    [raw_log for _, raw_log in batch], addr_topic_to_event_def,
+                    config.origin_blocks, config.phase_blocks
+                )
+                samples.extend(undecoded[:max(0, 5 - len(samples))])
+                if decoded:
+                    insert_events(conn, decoded)
+                    conn.executemany(
+                        "DELETE FROM quarantined_logs WHERE tx_hash = ? AND log_index = ?",
+                        [(event.tx_hash, event.log_index) for event in decoded],
+                    )
+                    conn.commit()
+                decoded_total += len(decoded)
+            left = conn.execute("SELECT COUNT(*) FROM quarantined_logs").fetchone()[0]
+        except Exception as e:
+            conn.rollback()
+            log(f"❌ Re-decoding quarantined logs failed: {e}")
+            return False
+    log(f"✅ Re-decoded {decoded_total} quarantined logs into events, {left} still quarantined")
+    if samples:
+        log(f"   Still unknown: {describe_logs(samples)}")
+    return True
+
+
+def decode_stored_raw_logs(
+    config: ProcessConfig,
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+    redecode_all: bool = False,
+) -> bool:
+    """
+    Decode raw_logs without RPC: those past the decode watermark, or with redecode_all every
+    stored log, replacing its events / quarantine rows (after an ABI fix). sync_status is left alone.
+    """
+    stats = PipelineStats()
+    with writer(config.db_path) as conn:
+        try:
+            last_id = 0 if redecode_all else load_decode_watermark(conn)
+            while True:
+                batch = load_raw_logs(conn, last_id, RAW_DECODE_BATCH_SIZE)
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                raw_logs = [raw_log for _, raw_log in batch]
+                decoded, undecoded = decode_raw_logs(
+                    raw_logs, addr_topic_to_event_def, config.origin_blocks, config.phase_blocks
+                )
+                stats.inserted += commit_raw_decode(
+                    conn, last_id, decoded, undecoded, raw_logs if redecode_all else None
+                )
+                stats.raw_logs += len(raw_logs)
+                stats.decoded_events += len(decoded)
+                stats.quarantined += len(undecoded)
+        except Exception as e:
+            log(f"❌ Decoding raw_logs failed: {e}")
+            return False
+    log(
+        f"✅ Decoded {stats.raw_logs} raw logs: {stats.decoded_events} events "
+        f"({stats.inserted} new rows), {stats.quarantined} quarantined"
+    )
+    return True
+
+
 async def process_events(config: ProcessConfig) -> bool:
     log("")
     log("━" * 50)
-    log(f"🚀 High Performance Event Processor (Direct RPC - Batch Mode)")
-    log(f"🌐 RPC: {config.rpc_url}")
+    log(f"🚀 High Performance Event Processor (Direct RPC - Streaming Mode)")
+    if config.rpc_url:
+        log(f"🌐 RPC: {config.rpc_url}")
     log("━" * 50)
     
     start_time = datetime.now()
@@ -721,40 +2662,36 @@ async def process_events(config: ProcessConfig) -> bool:
         log("❌ A database path (--db-path) is required to store events.")
         return False
         
-    addr_topic_to_event_def: dict[str, dict[str, EventDef]] = {}
-    
-    # Build addr_topic_to_event_def from all configs
-    for c in contracts_info:
-        name = c['name']
+    if config.abi_cache is None:
+        abi_cache = os.path.join(os.path.dirname(config.db_path) or '.', 'abi_cache.json')
+    else:
+        abi_cache = config.abi_cache or None
+    registry = AbiRegistry(abi_cache)
+    try:
+        addr_topic_to_event_def = build_event_def_map(contracts_info, config.origin_blocks, registry)
+    except ValueError as e:
+        log(f"❌ {e}")
+        return False
+    try:
+        registry.save()
+    except OSError as e:
+        log(f"⚠️  Could not write ABI cache {abi_cache}: {e}")
+    log(f"📚 ABIs: {registry.cache_hits} from cache, {registry.parsed} parsed")
+
+    if config.redecode_quarantine:
+        return redecode_quarantine(config, addr_topic_to_event_def)
+    if config.decode_raw:
+        return decode_stored_raw_logs(config, addr_topic_to_event_def, config.decode_raw == 'all')
+
+    if config.to_block is None:
         try:
-            contract_start_block = resolve_contract_start_block(c, config.origin_blocks)
-        except ValueError as e:
-            log(f"❌ Invalid start block for {name}: {e}")
+            async with open_rpc_pool(config) as rpc:
+                head = await fetch_block_number(rpc, config.max_retries)
+        except Exception as e:
+            log(f"❌ Failed to resolve chain head: {e}")
             return False
-        env_var = c.get('address_env_var')
-        if env_var:
-            raw_address = os.environ.get(env_var)
-            if not raw_address:
-                log(f"⚠️  Skipping {name}: Environment variable {env_var} not found")
-                continue
-        else:
-            raw_address = c.get('address')
-        if not raw_address:
-            log(f"⚠️  Skipping {name}: No address provided")
-            continue
-
-        address = to_checksum_address(raw_address)
-        abi_files = c.get('abi_files')
-        if not abi_files:
-            log(f"⚠️  Skipping {name}: No abi_files provided")
-            continue
-        event_defs = {}
-        for abi_path in abi_files:
-            abi = load_abi(abi_path)
-            event_defs.update(get_all_event_defs(abi, name, contract_start_block))
-        if address not in addr_topic_to_event_def:
-            addr_topic_to_event_def[address] = {}
-        addr_topic_to_event_def[address].update(event_defs)
+        config = replace(config, to_block=max(head - config.confirmations, 0))
+        log(f"🔝 Chain head {head}, syncing to {config.to_block} ({config.confirmations} confirmations)")
 
     # Compute from_block per address (min across all contract+event for that address)
     contract_configs: list[ProcessContractConfig] = []
@@ -781,77 +2718,43 @@ async def process_events(config: ProcessConfig) -> bool:
         ))
 
     log(f"✅ Loaded {len(contract_configs)} unique addresses with event defs.")
-    
-    fetch_elapsed = 0.0
-    decode_elapsed = 0.0
-    new_event_count = 0
-    
-    # Identify contracts that actually need syncing
-    contracts_to_sync = [c for c in contract_configs if c.from_block <= config.to_block]
-    if not contracts_to_sync:
-        log(f"\n✅ All contracts are already up to date (to_block={config.to_block})")
-    else:
-        log(f"\n📡 Fetching event logs for {len(contracts_to_sync)} addresses...")
-        fetch_start = datetime.now()
-        try:
-            raw_logs = await fetch_all_logs_rpc(config, contracts_to_sync)
-        except Exception as e:
-            log(f"❌ Event fetch failed: {e}")
-            return False
-        fetch_elapsed = (datetime.now() - fetch_start).total_seconds()
-        log(f"✅ Fetched {len(raw_logs)} total logs in {fetch_elapsed:.2f}s")
-        
-        all_synced_keys = {
-            (ed.contract_name, ed.name)
-            for c in contracts_to_sync
-            for ed in c.event_defs.values()
-        }
-        if raw_logs:
-            log("\n🔓 Decoding events dynamically by address and topic0...")
-            decode_start = datetime.now()
-            decoded_events = []
-            undecoded_count = 0
-            undecoded_samples: list[str] = []
-            for i, raw_log in enumerate(raw_logs):
-                event = convert_rpc_log_to_event(raw_log)
-                decoded = decode_event(event, addr_topic_to_event_def)
-                if decoded:
-                    decoded['log_round'] = calc_round(
-                        decoded.get('blockNumber', 0), config.origin_blocks, config.phase_blocks
-                    )
-                    decoded_events.append(decoded)
-                else:
-                    undecoded_count += 1
-                    if len(undecoded_samples) < 5:
-                        topic0 = raw_log.get('topics', [''])[0] if raw_log.get('topics') else ''
-                        undecoded_samples.append(
-                            f"block={event['blockNumber']} address={event['address']} topic0={topic0}"
-                        )
-                if (i + 1) % 5000 == 0:
-                    log(f"   Decoded {i + 1}/{len(raw_logs)} events...")
-            decode_elapsed = (datetime.now() - decode_start).total_seconds()
-            if undecoded_count:
-                sample_text = "; ".join(undecoded_samples)
-                log(f"❌ Failed to decode {undecoded_count} logs. Samples: {sample_text}")
-                return False
-            log(f"✅ Successfully decoded {len(decoded_events)} known events in {decode_elapsed:.2f}s")
-            new_event_count = len(decoded_events)
-            log(f"\n💾 Saving {new_event_count} events to SQLite...")
-            try:
-                inserted = save_events_to_db(
-                    config.db_path, decoded_events, config.to_block, all_synced_keys
-                )
-            except Exception as e:
-                log(f"❌ Failed to save events: {e}")
-                return False
-            log(f"✅ Inserted {inserted} new rows (duplicates ignored)")
+
+    if config.follow:
+        return await follow_events(config, contract_configs, addr_topic_to_event_def)
+
+    stats = PipelineStats()
+    try:
+        async with open_pipeline_session(config) as session:
+            fork_block, tip_hash = await reconcile_head_window(session, config)
+            if fork_block is not None:
+                refresh_from_blocks(config, contract_configs, addr_topic_to_event_def, config.to_block)
+            if config.raw_first:
+                await decode_pending_raw_logs(session, config, addr_topic_to_event_def)
+
+            # Identify contracts that actually need syncing
+            contracts_to_sync = [c for c in contract_configs if c.from_block <= config.to_block]
+            if not contracts_to_sync:
+                log(f"\n✅ All contracts are already up to date (to_block={config.to_block})")
+            else:
+                log(f"\n📡 Streaming event logs for {len(contracts_to_sync)} addresses...")
+                stats = await run_pipeline(config, contracts_to_sync, addr_topic_to_event_def, session)
+            await record_sync_target(session, config, tip_hash)
+    except Exception as e:
+        log(f"❌ Event pipeline failed: {e}")
+        log("   Committed ranges are checkpointed; rerun to resume from sync_status / sync_ranges")
+        return False
+    if contracts_to_sync:
+        log(f"✅ Fetched {stats.raw_logs} logs, decoded {stats.decoded_events} known events")
+        if stats.decoded_events:
+            log(f"✅ Inserted {stats.inserted} new rows (duplicates ignored)")
         else:
-            try:
-                save_events_to_db(config.db_path, [], config.to_block, all_synced_keys)
-            except Exception as e:
-                log(f"❌ Failed to advance sync_status: {e}")
-                return False
             log("📌 No new events in this batch (sync_status updated to to_block)")
+        if stats.quarantined:
+            log(
+                f"⚠️  Quarantined {stats.quarantined} undecodable logs in quarantined_logs; "
+                f"rerun with --redecode-quarantine after updating the ABIs"
+            )
+    new_event_count = stats.decoded_events
     
     # Final report
     elapsed = (datetime.now() - start_time).total_seconds()
@@ -862,30 +2765,131 @@ async def process_events(config: ProcessConfig) -> bool:
     log("━" * 50)
     log(f"✅ Processed {new_event_count} new events")
     log(f"⏱️  Total time: {elapsed:.2f}s ({events_per_sec:.0f} events/s)")
-    if fetch_elapsed > 0:
-        log(f"   - Fetching: {fetch_elapsed:.2f}s")
-    if decode_elapsed > 0:
-        log(f"   - Decoding: {decode_elapsed:.2f}s")
+    if stats.fetch_elapsed > 0:
+        log(f"   - Fetching: {stats.fetch_elapsed:.2f}s (decode and save overlap with fetch)")
+    if stats.decode_elapsed > 0:
+        log(f"   - Decoding: {stats.decode_elapsed:.2f}s")
+    if stats.write_elapsed > 0:
+        log(f"   - Saving: {stats.write_elapsed:.2f}s")
     log(f"📁 SQLite DB: {config.db_path}")
     
     return True
 
 
+async def follow_events(
+    config: ProcessConfig,
+    contracts: list[ProcessContractConfig],
+    addr_topic_to_event_def: dict[str, dict[str, EventDef]],
+) -> bool:
+    """
+    Stay resident: sync up to the head, then poll eth_blockNumber and stream each new
+    confirmed span through the same RPC pool, decoders and writer connection.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass  # no signal handlers on this platform; Ctrl-C still raises KeyboardInterrupt
+
+    log(
+        f"\n👀 Follow mode: polling every {config.poll_interval:g}s, "
+        f"{config.confirmations} confirmations"
+    )
+    target = config.to_block
+    try:
+        async with open_pipeline_session(config) as session:
+            while True:
+                cycle_config = replace(config, to_block=target)
+                try:
+                    fork_block, tip_hash = await reconcile_head_window(session, cycle_config)
+                    if fork_block is not None:
+                        refresh_from_blocks(config, contracts, addr_topic_to_event_def, target)
+                    if config.raw_first:
+                        await decode_pending_raw_logs(session, cycle_config, addr_topic_to_event_def)
+                    pending = [c for c in contracts if c.from_block <= target]
+                    if pending:
+                        from_block = min(c.from_block for c in pending)
+                        started = datetime.now()
+                        stats = await run_pipeline(cycle_config, pending, addr_topic_to_event_def, session)
+                        for c in pending:
+                            c.from_block = target + 1
+                        await record_sync_target(session, cycle_config, tip_hash)
+                        elapsed = (datetime.now() - started).total_seconds()
+                        log(
+                            f"🆕 Synced {from_block} → {target}: {stats.raw_logs} logs, "
+                            f"{stats.inserted} new rows ({elapsed:.2f}s)"
+                        )
+                except Exception as e:
+                    log(f"❌ Sync to {target} failed: {e}")
+                    # Committed ranges are checkpointed; pick up from them on the next poll
+                    refresh_from_blocks(config, contracts, addr_topic_to_event_def, target)
+
+                await asyncio.sleep(config.poll_interval)
+                try:
+                    head = await fetch_block_number(session.rpc, config.max_retries)
+                except Exception as e:
+                    log(f"⚠️  {e}")
+                    continue
+                target = max(target, head - config.confirmations)
+    except asyncio.CancelledError:
+        log("🛑 Follow mode stopped")
+        return True
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='LOVE20 Event Log Processor - Intelligent Batch Implementation'
     )
     parser.add_argument('--config', required=True, help='Path to JSON config containing contracts info')
-    parser.add_argument('--rpc', '-r', required=True, help='RPC URL')
-    parser.add_argument('--to-block', '-t', type=int, required=True, help='Ending block number')
-    parser.add_argument('--max-blocks', type=int, default=4000, help='Max blocks per request')
-    parser.add_argument('--concurrency', type=int, default=10, help='Max concurrent requests')
+    parser.add_argument('--rpc', '-r',
+                        help='RPC URL, or comma-separated URLs to spread requests over the healthiest endpoint')
+    parser.add_argument('--hedge', action='store_true',
+                        help='With several RPC URLs, re-send requests slower than the p95 latency to a second endpoint')
+    parser.add_argument('--rps', type=float, default=0.0,
+                        help='Max requests per second per RPC endpoint, e.g. the provider plan limit (0 = unlimited)')
+    parser.add_argument('--to-block', '-t', type=int, help='Ending block number (default: chain head minus --confirmations)')
+    parser.add_argument('--max-blocks', type=int, default=4000, help='Initial blocks per request (adapted at runtime)')
+    parser.add_argument('--min-blocks', type=int, default=1, help='Smallest adaptive window in blocks')
+    parser.add_argument('--max-range-blocks', type=int, default=500000, help='Largest adaptive window in blocks')
+    parser.add_argument('--target-logs', type=int, default=5000, help='Logs per response the window sizer aims for')
+    parser.add_argument('--target-latency', type=float, default=5.0, help='Seconds per response the window sizer aims for')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='Ceiling for concurrent requests; the live limit adapts below it to latency and errors')
     parser.add_argument('--retries', type=int, default=3, help='Max retries per request')
+    parser.add_argument('--no-topic-filter', action='store_true',
+                        help='Fetch every log of tracked addresses instead of only known event topics, so logs '
+                             'of events missing from the ABIs are quarantined and --redecode-quarantine can recover them')
+    parser.add_argument('--logs-batch-size', type=int, default=1,
+                        help='Pack this many eth_getLogs ranges into one JSON-RPC batch POST (1 disables batching)')
+    parser.add_argument('--decode-workers', type=int, default=0,
+                        help='Decode logs in this many worker processes (useful for large backfills; 0 = one thread)')
+    parser.add_argument('--abi-cache',
+                        help="Compiled ABI cache file (default: abi_cache.json next to --db-path; '' disables)")
     parser.add_argument('--db-path', required=True, help='SQLite database path for persistent storage')
     parser.add_argument('--origin-blocks', type=int, default=0, help='Global Origin block number')
     parser.add_argument('--phase-blocks', type=int, default=0, help='Blocks per round for round calculation')
+    parser.add_argument('--follow', action='store_true',
+                        help='Stay resident and ingest new blocks as the chain head advances')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between head polls in --follow mode')
+    parser.add_argument('--confirmations', type=int, default=0, help='Blocks to stay behind the chain head')
+    parser.add_argument('--reorg-window', type=int, default=64,
+                        help='Recent blocks whose hashes are re-checked for reorgs before each sync (0 disables)')
+    parser.add_argument('--redecode-quarantine', action='store_true',
+                        help='Decode quarantined_logs with the current ABIs instead of syncing (no RPC calls); '
+                             'logs of unknown topics are only there if they were fetched with --no-topic-filter')
+    parser.add_argument('--raw-first', action='store_true',
+                        help='Store fetched logs in raw_logs and decode them into events behind the fetcher')
+    parser.add_argument('--decode-raw', nargs='?', const='pending', choices=('pending', 'all'),
+                        help="Decode raw_logs instead of syncing (no RPC calls): past the decode watermark, "
+                             "or 'all' to re-decode every stored log after an ABI fix")
     
     args = parser.parse_args()
+    if not args.rpc and not args.redecode_quarantine and not args.decode_raw:
+        parser.error('--rpc is required')
+    if args.follow and args.to_block is not None:
+        parser.error('--to-block cannot be combined with --follow')
     
     if args.db_path:
         os.makedirs(os.path.dirname(args.db_path), exist_ok=True)
@@ -895,11 +2899,28 @@ def main():
         rpc_url=args.rpc,
         to_block=args.to_block,
         max_blocks_per_request=args.max_blocks,
+        min_blocks_per_request=args.min_blocks,
+        max_range_blocks=args.max_range_blocks,
+        target_logs_per_request=args.target_logs,
+        target_request_latency=args.target_latency,
         max_concurrent_jobs=args.concurrency,
         max_retries=args.retries,
+        logs_batch_size=args.logs_batch_size,
+        topic_filter=not args.no_topic_filter,
         db_path=args.db_path,
         origin_blocks=args.origin_blocks,
-        phase_blocks=args.phase_blocks
+        phase_blocks=args.phase_blocks,
+        follow=args.follow,
+        poll_interval=args.poll_interval,
+        confirmations=args.confirmations,
+        reorg_window=args.reorg_window,
+        hedge_requests=args.hedge,
+        rps=args.rps,
+        decode_workers=args.decode_workers,
+        abi_cache=args.abi_cache,
+        redecode_quarantine=args.redecode_quarantine,
+        raw_first=args.raw_first,
+        decode_raw=args.decode_raw
     )
     
     try:
@@ -8,6 +8,8 @@ from pathlib import Path
 
 import httpx
 
+from rpc_client import RpcPool, parse_rpc_urls, read_json
+
 
 def hex_to_int(value):
     if value is None:
@@ -83,18 +85,17 @@ def get_canonical_transactions(db_path: str, tx_hashes: list[str]) -> dict[str,
         conn.close()
 
 
-async def rpc_batch(client: httpx.AsyncClient, rpc_url: str, requests: list[dict]) -> list[dict]:
-    response = await client.post(rpc_url, json=requests)
+async def rpc_batch(rpc: RpcPool, requests: list[dict]) -> list[dict]:
+    response = await rpc.post(requests)
     response.raise_for_status()
-    data = response.json()
+    data = await read_json(response)
     if not isinstance(data, list):
         raise RuntimeError(f"expected batch response list, got {type(data)}")
     return data
 
 
 async def fetch_transaction_counts(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     block_numbers: list[int],
 ) -> dict[int, int]:
     requests = [
@@ -106,7 +107,7 @@ async def fetch_transaction_counts(
         }
         for block_number in block_numbers
     ]
-    results = await rpc_batch(client, rpc_url, requests)
+    results = await rpc_batch(rpc, requests)
     raw_counts = {}
     for item in results:
         block_number = int(item["id"])
@@ -117,8 +118,7 @@ async def fetch_transaction_counts(
 
 
 async def fetch_blocks_fulltx(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     block_numbers: list[int],
 ) -> dict[int, dict]:
     requests = [
@@ -130,7 +130,7 @@ async def fetch_blocks_fulltx(
         }
         for block_number in block_numbers
     ]
-    results = await rpc_batch(client, rpc_url, requests)
+    results = await rpc_batch(rpc, requests)
     blocks = {}
     for item in results:
         block_number = int(item["id"])
@@ -141,8 +141,7 @@ async def fetch_blocks_fulltx(
 
 
 async def find_candidate_blocks(
-    client: httpx.AsyncClient,
-    rpc_url: str,
+    rpc: RpcPool,
     db_path: str,
     start_block: int,
     end_block: int,
@@ -156,7 +155,7 @@ async def find_candidate_blocks(
     async def worker(batch: list[int]) -> list[tuple[int, int, int]]:
         async with sem:
             db_counts = get_block_counts(db_path, batch)
-            rpc_counts = await fetch_transaction_counts(client, rpc_url, batch)
+            rpc_counts = await fetch_transaction_counts(rpc, batch)
         mismatches = []
         for block_number in batch:
             db_count = db_counts.get(block_number, 0)
@@ -192,11 +191,13 @@ async def export_duplicates(
     start_block, end_block = get_block_range(db_path)
     print(f"scanning blocks {start_block} -> {end_block}", flush=True)
 
-    limits = httpx.Limits(max_connections=concurrency + 10, max_keepalive_connections=50)
-    timeout = httpx.Timeout(120.0, connect=10.0)
-    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+    async with RpcPool(
+        parse_rpc_urls(rpc_url),
+        max_connections=concurrency + 10,
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    ) as rpc:
         candidates = await find_candidate_blocks(
-            client, rpc_url, db_path, start_block, end_block, scan_batch_size, concurrency
+            rpc, db_path, start_block, end_block, scan_batch_size, concurrency
         )
 
         print(f"candidate mismatched blocks: {len(candidates):,}", flush=True)
@@ -225,7 +226,7 @@ async def export_duplicates(
             candidate_count_map = {block_number: (raw_count, db_count) for block_number, raw_count, db_count in candidates}
 
             for i, batch in enumerate(chunked(candidate_blocks, fetch_batch_size), start=1):
-                blocks = await fetch_blocks_fulltx(client, rpc_url, batch)
+                blocks = await fetch_blocks_fulltx(rpc, batch)
                 tx_hashes = []
                 for block_number in batch:
                     for tx in blocks[block_number].get("transactions") or []:
@@ -277,7 +278,7 @@ async def export_duplicates(
 
 def main():
     parser = argparse.ArgumentParser(description="Export duplicate tx hashes that appear in raw block fullTx across multiple blocks.")
-    parser.add_argument("--rpc", required=True, help="RPC URL")
+    parser.add_argument("--rpc", required=True, help="RPC URL, or comma-separated URLs for the RPC pool")
     parser.add_argument("--db-path", required=True, help="Path to SQLite db")
     parser.add_argument("--output", required=True, help="CSV output path")
     parser.add_argument("--scan-batch-size", type=int, default=500, help="Blocks per tx-count scan batch")
@@ -58,10 +58,12 @@ release_sync_lock() {
   SYNC_LOCK_ACQUIRED=0
 }
 
+# RPC_URLS (optional, comma-separated) lets the processors spread requests over several
+# endpoints; RPC_URL alone is still used for cast calls and as the single-endpoint default.
 run_event_processor() {
   "$PYTHON_CMD" "$PYTHON_PROCESSOR" \
     --config "$CONFIG_FILE" \
-    --rpc "$RPC_URL" \
+    --rpc "${RPC_URLS:-$RPC_URL}" \
     --to-block "$to_block" \
     --max-blocks "$maxBlocksPerRequest" \
     --concurrency "$maxConcurrentJobs" \
@@ -175,12 +177,12 @@ main() {
   echo "====================================================================="
 
   $PYTHON_CMD "$BLOCK_PROCESSOR" \
-    --rpc "$RPC_URL" \
+    --rpc "${RPC_URLS:-$RPC_URL}" \
     --to-block "$to_block" \
     --db-path "$db_dir/events.db" \
     --origin-blocks "$originBlocks" \
     --batch-size 500 \
-    --concurrency 20 \
+    --concurrency "${maxBlockConcurrency:-20}" \
     --retries "$maxRetries"
 
   block_exit=$?
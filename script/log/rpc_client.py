@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Shared JSON-RPC client for the LOVE20 processors.
+
+RpcPool spreads requests over one or more endpoints. Each endpoint keeps latency and
+error EWMAs; every request goes to the healthiest endpoint, so a slow or failing node
+is drained instead of stalling retries. With hedging enabled, a request still running
+after the endpoint's p95 latency is duplicated to the next-best endpoint and the first
+good answer wins.
+
+Each endpoint can also be capped to a request rate (token bucket). HTTP 429 replies park
+the endpoint for its Retry-After, and retry_delay() gives callers jittered exponential
+backoff instead of fixed sleeps, so throttled retries do not arrive as one herd.
+
+Requests in flight are bounded by an adaptive limit (gradient style) instead of a fixed
+semaphore: it grows while latency stays near its long-run baseline and shrinks when
+latency climbs or requests fail, up to the configured ceiling.
+
+read_json() parses large response bodies (dense eth_getLogs ranges, full-tx block
+batches) in slices, yielding to the event loop between them, so one multi-megabyte
+parse does not stall every other request in flight.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import httpx
+
+# Weight of the newest sample in the latency / error moving averages
+EWMA_ALPHA = 0.2
+# Error scores fade with this half-life (seconds) so a recovered node gets traffic back
+ERROR_HALF_LIFE = 30.0
+# Latency samples kept per endpoint for the hedging percentile
+LATENCY_SAMPLES = 200
+# Hedge only once an endpoint has this many samples to estimate its p95 from
+HEDGE_MIN_SAMPLES = 20
+# Pause after a 429 that carries no usable Retry-After (seconds)
+DEFAULT_THROTTLE_DELAY = 1.0
+# Retry backoff: full jitter over base * 2^attempt, capped
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 10.0
+
+
+class RpcRateLimited(RuntimeError):
+    """The endpoint answered 429 Too Many Requests."""
+
+    def __init__(self, url: str, retry_after: float):
+        super().__init__(f"rate limited by {url}, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After header as seconds from now (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def retry_delay(attempt: int, error: BaseException | None = None, base: float | None = None) -> float:
+    """Full-jitter exponential backoff for retry attempt (0-based), never shorter than a Retry-After."""
+    base = RETRY_BASE_DELAY if base is None else base
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, base * 2 ** attempt))
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return delay
+
+
+# Bodies at least this large are parsed incrementally; smaller ones are cheaper in one call
+JSON_STREAM_MIN_BYTES = 256 * 1024
+# Characters parsed between yields to the event loop
+JSON_SLICE_CHARS = 128 * 1024
+
+_json_decoder = json.JSONDecoder()
+_json_whitespace = re.compile(r'[ \t\n\r]*')
+_JSON_SPACE = frozenset(' \t\n\r')
+
+
+class _JsonSlices:
+    """
+    Generator-based JSON parser that pauses every JSON_SLICE_CHARS characters. Objects and
+    the top-level array (a batch) are walked here; items of any other array (logs, block
+    transactions) are handed whole to the C decoder. The result equals json.loads() while
+    no single step parses more than one log or transaction.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.next_pause = JSON_SLICE_CHARS
+
+    def skip(self, idx: int) -> int:
+        if self.text[idx:idx + 1] in _JSON_SPACE:
+            return _json_whitespace.match(self.text, idx).end()
+        return idx
+
+    def expect(self, idx: int, closing: str) -> tuple[bool, int]:
+        """After an item: (True, idx past closing) at the end of the container, else (False, idx past ',')."""
+        idx = self.skip(idx)
+        char = self.text[idx:idx + 1]
+        if char == closing:
+            return True, idx + 1
+        if char != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", self.text, idx)
+        return False, self.skip(idx + 1)
+
+    def document(self):
+        value, end = yield from self.value(0, top_level=True)
+        end = self.skip(end)
+        if end != len(self.text):
+            raise json.JSONDecodeError("Extra data", self.text, end)
+        return value
+
+    def value(self, idx: int, top_level: bool = False):
+        idx = self.skip(idx)
+        char = self.text[idx:idx + 1]
+        if char == '{':
+            return (yield from self.object(idx + 1))
+        if char == '[':
+            return (yield from self.array(idx + 1, top_level))
+        value, end = _json_decoder.raw_decode(self.text, idx)
+        return value, end
+
+    def object(self, idx: int):
+        text = self.text
+        obj = {}
+        idx = self.skip(idx)
+        if text.startswith('}', idx):
+            return obj, idx + 1
+        while True:
+            if not text.startswith('"', idx):
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, idx)
+            key, idx = json.decoder.scanstring(text, idx + 1)
+            idx = self.skip(idx)
+            if not text.startswith(':', idx):
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, idx)
+            obj[key], idx = yield from self.value(idx + 1)
+            done, idx = self.expect(idx, '}')
+            if done:
+                return obj, idx
+
+    def array(self, idx: int, top_level: bool):
+        items = []
+        idx = self.skip(idx)
+        if self.text.startswith(']', idx):
+            return items, idx + 1
+        while True:
+            if top_level:
+                item, idx = yield from self.value(idx)
+            else:
+                item, idx = _json_decoder.raw_decode(self.text, idx)
+            items.append(item)
+            if idx >= self.next_pause:
+                self.next_pause = idx + JSON_SLICE_CHARS
+                yield
+            done, idx = self.expect(idx, ']')
+            if done:
+                return items, idx
+
+
+async def read_json(response: httpx.Response) -> Any:
+    """response.json(), parsed in slices that yield to the event loop when the body is large."""
+    body = response.content
+    if len(body) < JSON_STREAM_MIN_BYTES:
+        return response.json()
+    parser = _JsonSlices(body.decode(json.detect_encoding(body), 'surrogatepass')).document()
+    while True:
+        try:
+            next(parser)
+        except StopIteration as done:
+            return done.value
+        await asyncio.sleep(0)
+
+
+class TokenBucket:
+    """Request-rate limiter: rate tokens per second, bursts of up to burst."""
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Latency may reach this multiple of the baseline before the limit starts to shrink
+LIMIT_TOLERANCE = 1.5
+# Weight of a new measurement window in the limit and the short-term latency
+LIMIT_SMOOTHING = 0.2
+# Seconds over which the no-load latency baseline drifts up to a node that got slower
+LIMIT_BASELINE_HORIZON = 300.0
+# Multiplicative decrease after a timeout, 429 or 5xx
+LIMIT_BACKOFF = 0.75
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that tracks the point where latency starts to climb.
+
+    Every window of about `limit` completed requests compares their mean latency with a
+    no-load baseline (the lowest window mean seen, drifting slowly upwards): near the
+    baseline the limit grows by about sqrt(limit), above LIMIT_TOLERANCE times the
+    baseline it shrinks in proportion. Overload errors cut the
+    limit by LIMIT_BACKOFF, at most once per generation of requests so one burst of
+    failures is a single decrease. The limit only grows while it is actually being used.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial: int | None = None):
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        start = initial if initial is not None else min(4, self.max_limit)
+        self.limit = float(min(max(start, self.min_limit), self.max_limit))
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.baseline: float | None = None
+        self.short: float | None = None
+        self._updated_at = time.monotonic()
+        self.generation = 0
+        self.drops = 0
+        self._window: list[float] = []
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> tuple[int, float]:
+        """Wait for a slot; returns a token for release()."""
+        while self.inflight >= self.current:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Woken and cancelled at once: hand the slot to the next waiter
+                    self._wake()
+                raise
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+        return self.generation, time.monotonic()
+
+    def release(self, token: tuple[int, float], *, dropped: bool = False, sample: bool = True):
+        """Free a slot; dropped marks an overload failure, sample=False skips the latency."""
+        generation, started = token
+        self.inflight -= 1
+        if dropped:
+            if generation == self.generation:
+                self.drops += 1
+                self._set_limit(self.limit * LIMIT_BACKOFF)
+        elif sample:
+            self._window.append(time.monotonic() - started)
+            if len(self._window) >= max(min(self.current, 20), 1):
+                self._update(self._window)
+                self._window = []
+        self._wake()
+
+    def _update(self, window: list[float]):
+        rtt = sum(window) / len(window)
+        self.short = rtt if self.short is None else self.short + LIMIT_SMOOTHING * (rtt - self.short)
+        now = time.monotonic()
+        if self.baseline is None or self.short < self.baseline:
+            self.baseline = self.short
+        else:
+            drift = min((now - self._updated_at) / LIMIT_BASELINE_HORIZON, 1.0)
+            self.baseline += drift * (self.short - self.baseline)
+        self._updated_at = now
+        # Application-limited: idle slots say nothing about what the node can take
+        if self.peak_inflight < self.limit / 2:
+            self.peak_inflight = self.inflight
+            return
+        self.peak_inflight = self.inflight
+        gradient = max(0.5, min(1.0, LIMIT_TOLERANCE * self.baseline / self.short)) if self.short > 0 else 1.0
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self._set_limit(self.limit + LIMIT_SMOOTHING * (target - self.limit))
+
+    def _set_limit(self, value: float):
+        value = max(float(self.min_limit), min(float(self.max_limit), value))
+        if int(value) < int(self.limit):
+            # Requests started from here on belong to the smaller limit
+            self.generation += 1
+        self.limit = value
+
+    def _wake(self):
+        free = self.current - self.inflight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+def parse_rpc_urls(value: str | list[str]) -> list[str]:
+    """Split --rpc values ("url" or "url1,url2", possibly repeated) into a de-duplicated list."""
+    raw = [value] if isinstance(value, str) else list(value)
+    urls: list[str] = []
+    for item in raw:
+        for url in item.split(","):
+            url = url.strip()
+            if url and url not in urls:
+                urls.append(url)
+    if not urls:
+        raise ValueError("at least one RPC URL is required")
+    return urls
+
+
+class RpcEndpoint:
+    """Health of one RPC endpoint"""
+
+    def __init__(self, url: str, rps: float = 0.0):
+        self.url = url
+        self.bucket = TokenBucket(rps) if rps > 0 else None
+        self.throttled_until = 0.0
+        self.throttles = 0
+        self.latency_ewma: float | None = None
+        self.error_ewma = 0.0
+        self.last_error_at = 0.0
+        self.inflight = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def error_rate(self, now: float) -> float:
+        if not self.error_ewma:
+            return 0.0
+        return self.error_ewma * 0.5 ** ((now - self.last_error_at) / ERROR_HALF_LIFE)
+
+    def score(self, now: float) -> float:
+        """Expected cost of sending one more request here; lower is better."""
+        if self.throttled_until > now:
+            # Parked by a 429: only chosen when every endpoint is, soonest release first
+            return float("inf")
+        # Unmeasured endpoints score as fast so each one gets sampled early
+        latency = self.latency_ewma or 0.0
+        return latency * (1 + self.inflight) / max(1.0 - self.error_rate(now), 0.05)
+
+    def p95(self) -> float | None:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += EWMA_ALPHA * (latency - self.latency_ewma)
+        self.error_ewma *= 1 - EWMA_ALPHA
+
+    def record_error(self, latency: float):
+        now = time.monotonic()
+        self.errors += 1
+        self.error_ewma = self.error_rate(now) * (1 - EWMA_ALPHA) + EWMA_ALPHA
+        self.last_error_at = now
+        # A failure costs at least as much as the time it took to surface
+        if self.latency_ewma is None or latency > self.latency_ewma:
+            self.latency_ewma = latency
+
+
+class RpcPool:
+    """
+    Health-scored pool of JSON-RPC endpoints sharing one HTTP connection pool.
+
+    post() returns the raw httpx.Response so callers keep their own JSON-RPC error
+    handling and retry loops; transport failures and 5xx responses raise.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        *,
+        max_connections: int = 100,
+        timeout: httpx.Timeout | float = 30.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.05,
+        rps: float = 0.0,
+        concurrency: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        if not urls:
+            raise ValueError("at least one RPC URL is required")
+        # rps caps each endpoint separately; 0 means unlimited
+        self.endpoints = [RpcEndpoint(url, rps) for url in urls]
+        # concurrency is the ceiling of the adaptive in-flight limit; None leaves posts unbounded
+        self.limiter = AdaptiveLimiter(concurrency) if concurrency else None
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.hedge_min_delay = hedge_min_delay
+        self.hedges = 0
+        self.hedge_wins = 0
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=50)
+        self.client = httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport)
+
+    async def __aenter__(self) -> "RpcPool":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def ranked(self) -> list[RpcEndpoint]:
+        now = time.monotonic()
+        return sorted(self.endpoints, key=lambda ep: (ep.score(now), ep.throttled_until))
+
+    async def _send(self, endpoint: RpcEndpoint, payload: Any, timeout: float | None) -> httpx.Response:
+        wait = endpoint.throttled_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        endpoint.inflight += 1
+        try:
+            if endpoint.bucket is not None:
+                await endpoint.bucket.acquire()
+        except BaseException:
+            endpoint.inflight -= 1
+            raise
+        endpoint.requests += 1
+        started = time.monotonic()
+        try:
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            response = await self.client.post(endpoint.url, json=payload, **kwargs)
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is None:
+                    retry_after = DEFAULT_THROTTLE_DELAY
+                endpoint.throttles += 1
+                endpoint.throttled_until = max(endpoint.throttled_until, time.monotonic() + retry_after)
+                raise RpcRateLimited(endpoint.url, retry_after)
+            if response.status_code >= 500:
+                response.raise_for_status()
+        except (asyncio.CancelledError, RpcRateLimited):
+            raise
+        except Exception:
+            endpoint.record_error(time.monotonic() - started)
+            raise
+        finally:
+            endpoint.inflight -= 1
+        endpoint.record_success(time.monotonic() - started)
+        return response
+
+    async def post(self, payload: Any, timeout: float | None = None) -> httpx.Response:
+        """Send one JSON-RPC request (or batch) to the healthiest endpoint, hedging slow ones."""
+        if self.limiter is None:
+            return await self._post(payload, timeout)
+        token = await self.limiter.acquire()
+        try:
+            response = await self._post(payload, timeout)
+        except asyncio.CancelledError:
+            self.limiter.release(token, sample=False)
+            raise
+        except Exception:
+            # Timeouts, 429s, 5xx and refused connections all mean "too much load"
+            self.limiter.release(token, dropped=True)
+            raise
+        self.limiter.release(token)
+        return response
+
+    def concurrency_status(self) -> str:
+        """Current adaptive limit for progress logs ("" without a limiter)."""
+        if self.limiter is None:
+            return ""
+        return f"concurrency {self.limiter.current}/{self.limiter.max_limit}"
+
+    async def _post(self, payload: Any, timeout: float | None) -> httpx.Response:
+        ranked = self.ranked()
+        primary = ranked[0]
+        delay = primary.p95() if self.hedge else None
+        if delay is None:
+            return await self._send(primary, payload, timeout)
+
+        first = asyncio.create_task(self._send(primary, payload, timeout))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=max(delay, self.hedge_min_delay))
+            if done:
+                return first.result()
+
+            self.hedges += 1
+            second = asyncio.create_task(self._send(ranked[1], payload, timeout))
+            tasks.append(second)
+            pending = {first, second}
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Also reached when the caller is cancelled mid-hedge: stop and reap both requests
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def summary(self) -> str:
+        """One line per endpoint for end-of-run logs."""
+        now = time.monotonic()
+        lines = []
+        for ep in self.endpoints:
+            latency = f"{ep.latency_ewma * 1000:.0f}ms" if ep.latency_ewma is not None else "n/a"
+            p95 = ep.p95()
+            p95_text = f", p95 {p95 * 1000:.0f}ms" if p95 is not None else ""
+            throttle_text = f", {ep.throttles} throttled (429)" if ep.throttles else ""
+            lines.append(
+                f"{ep.url}: {ep.requests} requests, {ep.errors} errors{throttle_text}, "
+                f"latency {latency}{p95_text}, error score {ep.error_rate(now):.2f}"
+            )
+        if self.hedge:
+            lines.append(f"hedged {self.hedges} requests, {self.hedge_wins} won by the hedge")
+        if self.limiter is not None:
+            lines.append(f"{self.concurrency_status()} at the end, {self.limiter.drops} overload backoffs")
+        return "\n".join(lines)
@@ -7,6 +7,22 @@ CREATE TABLE IF NOT EXISTS sync_status (
     PRIMARY KEY (contract_name, event_name)
 );
 
+-- sync_ranges: block ranges committed ahead of sync_status.last_block (out-of-order completions).
+-- Merged into sync_status and deleted once the gap below them is filled; keep across runs for resume.
+CREATE TABLE IF NOT EXISTS sync_ranges (
+    contract_name TEXT NOT NULL,
+    from_block    INTEGER NOT NULL,
+    to_block      INTEGER NOT NULL,
+    PRIMARY KEY (contract_name, from_block, to_block)
+);
+
+-- recent_block_hashes: canonical hashes near the synced head (sync targets + blocks with logs).
+-- event_processor compares them with the node before each run to detect reorgs; pruned to --reorg-window blocks.
+CREATE TABLE IF NOT EXISTS recent_block_hashes (
+    block_number  INTEGER PRIMARY KEY,
+    block_hash    TEXT NOT NULL
+);
+
 -- 事件记录主表，保存所有解析后的事件
 -- log_round: block-calculated protocol round; round: event param (round/currentRound from decoded_data)
 CREATE TABLE IF NOT EXISTS events (
@@ -21,7 +37,15 @@ CREATE TABLE IF NOT EXISTS events (
     log_index       INTEGER,
     address         TEXT,
     decoded_data    TEXT NOT NULL,
-    created_at      TEXT DEFAULT CURRENT_TIMESTAMP
+    created_at      TEXT DEFAULT CURRENT_TIMESTAMP,
+    block_hash      TEXT,
+    -- hot params promoted from decoded_data at ingest (event_processor.PROMOTED_COLUMNS); addresses lowercase
+    account         TEXT,     -- account
+    from_address    TEXT,     -- from / src
+    to_address      TEXT,     -- to / dst
+    amount_raw      TEXT,     -- value / wad / amount, decimal text (uint256 overflows INTEGER)
+    token_address   TEXT,     -- tokenAddress / token
+    action_id       INTEGER   -- actionId
 );
 
 -- 索引
@@ -32,6 +56,79 @@ CREATE INDEX IF NOT EXISTS idx_events_log_round ON events(log_round);
 CREATE INDEX IF NOT EXISTS idx_events_round ON events(round);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_events_unique ON events(tx_hash, log_index);
 
+-- quarantined_logs: fetched logs no configured event matched (new topic after an upgrade, ABI missing an event).
+-- Stored raw so the run can commit and advance; event_processor --redecode-quarantine decodes them later without RPC.
+CREATE TABLE IF NOT EXISTS quarantined_logs (
+    block_number    INTEGER NOT NULL,
+    block_hash      TEXT,
+    tx_hash         TEXT NOT NULL,
+    tx_index        INTEGER,
+    log_index       INTEGER NOT NULL,
+    address         TEXT NOT NULL,
+    topic0          TEXT,
+    topics          TEXT NOT NULL,  -- JSON array of all topics
+    data            TEXT NOT NULL,
+    created_at      TEXT DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (tx_hash, log_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_quarantined_logs_address_topic0 ON quarantined_logs(address, topic0);
+CREATE INDEX IF NOT EXISTS idx_quarantined_logs_block ON quarantined_logs(block_number);
+
+-- raw_logs: fetched logs stored undecoded by event_processor --raw-first, in fetch order (id).
+-- Decoded into events behind the fetcher; kept so an ABI fix can be applied with --decode-raw all instead of a refetch.
+CREATE TABLE IF NOT EXISTS raw_logs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,  -- never reused, so the decode watermark survives rollbacks
+    block_number    INTEGER NOT NULL,
+    block_hash      TEXT,
+    tx_hash         TEXT NOT NULL,
+    tx_index        INTEGER,
+    log_index       INTEGER NOT NULL,
+    address         TEXT NOT NULL,
+    topics          TEXT NOT NULL,  -- JSON array of all topics
+    data            TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_raw_logs_unique ON raw_logs(tx_hash, log_index);
+CREATE INDEX IF NOT EXISTS idx_raw_logs_block ON raw_logs(block_number);
+
+-- decode_status: raw_logs decode watermark; every raw log with id <= last_raw_id is in events or quarantined_logs
+CREATE TABLE IF NOT EXISTS decode_status (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    last_raw_id INTEGER NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+
+-- receipt_events: logs of unconfigured emitters found in transaction receipts (block_processor --receipt-events),
+-- decoded with the abi/ topic index; contract_name is the ABI file the event was found in. Same columns as events.
+CREATE TABLE IF NOT EXISTS receipt_events (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    contract_name   TEXT NOT NULL,
+    event_name      TEXT NOT NULL,
+    log_round       INTEGER,
+    round           INTEGER,
+    block_number    INTEGER NOT NULL,
+    tx_hash         TEXT NOT NULL,
+    tx_index        INTEGER,
+    log_index       INTEGER,
+    address         TEXT,
+    decoded_data    TEXT NOT NULL,
+    created_at      TEXT DEFAULT CURRENT_TIMESTAMP,
+    block_hash      TEXT,
+    -- hot params promoted from decoded_data at ingest (event_processor.PROMOTED_COLUMNS); addresses lowercase
+    account         TEXT,     -- account
+    from_address    TEXT,     -- from / src
+    to_address      TEXT,     -- to / dst
+    amount_raw      TEXT,     -- value / wad / amount, decimal text (uint256 overflows INTEGER)
+    token_address   TEXT,     -- tokenAddress / token
+    action_id       INTEGER   -- actionId
+);
+
+CREATE INDEX IF NOT EXISTS idx_receipt_events_event ON receipt_events(event_name);
+CREATE INDEX IF NOT EXISTS idx_receipt_events_address ON receipt_events(address);
+CREATE INDEX IF NOT EXISTS idx_receipt_events_block ON receipt_events(block_number);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_receipt_events_unique ON receipt_events(tx_hash, log_index);
+
 -- blocks: block header metadata (fetched via eth_getBlockByNumber, maintained by block_processor)
 -- Constant on Thinkium: gas_limit(30M), difficulty(0x0), size(0), nonce(0x..), miner(0x0..), extra_data(0x), sha3_uncles
 -- Always NULL: base_fee_per_gas, total_difficulty
@@ -18,6 +18,10 @@ SELECT
     json_extract(decoded_data, '$.to')    AS "to",
     json_extract(decoded_data, '$.value') AS value,
     CAST(json_extract(decoded_data, '$.value') AS REAL) / 1e18 AS amount,
+    -- events 提升列：小写地址与十进制金额，按地址过滤可走 (event_name, from_address/to_address) 索引
+    from_address,
+    to_address,
+    amount_raw,
     created_at
 FROM events
 WHERE event_name = 'Transfer';
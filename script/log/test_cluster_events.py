@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import cluster_events
+import database
+import event_processor
+from test_event_processor import TRANSFER_ABI, TRANSFER_TOPIC, make_transfer_log
+
+COLUMNS = "block_number, log_index, tx_hash, contract_name, event_name, decoded_data, from_address, amount_raw"
+
+
+class ClusterEventsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(database.close_writers)
+        self.db_path = os.path.join(self.temp_dir.name, "events.db")
+        event_processor.init_db(self.db_path)
+        self.decode = event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0)[TRANSFER_TOPIC].decoder.decode
+
+    def transfers(self, blocks) -> list[event_processor.EventRecord]:
+        # Saved out of chain order, so the rowid layout is not already clustered
+        return [
+            self.decode(make_transfer_log(block, log_index, value=block))
+            for block in blocks for log_index in (1, 0)
+        ]
+
+    def read(self, sql: str) -> list[tuple]:
+        with database.writer(self.db_path) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_events_are_rebuilt_in_chain_order_and_ingest_keeps_working(self) -> None:
+        event_processor.save_events_to_db(self.db_path, self.transfers(range(20, 0, -1)), 20, {("token", "Transfer")})
+        before = self.read(f"SELECT {COLUMNS} FROM events ORDER BY block_number, log_index")
+
+        self.assertEqual(cluster_events.cluster_events(self.db_path), 40)
+        self.assertEqual(cluster_events.cluster_events(self.db_path), 0)
+        with database.writer(self.db_path) as conn:
+            self.assertTrue(cluster_events.is_clustered(conn))
+        self.assertEqual(self.read(f"SELECT {COLUMNS} FROM events"), before)
+        self.assertEqual(self.read("SELECT COUNT(*) FROM v_transfer"), [(40,)])
+        self.assertEqual(self.read("SELECT id FROM events LIMIT 2"), [(1 << 20,), ((1 << 20) + 1,)])
+        self.assertIn("idx_events_log_round", {row[0] for row in self.read("SELECT name FROM sqlite_master")})
+
+        # Saves dedupe on the clustered key, and reorg rollbacks delete by block
+        self.assertEqual(event_processor.save_events_to_db(self.db_path, self.transfers(range(15, 25)), 24, set()), 8)
+        with database.writer(self.db_path) as conn:
+            self.assertEqual(event_processor.rollback_after_block(conn, 22), 4)
+            conn.commit()
+            conn.execute("UPDATE events SET from_address = NULL, amount_raw = NULL")
+            self.assertEqual(event_processor.backfill_promoted_columns(conn, "events"), 44)
+            conn.commit()
+        self.assertEqual(self.read("SELECT COUNT(*), MAX(block_number), COUNT(amount_raw) FROM events"), [(44, 22, 44)])
+
+    def test_tx_level_log_indexes_are_refused(self) -> None:
+        events = self.transfers([5])
+        events[1] = events[1]._replace(tx_hash="0x" + "ab" * 32, log_index=1)
+        event_processor.save_events_to_db(self.db_path, events, 5, set())
+        with self.assertRaisesRegex(RuntimeError, "block 5 has 2 events with log_index 1"):
+            cluster_events.cluster_events(self.db_path)
+        with database.writer(self.db_path) as conn:
+            self.assertFalse(cluster_events.is_clustered(conn))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import compact_db
+import database
+import event_processor
+from test_event_processor import TOKEN, TRANSFER_ABI, TRANSFER_TOPIC, make_transfer_log
+
+CHECKSUMMED = "0x52908400098527886E0F7030069857D2E4169EE7"
+
+
+class CompactDbTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(database.close_writers)
+        self.db_path = os.path.join(self.temp_dir.name, "events.db")
+        self.output_path = os.path.join(self.temp_dir.name, "events.compact.db")
+
+        event_processor.init_db(self.db_path)
+        decode = event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0)[TRANSFER_TOPIC].decoder.decode
+        events = [decode(make_transfer_log(block, value=block)) for block in range(30)]
+        event_processor.save_events_to_db(self.db_path, events, 29, {("token", "Transfer")})
+        with database.writer(self.db_path) as conn:
+            conn.execute(
+                'INSERT INTO transactions(block_number, block_hash, tx_hash, "from", "to", value_wei, amount) '
+                "VALUES (1, ?, ?, ?, ?, '0', 0)",
+                (events[1].block_hash, events[1].tx_hash, TOKEN, CHECKSUMMED),
+            )
+            conn.execute("CREATE INDEX idx_events_event_from_address ON events(event_name, from_address)")
+            conn.commit()
+        database.close_writers()
+
+    def read(self, db_path: str, sql: str, params: tuple = ()) -> list[tuple]:
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def columns(self, table: str) -> str:
+        return ", ".join(f'"{row[1]}"' for row in self.read(self.db_path, f"PRAGMA table_xinfo({table})"))
+
+    def plan(self, sql: str, params: tuple) -> str:
+        return " ".join(row[3] for row in self.read(self.output_path, "EXPLAIN QUERY PLAN " + sql, params))
+
+    def test_compat_views_match_the_source_tables(self) -> None:
+        compact_db.compact_database(self.db_path, self.output_path)
+
+        for sql in (
+            f"SELECT {self.columns('events')} FROM events ORDER BY id",
+            f"SELECT {self.columns('transactions')} FROM transactions ORDER BY id",
+            "SELECT * FROM v_transfer ORDER BY block_number",
+            "SELECT * FROM sync_status",
+        ):
+            self.assertEqual(self.read(self.output_path, sql), self.read(self.db_path, sql), sql)
+        self.assertEqual(self.read(self.output_path, "SELECT COUNT(*) FROM addresses"), [(4,)])
+        self.assertEqual(self.read(self.output_path, 'SELECT "to" FROM transactions'), [(CHECKSUMMED,)])
+        self.assertEqual(self.read(self.output_path, "SELECT typeof(tx_hash) FROM compact_events LIMIT 1"), [("blob",)])
+
+        # Address filters on the views still resolve through indexes
+        plan = self.plan(
+            "SELECT tx_hash FROM events WHERE event_name = 'Transfer' AND from_address = ?",
+            ("0x" + "00" * 19 + "01",),
+        )
+        self.assertIn("idx_events_event_from_address", plan)
+        self.assertNotIn("SCAN c", plan)
+
+        # Hash filters and joins reach the compact indexes through the _blob columns
+        tx_hash = self.read(self.db_path, "SELECT tx_hash FROM events WHERE block_number = 1")[0][0]
+        sql = (
+            "SELECT e.log_index, t.\"from\" FROM events e JOIN transactions t ON t.tx_hash_blob = e.tx_hash_blob "
+            "WHERE e.tx_hash_blob = ?"
+        )
+        params = (compact_db.hash_to_blob(tx_hash),)
+        self.assertEqual(self.read(self.output_path, sql, params), [(0, TOKEN)])
+        plan = self.plan(sql, params)
+        self.assertIn("idx_events_unique", plan)
+        self.assertNotIn("SCAN", plan)
+
+    def test_existing_output_is_not_overwritten(self) -> None:
+        open(self.output_path, "w").close()
+        with self.assertRaises(FileExistsError):
+            compact_db.compact_database(self.db_path, self.output_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+import database
+
+
+class DatabaseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(database.close_writers)
+        self.db_path = os.path.join(self.temp_dir.name, "events.db")
+
+    def test_connections_use_wal_and_tuned_pragmas(self) -> None:
+        conn = database.connect_db(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone(), ("wal",))
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone(), (1,))  # NORMAL
+            self.assertEqual(conn.execute("PRAGMA temp_store").fetchone(), (2,))  # MEMORY
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone(), (-database.CACHE_SIZE_KIB,))
+        finally:
+            conn.close()
+
+    def test_writer_is_shared_and_readers_see_commits_while_it_writes(self) -> None:
+        with database.writer(self.db_path) as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (2)")  # left open while a reader runs
+
+            reader = sqlite3.connect(self.db_path, timeout=0.1)
+            try:
+                self.assertEqual(reader.execute("SELECT COUNT(*) FROM t").fetchone(), (1,))
+            finally:
+                reader.close()
+
+        # Another thread borrows the same connection and sees the uncommitted insert
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(self.count_rows()))
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [2])
+
+    def test_writer_rolls_back_an_open_transaction_on_error(self) -> None:
+        with database.writer(self.db_path) as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+        with self.assertRaises(RuntimeError), database.writer(self.db_path) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("failed mid-batch")
+        self.assertEqual(self.count_rows(), 0)
+
+    def count_rows(self) -> int:
+        with database.writer(self.db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+if __name__ == "__main__":
+    unittest.main()
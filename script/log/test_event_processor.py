@@ -0,0 +1,715 @@
+import asyncio
+import json
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import httpx
+from eth_abi import encode
+
+import block_processor
+import database
+import event_processor
+from rpc_client import RpcPool
+
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+TRANSFER_ABI = [
+    {
+        "type": "event",
+        "name": "Transfer",
+        "anonymous": False,
+        "inputs": [
+            {"name": "from", "type": "address", "indexed": True},
+            {"name": "to", "type": "address", "indexed": True},
+            {"name": "value", "type": "uint256", "indexed": False},
+        ],
+    }
+]
+
+
+def address_topic(value: int) -> str:
+    return "0x" + f"{value:064x}"
+
+
+def block_hash(block_number: int, fork: int = 0) -> str:
+    return "0x" + f"{fork:02x}{block_number:062x}"
+
+
+def make_transfer_log(block_number: int, log_index: int = 0, value: int = 1, fork: int = 0) -> dict:
+    return {
+        "address": TOKEN,
+        "topics": [TRANSFER_TOPIC, address_topic(1), address_topic(2)],
+        "data": "0x" + f"{value:064x}",
+        "blockNumber": hex(block_number),
+        "blockHash": block_hash(block_number, fork),
+        "transactionHash": "0x" + f"{block_number:032x}{log_index:032x}",
+        "transactionIndex": "0x0",
+        "logIndex": hex(log_index),
+    }
+
+
+class EventProcessorTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "events.db")
+        event_processor.init_db(self.db_path)
+        self.addr_topic_to_event_def = {
+            TOKEN: event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0)
+        }
+
+    def tearDown(self) -> None:
+        database.close_writers()
+        self.temp_dir.cleanup()
+
+    def make_config(self, to_block: int, **overrides) -> event_processor.ProcessConfig:
+        values = dict(
+            config_file="",
+            rpc_url="http://rpc.invalid",
+            to_block=to_block,
+            max_blocks_per_request=10,
+            max_concurrent_jobs=4,
+            max_retries=1,
+            db_path=self.db_path,
+        )
+        values.update(overrides)
+        return event_processor.ProcessConfig(**values)
+
+    def make_contracts(self) -> list[event_processor.ProcessContractConfig]:
+        return [
+            event_processor.ProcessContractConfig(
+                name=TOKEN,
+                address=TOKEN,
+                abi_file="",
+                from_block=0,
+                event_defs=self.addr_topic_to_event_def[TOKEN],
+            )
+        ]
+
+    def query(self, sql: str) -> list[tuple]:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+
+class PipelineTest(EventProcessorTestCase):
+    def patch_rpc(self, chain_logs: list[dict], requested: list | None = None, forks: dict | None = None):
+        rnd = random.Random(7)
+        forks = forks if forks is not None else {}
+
+        async def fake_fetch(client, addresses, from_block, to_block, *args, topic0s=None, **kwargs):
+            # Complete ranges out of order to exercise checkpointing
+            if requested is not None:
+                requested.append((from_block, to_block))
+            await asyncio.sleep(rnd.random() / 100)
+            return [
+                entry for entry in chain_logs
+                if from_block <= int(entry["blockNumber"], 16) <= to_block
+                and (topic0s is None or entry["topics"][0] in topic0s)
+            ]
+
+        async def fake_range(*args, **kwargs):
+            return (0, 0, [], None)
+
+        async def fake_hashes(rpc, block_numbers, *args, **kwargs):
+            # forks maps the first block of a replacement chain to its fork id
+            return {
+                n: block_hash(n, max((f for start, f in forks.items() if n >= start), default=0))
+                for n in block_numbers
+            }
+
+        return mock.patch.multiple(
+            event_processor, fetch_logs_with_split=fake_fetch, fetch_logs_range_rpc=fake_range,
+            fetch_block_hashes=fake_hashes,
+        )
+
+    def run_pipeline(self, config, chain_logs: list[dict], requested: list | None = None):
+        with self.patch_rpc(chain_logs, requested):
+            return asyncio.run(
+                event_processor.run_pipeline(
+                    config,
+                    self.make_contracts(),
+                    self.addr_topic_to_event_def,
+                )
+            )
+
+    def test_pipeline_saves_all_ranges_and_advances_sync_status(self) -> None:
+        chain_logs = [make_transfer_log(block, value=block) for block in range(0, 200, 3)]
+        stats = self.run_pipeline(self.make_config(to_block=199), chain_logs)
+
+        self.assertEqual(stats.ranges_total, 20)
+        self.assertEqual(stats.ranges_saved, 20)
+        self.assertEqual(stats.inserted, len(chain_logs))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(len(chain_logs),)])
+        self.assertEqual(
+            self.query("SELECT contract_name, event_name, last_block FROM sync_status"),
+            [("token", "Transfer", 199)],
+        )
+
+    def test_failed_range_stops_checkpoint_before_it(self) -> None:
+        chain_logs = [make_transfer_log(block) for block in range(0, 100, 5)]
+        decode_raw_logs = event_processor.decode_raw_logs
+
+        def failing_decode(raw_logs, *args):
+            if any(int(raw_log["blockNumber"], 16) == 55 for raw_log in raw_logs):
+                raise RuntimeError("decoder crashed")
+            return decode_raw_logs(raw_logs, *args)
+
+        with mock.patch.object(event_processor, "decode_raw_logs", failing_decode), \
+                self.assertRaises(RuntimeError):
+            self.run_pipeline(self.make_config(to_block=99), chain_logs)
+
+        for (last_block,) in self.query("SELECT last_block FROM sync_status"):
+            self.assertLess(last_block, 50)
+        for from_block, to_block in self.query("SELECT from_block, to_block FROM sync_ranges"):
+            self.assertFalse(from_block <= 55 <= to_block, (from_block, to_block))
+
+        # A rerun resumes from the checkpoints and closes the gap
+        self.run_pipeline(self.make_config(to_block=99), chain_logs)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(len(chain_logs),)])
+        self.assertEqual(self.query("SELECT last_block FROM sync_status"), [(99,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM sync_ranges"), [(0,)])
+
+    def test_undecodable_logs_are_quarantined_and_redecoded_later(self) -> None:
+        approval_abi = [{
+            "type": "event", "name": "Approval", "anonymous": False,
+            "inputs": [
+                {"name": "owner", "type": "address", "indexed": True},
+                {"name": "spender", "type": "address", "indexed": True},
+                {"name": "value", "type": "uint256", "indexed": False},
+            ],
+        }]
+        approval_topic = next(iter(event_processor.get_all_event_defs(approval_abi, "token", 0)))
+        chain_logs = [make_transfer_log(block) for block in range(0, 100, 5)]
+        unknown_logs = [
+            {**make_transfer_log(block, log_index=1), "topics": [approval_topic, address_topic(1), address_topic(3)]}
+            for block in (55, 56)
+        ]
+
+        # The default topic filter never fetches logs of events missing from the ABIs
+        stats = self.run_pipeline(self.make_config(to_block=99), chain_logs + unknown_logs)
+        self.assertEqual((stats.quarantined, stats.raw_logs), (0, len(chain_logs)))
+        with database.writer(self.db_path) as conn:
+            conn.execute("DELETE FROM sync_status")
+            conn.commit()
+
+        stats = self.run_pipeline(self.make_config(to_block=99, topic_filter=False), chain_logs + unknown_logs)
+        self.assertEqual(stats.quarantined, 2)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(len(chain_logs),)])
+        self.assertEqual(self.query("SELECT last_block FROM sync_status"), [(99,)])
+        self.assertEqual(
+            self.query("SELECT block_number, topic0 FROM quarantined_logs ORDER BY block_number"),
+            [(55, approval_topic), (56, approval_topic)],
+        )
+
+        # The ABI learns the event; the quarantine is decoded without RPC
+        self.addr_topic_to_event_def[TOKEN].update(event_processor.get_all_event_defs(approval_abi, "token", 0))
+        self.assertTrue(event_processor.redecode_quarantine(self.make_config(to_block=99), self.addr_topic_to_event_def))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM quarantined_logs"), [(0,)])
+        rows = self.query("SELECT block_number, decoded_data FROM events WHERE event_name = 'Approval' ORDER BY block_number")
+        self.assertEqual([row[0] for row in rows], [55, 56])
+        self.assertEqual(json.loads(rows[0][1])["value"], 1)
+
+    def test_raw_first_stores_raw_logs_and_decodes_behind_the_writer(self) -> None:
+        chain_logs = [make_transfer_log(block, value=block) for block in range(0, 200, 3)]
+        stats = self.run_pipeline(self.make_config(to_block=199, raw_first=True), chain_logs)
+
+        self.assertEqual(stats.inserted, len(chain_logs))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM raw_logs"), [(len(chain_logs),)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(len(chain_logs),)])
+        self.assertEqual(self.query("SELECT last_raw_id FROM decode_status"), self.query("SELECT MAX(id) FROM raw_logs"))
+        self.assertEqual(self.query("SELECT last_block FROM sync_status"), [(199,)])
+
+    def test_raw_first_run_decodes_pending_raw_logs_when_already_synced(self) -> None:
+        chain_logs = [make_transfer_log(block, value=block) for block in range(0, 100, 3)]
+        self.run_pipeline(self.make_config(to_block=99, raw_first=True), chain_logs)
+        # A raw-first run that died after storing: sync_status is at 99, the logs are undecoded
+        with database.writer(self.db_path) as conn:
+            conn.execute("DELETE FROM events")
+            conn.execute("DELETE FROM decode_status")
+            conn.commit()
+
+        abi_file = os.path.join(self.temp_dir.name, "token.json")
+        config_file = os.path.join(self.temp_dir.name, "contracts.json")
+        with open(abi_file, "w") as f:
+            json.dump({"abi": TRANSFER_ABI}, f)
+        with open(config_file, "w") as f:
+            json.dump([{"name": "token", "address": TOKEN, "abi_files": [abi_file], "from_block": 0}], f)
+        requested: list[tuple[int, int]] = []
+        config = self.make_config(to_block=99, raw_first=True, config_file=config_file, abi_cache="")
+        with self.patch_rpc(chain_logs, requested):
+            self.assertTrue(asyncio.run(event_processor.process_events(config)))
+
+        self.assertEqual(requested, [])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(len(chain_logs),)])
+        self.assertEqual(self.query("SELECT last_raw_id FROM decode_status"), self.query("SELECT MAX(id) FROM raw_logs"))
+
+    def test_decode_raw_all_applies_an_abi_fix_without_refetching(self) -> None:
+        chain_logs = [make_transfer_log(block, value=block) for block in range(0, 50, 5)]
+        # Logs stored by a raw-first run that died before decoding
+        conn = sqlite3.connect(self.db_path)
+        event_processor.store_raw_logs(conn, chain_logs)
+        conn.commit()
+        conn.close()
+        config = self.make_config(to_block=49, rpc_url=None)
+
+        renamed = json.loads(json.dumps(TRANSFER_ABI))
+        renamed[0]["inputs"][2]["name"] = "amount"
+        wrong_map = {TOKEN: event_processor.get_all_event_defs(renamed, "token", 0)}
+        self.assertTrue(event_processor.decode_stored_raw_logs(config, wrong_map))
+        self.assertTrue(event_processor.decode_stored_raw_logs(config, self.addr_topic_to_event_def))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events WHERE decoded_data LIKE '%amount%'"), [(10,)])
+
+        self.assertTrue(event_processor.decode_stored_raw_logs(config, self.addr_topic_to_event_def, redecode_all=True))
+        rows = self.query("SELECT block_number, decoded_data FROM events ORDER BY block_number")
+        self.assertEqual([(n, json.loads(data)["value"]) for n, data in rows], [(n, n) for n in range(0, 50, 5)])
+
+    def test_resume_skips_ranges_saved_ahead_of_watermark(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO sync_ranges VALUES ('token', 100, 149)")
+        conn.commit()
+        conn.close()
+        chain_logs = [make_transfer_log(block) for block in range(0, 200, 10)]
+        requested: list[tuple[int, int]] = []
+
+        self.run_pipeline(self.make_config(to_block=199), chain_logs, requested)
+
+        self.assertTrue(requested)
+        for from_block, to_block in requested:
+            self.assertTrue(to_block < 100 or from_block > 149, (from_block, to_block))
+        self.assertEqual(self.query("SELECT last_block FROM sync_status"), [(199,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM sync_ranges"), [(0,)])
+
+    def test_follow_ingests_new_blocks_as_head_advances(self) -> None:
+        chain_logs = [make_transfer_log(block) for block in range(0, 300, 7)]
+        heads = iter([149, 149, 299])
+        synced_heads: list[int] = []
+
+        async def fake_head(*args, **kwargs):
+            synced_heads.append(self.query("SELECT last_block FROM sync_status")[0][0])
+            head = next(heads, None)
+            if head is None:
+                raise asyncio.CancelledError
+            return head
+
+        config = self.make_config(to_block=99, follow=True, poll_interval=0)
+        with self.patch_rpc(chain_logs), \
+                mock.patch.object(event_processor, "fetch_block_number", fake_head):
+            self.assertTrue(asyncio.run(
+                event_processor.follow_events(config, self.make_contracts(), self.addr_topic_to_event_def)
+            ))
+
+        self.assertEqual(synced_heads, [99, 149, 149, 299])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(len(chain_logs),)])
+
+    def test_follow_rolls_back_reorged_suffix(self) -> None:
+        chain_logs = [make_transfer_log(block) for block in range(0, 130, 7)]
+        forks: dict[int, int] = {}
+        heads = iter([120])
+
+        async def fake_head(*args, **kwargs):
+            if not forks:
+                # Blocks from 85 on are replaced by a fork with different logs
+                forks[85] = 1
+                chain_logs[:] = [entry for entry in chain_logs if int(entry["blockNumber"], 16) < 85]
+                chain_logs.extend(make_transfer_log(block, value=2, fork=1) for block in (86, 93, 110))
+            head = next(heads, None)
+            if head is None:
+                raise asyncio.CancelledError
+            return head
+
+        config = self.make_config(to_block=99, follow=True, poll_interval=0)
+        with self.patch_rpc(chain_logs, forks=forks), \
+                mock.patch.object(event_processor, "fetch_block_number", fake_head):
+            asyncio.run(event_processor.follow_events(config, self.make_contracts(), self.addr_topic_to_event_def))
+
+        self.assertEqual(
+            self.query("SELECT block_number, block_hash FROM events WHERE block_number >= 80 ORDER BY block_number"),
+            [(84, block_hash(84)), (86, block_hash(86, 1)), (93, block_hash(93, 1)), (110, block_hash(110, 1))],
+        )
+        self.assertEqual(self.query("SELECT last_block FROM sync_status"), [(120,)])
+        self.assertEqual(
+            self.query("SELECT block_hash FROM recent_block_hashes WHERE block_number = 120"),
+            [(block_hash(120, 1),)],
+        )
+
+
+class BulkSaveTest(EventProcessorTestCase):
+    def test_bulk_save_counts_new_rows_and_upserts_every_key(self) -> None:
+        decode = self.addr_topic_to_event_def[TOKEN][TRANSFER_TOPIC].decoder.decode
+        events = [decode(make_transfer_log(block)) for block in range(120)]
+        keys = {(f"c{i}", "Transfer") for i in range(event_processor.SYNC_STATUS_ROWS_PER_STATEMENT + 50)}
+
+        with mock.patch.object(event_processor, "INSERT_TRANSACTION_ROWS", 50):
+            self.assertEqual(event_processor.save_events_to_db(self.db_path, events, 119, keys), 120)
+            self.assertEqual(event_processor.save_events_to_db(self.db_path, events[100:] + events[:1], 130, keys), 0)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM events"), [(120,)])
+        self.assertEqual(self.query("SELECT COUNT(*), MIN(last_block) FROM sync_status"), [(len(keys) + 1, 130)])
+
+        with database.writer(self.db_path) as conn:
+            # Pipeline checkpoints only ever raise last_block
+            event_processor.apply_sync_updates(conn, [
+                event_processor.SyncUpdate({"token", "c0"}, {("token", "Transfer"), ("c0", "Transfer")}, 125, None),
+                event_processor.SyncUpdate({"c1"}, {("c1", "Transfer")}, 140, None),
+            ])
+            conn.commit()
+        self.assertEqual(
+            self.query("SELECT contract_name, last_block FROM sync_status WHERE contract_name IN ('token', 'c0', 'c1') ORDER BY 1"),
+            [("c0", 130), ("c1", 140), ("token", 130)],
+        )
+
+    def test_failed_bulk_insert_names_the_failing_event(self) -> None:
+        decode = self.addr_topic_to_event_def[TOKEN][TRANSFER_TOPIC].decoder.decode
+        events = [decode(make_transfer_log(block)) for block in range(3)]
+        events[1] = events[1]._replace(decoded_data={"unbindable": True})
+        with database.writer(self.db_path) as conn, self.assertRaisesRegex(RuntimeError, "token.Transfer at 1"):
+            event_processor.insert_events(conn, events)
+
+
+class PromotedColumnsTest(EventProcessorTestCase):
+    def test_decoded_transfer_fills_participant_columns(self) -> None:
+        decode = self.addr_topic_to_event_def[TOKEN][TRANSFER_TOPIC].decoder.decode
+        event = decode(make_transfer_log(7, value=2**200))
+        self.assertEqual(event.from_address, "0x" + "00" * 19 + "01")
+        self.assertEqual(event.to_address, "0x" + "00" * 19 + "02")
+        self.assertEqual(event.amount_raw, str(2**200))
+        self.assertIsNone(event.account)
+
+    def test_v_transfer_exposes_promoted_columns_for_indexed_filters(self) -> None:
+        decode = self.addr_topic_to_event_def[TOKEN][TRANSFER_TOPIC].decoder.decode
+        event_processor.save_events_to_db(self.db_path, [decode(make_transfer_log(7, value=2**200))], 7, set())
+        with database.writer(self.db_path) as conn:
+            conn.execute("CREATE INDEX idx_events_event_from_address ON events(event_name, from_address)")
+            conn.commit()
+            sql = 'SELECT "from", value, from_address, amount_raw FROM v_transfer WHERE from_address = ?'
+            params = ("0x" + "00" * 19 + "01",)
+            self.assertEqual(
+                conn.execute(sql, params).fetchall(),
+                [(event_processor.to_checksum_address(params[0]), 2**200, params[0], str(2**200))],
+            )
+            plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        self.assertIn("idx_events_event_from_address", plan)
+
+    def make_old_database(self) -> str:
+        """An events.db written before the promoted columns existed."""
+        old_db = os.path.join(self.temp_dir.name, "old.db")
+        conn = sqlite3.connect(old_db)
+        conn.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, block_number INTEGER, tx_hash TEXT, "
+            "tx_index INTEGER, log_index INTEGER, contract_name TEXT, event_name TEXT, log_round INTEGER, "
+            "round INTEGER, address TEXT, decoded_data TEXT, created_at TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO events(tx_hash, log_index, event_name, decoded_data) VALUES ('0x1', 0, 'Transfer', ?)",
+            (json.dumps({"src": "0xAbC", "dst": "0xDeF", "wad": 5}),),
+        )
+        conn.execute(
+            "INSERT INTO events(tx_hash, log_index, event_name, decoded_data) VALUES ('0x2', 0, 'Join', ?)",
+            (json.dumps({"account": "0xAAA", "actionId": 3, "tokenAddress": "0xBBB", "amount": 9}),),
+        )
+        conn.commit()
+        conn.close()
+        return old_db
+
+    def test_old_database_is_migrated_and_backfilled(self) -> None:
+        old_db = self.make_old_database()
+        with mock.patch.object(event_processor, "BACKFILL_BATCH_SIZE", 1):
+            event_processor.init_db(old_db)
+        conn = sqlite3.connect(old_db)
+        try:
+            rows = conn.execute(
+                "SELECT account, from_address, to_address, amount_raw, token_address, action_id FROM events ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(rows, [(None, "0xabc", "0xdef", "5", None, None), ("0xaaa", None, None, "9", "0xbbb", 3)])
+
+    def test_block_processor_init_migrates_old_database(self) -> None:
+        old_db = self.make_old_database()
+        block_processor.init_db(old_db)
+        conn = sqlite3.connect(old_db)
+        try:
+            self.assertEqual(conn.execute("SELECT account, action_id FROM events WHERE event_name = 'Join'").fetchall(), [("0xaaa", 3)])
+        finally:
+            conn.close()
+
+
+class SyncProgressTest(unittest.TestCase):
+    def make_contract(self, from_block: int) -> event_processor.ProcessContractConfig:
+        return event_processor.ProcessContractConfig(
+            name=TOKEN, address=TOKEN, abi_file="", from_block=from_block,
+            event_defs=event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0),
+        )
+
+    def test_out_of_order_ranges_fold_into_watermark(self) -> None:
+        progress = event_processor.SyncProgress([self.make_contract(10)], {})
+
+        updates = progress.complete([TOKEN], 20, 29)
+        self.assertEqual([(u.watermark, u.ahead) for u in updates], [(None, (20, 29))])
+
+        updates = progress.complete([TOKEN], 0, 19)
+        self.assertEqual([(u.watermark, u.ahead) for u in updates], [(29, None)])
+        self.assertEqual(updates[0].keys, {("token", "Transfer")})
+
+    def test_saved_ranges_restore_watermark_and_skip(self) -> None:
+        progress = event_processor.SyncProgress(
+            [self.make_contract(10)], {"token": [(10, 19), (30, 39), (40, 49)]}
+        )
+        self.assertEqual([u.watermark for u in progress.restored()], [19])
+        self.assertEqual(progress.covered_until(30), 49)
+        self.assertEqual(progress.covered_until(20), 19)
+        self.assertFalse(progress.needs(TOKEN, 35, 45))
+        self.assertTrue(progress.needs(TOKEN, 25, 35))
+
+
+class RangeSizerTest(unittest.TestCase):
+    def test_quiet_ranges_grow_additively(self) -> None:
+        sizer = event_processor.RangeSizer(4000, max_size=100000)
+        sizer.observe(4000, logs=10, nbytes=2000, latency=0.1)
+        self.assertEqual(sizer.next_size(), 8000)
+        sizer.observe(8000, logs=10, nbytes=2000, latency=0.1)
+        self.assertEqual(sizer.next_size(), 12000)
+
+    def test_dense_range_shrinks_to_target_density(self) -> None:
+        sizer = event_processor.RangeSizer(4000, target_logs=1000)
+        sizer.observe(4000, logs=8000, nbytes=0, latency=0.1)
+        self.assertEqual(sizer.next_size(), 500)
+
+    def test_growth_is_bounded_by_observed_density(self) -> None:
+        sizer = event_processor.RangeSizer(4000, target_logs=1000)
+        sizer.observe(4000, logs=400, nbytes=0, latency=0.1)
+        self.assertEqual(sizer.next_size(), 8000)
+        sizer.observe(8000, logs=600, nbytes=0, latency=0.1)
+        self.assertEqual(sizer.next_size(), 8000)
+
+    def test_block_range_rejection_sets_ceiling(self) -> None:
+        sizer = event_processor.RangeSizer(8000)
+        sizer.on_failure(8000, "RANGE_TOO_LARGE:block range too large")
+        self.assertEqual(sizer.ceiling, 4000)
+        for _ in range(5):
+            sizer.observe(4000, logs=0, nbytes=0, latency=0.01)
+        self.assertEqual(sizer.next_size(), 4000)
+
+    def test_result_limit_error_is_split(self) -> None:
+        self.assertTrue(event_processor.should_split_fetch_error("query returned more than 10000 results"))
+        self.assertFalse(event_processor.should_split_fetch_error("invalid params"))
+
+    def test_rate_limit_error_is_retried_not_split(self) -> None:
+        error_msg = event_processor.classify_rpc_error({"code": -32005, "message": "rate limit exceeded"})
+        self.assertEqual(error_msg, "rate limit exceeded")
+        self.assertFalse(event_processor.should_split_fetch_error(error_msg))
+
+
+class EventFilterTest(unittest.TestCase):
+    TOKEN_ABI = TRANSFER_ABI + [
+        {
+            "type": "event",
+            "name": "Approval",
+            "anonymous": False,
+            "inputs": [
+                {"name": "owner", "type": "address", "indexed": True},
+                {"name": "spender", "type": "address", "indexed": True},
+                {"name": "value", "type": "uint256", "indexed": False},
+            ],
+        }
+    ]
+
+    def event_names(self, contract_info: dict) -> set[str]:
+        event_defs = event_processor.get_all_event_defs(self.TOKEN_ABI, "token", 0)
+        return {ed.name for ed in event_processor.filter_event_defs(event_defs, contract_info).values()}
+
+    def test_include_and_exclude_lists(self) -> None:
+        self.assertEqual(self.event_names({}), {"Transfer", "Approval"})
+        self.assertEqual(self.event_names({"include_events": ["Transfer"]}), {"Transfer"})
+        self.assertEqual(self.event_names({"exclude_events": ["Transfer"]}), {"Approval"})
+        with self.assertRaises(ValueError):
+            self.event_names({"exclude_events": "Transfer"})
+
+    def test_get_logs_filter_sends_topic0_or_list(self) -> None:
+        log_filter = event_processor.build_get_logs_filter([TOKEN], 1, 2, [TRANSFER_TOPIC])
+        self.assertEqual(log_filter["topics"], [[TRANSFER_TOPIC]])
+        self.assertNotIn("topics", event_processor.build_get_logs_filter([TOKEN], 1, 2))
+
+
+class EventDecoderTest(unittest.TestCase):
+    ORDER_ABI = [
+        {
+            "type": "event",
+            "name": "Order",
+            "anonymous": False,
+            "inputs": [
+                {"name": "maker", "type": "address", "indexed": True},
+                {
+                    "name": "terms",
+                    "type": "tuple",
+                    "indexed": False,
+                    "components": [
+                        {"name": "amount", "type": "uint256"},
+                        {"name": "open", "type": "bool"},
+                    ],
+                },
+                {"name": "ids", "type": "uint256[]", "indexed": False},
+                {"name": "note", "type": "string", "indexed": False},
+            ],
+        }
+    ]
+
+    def decode(self, event_defs: dict, data: str) -> dict:
+        topic0 = next(iter(event_defs))
+        raw_log = {
+            "address": TOKEN, "topics": [topic0, address_topic(7)], "data": data,
+            "blockNumber": "0x5", "transactionIndex": "0x0", "logIndex": "0x1",
+        }
+        return event_processor.decode_event(raw_log, {event_processor.to_checksum_address(TOKEN): event_defs}).fields()
+
+    def test_tuple_array_and_string_fields(self) -> None:
+        event_defs = event_processor.get_all_event_defs(self.ORDER_ABI, "market", 0)
+        data = "0x" + encode(["(uint256,bool)", "uint256[]", "string"], [(5, True), [1, 2], "hi"]).hex()
+        decoded = self.decode(event_defs, data)
+        self.assertEqual(decoded["maker"], event_processor.to_checksum_address(address_topic(7)[-40:]))
+        self.assertEqual((decoded["terms.amount"], decoded["terms.open"]), (5, "true"))
+        self.assertEqual((decoded["ids"], decoded["note"]), ("[1;2]", "hi"))
+        # Undecodable data keeps the columns, empty data leaves them unset
+        self.assertEqual(self.decode(event_defs, "0x1234")["ids"], "")
+        self.assertIsNone(self.decode(event_defs, "0x")["terms.open"])
+
+    def test_static_fast_path_matches_eth_abi(self) -> None:
+        event_defs = event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0)
+        decoder = next(iter(event_defs.values())).decoder
+        self.assertIsNotNone(decoder.static_words)
+        self.assertIsNone(next(iter(event_processor.get_all_event_defs(self.ORDER_ABI, "m", 0).values())).decoder.static_words)
+        for data in ("0x" + f"{42:064x}", "0x" + f"{42:064x}" + "00" * 32, "0x" + "ff" * 32, "0x12", "0x123"):
+            self.assertEqual(decoder.decode_data(data), decoder.decode_abi_data(data))
+        # bool with a dirty padding byte is rejected like eth_abi's strict mode does
+        flags = next(iter(event_processor.get_all_event_defs([{
+            "type": "event", "name": "Flag", "inputs": [{"name": "on", "type": "bool", "indexed": False}],
+        }], "c", 0).values())).decoder
+        self.assertEqual(flags.decode_data("0x" + "00" * 31 + "02"), [None])
+        self.assertEqual(flags.decode_data("0x" + "00" * 31 + "01"), [True])
+
+    def test_checksum_cache_is_case_insensitive(self) -> None:
+        address = "0x52908400098527886e0f7030069857d2e4169ee7"
+        expected = event_processor.to_checksum_address(address)
+        event_processor._checksum_lowercase_address.cache_clear()
+        for variant in (address, address.upper().replace("0X", "0x"), expected):
+            self.assertEqual(event_processor.checksum_address(variant), expected)
+        self.assertEqual(event_processor._checksum_lowercase_address.cache_info().misses, 1)
+
+    def test_compiled_decoder_survives_pickling(self) -> None:
+        event_defs = event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0)
+        raw_log = make_transfer_log(9, value=42)
+        expected = event_processor.decode_event(raw_log, {event_processor.to_checksum_address(TOKEN): event_defs})
+        restored = pickle.loads(pickle.dumps(event_defs))
+        self.assertEqual(
+            event_processor.decode_event(raw_log, {event_processor.to_checksum_address(TOKEN): restored}), expected
+        )
+        self.assertEqual(expected.fields()["value"], 42)
+
+
+class ParallelDecodeTest(unittest.TestCase):
+    def test_worker_pool_matches_serial_decode(self) -> None:
+        addr_map = {event_processor.to_checksum_address(TOKEN): event_processor.get_all_event_defs(TRANSFER_ABI, "token", 0)}
+        raw_logs = [make_transfer_log(block, log_index=block % 3, value=block) for block in range(60)]
+        raw_logs[17]["topics"] = ["0x" + "ee" * 32]
+        raw_logs[44]["topics"] = ["0x" + "ef" * 32]
+        expected = event_processor.decode_raw_logs(raw_logs, addr_map, 0, 10)
+
+        async def run() -> tuple[list[dict], int, list[str]]:
+            with event_processor.open_decode_pool(2, addr_map) as pool:
+                return await event_processor.decode_raw_logs_parallel(pool, 2, raw_logs, 0, 10)
+
+        with mock.patch.object(event_processor, "DECODE_SHARD_MIN_LOGS", 10):
+            result = asyncio.run(run())
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result[1]), 2)
+
+
+class AbiRegistryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.abi_file = os.path.join(self.tmp.name, "Order.json")
+        with open(self.abi_file, "w") as f:
+            json.dump({"abi": EventDecoderTest.ORDER_ABI + TRANSFER_ABI}, f)
+        self.cache_file = os.path.join(self.tmp.name, "abi_cache.json")
+
+    def test_cached_tables_match_parsed_abi(self) -> None:
+        first = event_processor.AbiRegistry(self.cache_file)
+        parsed = first.event_defs(self.abi_file, "market", 3)
+        # A second contract sharing the ABI file does not parse it again
+        first.event_defs(self.abi_file, "other", 0)
+        self.assertEqual((first.parsed, first.cache_hits), (1, 0))
+        first.save()
+
+        second = event_processor.AbiRegistry(self.cache_file)
+        cached = second.event_defs(self.abi_file, "market", 3)
+        self.assertEqual((second.parsed, second.cache_hits), (0, 1))
+        self.assertEqual(cached, parsed)
+        self.assertEqual(
+            [d.decoder.fields for d in cached.values()], [d.decoder.fields for d in parsed.values()]
+        )
+        self.assertEqual(cached, event_processor.get_all_event_defs(event_processor.load_abi(self.abi_file), "market", 3))
+
+    def test_changed_or_corrupt_cache_is_reparsed(self) -> None:
+        registry = event_processor.AbiRegistry(self.cache_file)
+        registry.event_table(self.abi_file)
+        registry.save()
+
+        with open(self.abi_file, "w") as f:
+            json.dump({"abi": TRANSFER_ABI}, f)
+        stale = event_processor.AbiRegistry(self.cache_file)
+        self.assertEqual([name for _, name, _ in stale.event_table(self.abi_file)], ["Transfer"])
+        self.assertEqual(stale.parsed, 1)
+
+        with open(self.cache_file, "w") as f:
+            f.write("{not json")
+        self.assertEqual(len(event_processor.AbiRegistry(self.cache_file).event_table(self.abi_file)), 1)
+
+
+class BatchFetchTest(unittest.TestCase):
+    def test_item_error_splits_only_that_range(self) -> None:
+        chain_logs = {block: make_transfer_log(block) for block in range(0, 30)}
+        requested: list[list[tuple[int, int]]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            items = body if isinstance(body, list) else [body]
+            requested.append([
+                (int(item["params"][0]["fromBlock"], 16), int(item["params"][0]["toBlock"], 16))
+                for item in items
+            ])
+            replies = []
+            for item, (lo, hi) in zip(items, requested[-1]):
+                if lo <= 15 <= hi and hi - lo > 2:
+                    replies.append({"jsonrpc": "2.0", "id": item["id"],
+                                    "error": {"code": -32005, "message": "query returned more than 10000 results"}})
+                else:
+                    replies.append({"jsonrpc": "2.0", "id": item["id"],
+                                    "result": [chain_logs[b] for b in range(lo, hi + 1)]})
+            return httpx.Response(200, json=replies if isinstance(body, list) else replies[0])
+
+        async def run() -> list[dict]:
+            async with RpcPool(["http://rpc.invalid"], transport=httpx.MockTransport(handler)) as rpc:
+                return await event_processor.fetch_logs_batch_with_split(
+                    rpc, [TOKEN], [(0, 9), (10, 19), (20, 29)], 0,
+                    max_retries=1, batch_size=3,
+                )
+
+        logs = asyncio.run(run())
+
+        self.assertEqual([int(entry["blockNumber"], 16) for entry in logs], list(range(30)))
+        self.assertEqual(requested[0], [(0, 9), (10, 19), (20, 29)])
+        for batch in requested[1:]:
+            for lo, hi in batch:
+                self.assertTrue(10 <= lo and hi <= 19, (lo, hi))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+import rpc_client
+from rpc_client import (
+    AdaptiveLimiter,
+    RpcPool,
+    RpcRateLimited,
+    TokenBucket,
+    parse_retry_after,
+    parse_rpc_urls,
+    read_json,
+    retry_delay,
+)
+
+
+def json_rpc_reply(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"jsonrpc": "2.0", "id": 1, "result": request.url.host})
+
+
+class RpcPoolTest(unittest.TestCase):
+    def test_parse_rpc_urls_splits_and_dedupes(self) -> None:
+        self.assertEqual(parse_rpc_urls("http://a, http://b,http://a"), ["http://a", "http://b"])
+        self.assertEqual(parse_rpc_urls(["http://a", "http://b"]), ["http://a", "http://b"])
+        with self.assertRaises(ValueError):
+            parse_rpc_urls(" , ")
+
+    def test_failing_endpoint_is_drained(self) -> None:
+        hits = {"bad": 0, "good": 0}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hits[request.url.host] += 1
+            if request.url.host == "bad":
+                return httpx.Response(503)
+            return json_rpc_reply(request)
+
+        async def run() -> None:
+            async with RpcPool(["http://bad", "http://good"], transport=httpx.MockTransport(handler)) as rpc:
+                for _ in range(20):
+                    try:
+                        await rpc.post({"jsonrpc": "2.0", "method": "eth_blockNumber", "id": 1})
+                    except httpx.HTTPStatusError:
+                        pass
+
+        asyncio.run(run())
+        self.assertLessEqual(hits["bad"], 2)
+        self.assertGreaterEqual(hits["good"], 18)
+
+    def test_slow_request_is_hedged_to_second_endpoint(self) -> None:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "slow" and request.headers.get("x-stall"):
+                await asyncio.sleep(1.0)
+            return json_rpc_reply(request)
+
+        async def run() -> tuple[str, RpcPool]:
+            rpc = RpcPool(["http://slow", "http://fast"], hedge=True, transport=httpx.MockTransport(handler))
+            async with rpc:
+                # History says "slow" is the favourite with a p95 of 10ms
+                slow, fast = rpc.endpoints
+                for _ in range(30):
+                    slow.record_success(0.01)
+                    fast.record_success(0.02)
+                rpc.client.headers["x-stall"] = "1"
+                response = await rpc.post({"id": 1})
+                return response.json()["result"], rpc
+
+        winner, rpc = asyncio.run(run())
+        self.assertEqual(winner, "fast")
+        self.assertEqual((rpc.hedges, rpc.hedge_wins), (1, 1))
+
+    def test_cancelled_caller_stops_request_during_hedge_delay(self) -> None:
+        stopped = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            try:
+                await asyncio.sleep(1.0)
+            except asyncio.CancelledError:
+                stopped.append(request.url.host)
+                raise
+            return json_rpc_reply(request)
+
+        async def run() -> None:
+            async with RpcPool(["http://a", "http://b"], hedge=True, transport=httpx.MockTransport(handler)) as rpc:
+                for endpoint in rpc.endpoints:
+                    for _ in range(30):
+                        endpoint.record_success(0.5)
+                caller = asyncio.create_task(rpc.post({"id": 1}))
+                await asyncio.sleep(0.05)
+                caller.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await caller
+                self.assertEqual(stopped, ["a"])
+                self.assertEqual(rpc.hedges, 0)
+
+        asyncio.run(run())
+
+    def test_rate_limited_endpoint_is_parked_for_retry_after(self) -> None:
+        hits = {"busy": 0, "spare": 0}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hits[request.url.host] += 1
+            if request.url.host == "busy":
+                return httpx.Response(429, headers={"Retry-After": "30"})
+            return json_rpc_reply(request)
+
+        async def run() -> RpcRateLimited:
+            async with RpcPool(["http://busy", "http://spare"], transport=httpx.MockTransport(handler)) as rpc:
+                with self.assertRaises(RpcRateLimited) as caught:
+                    await rpc.post({"id": 1})
+                for _ in range(5):
+                    await rpc.post({"id": 1})
+                return caught.exception
+
+        error = asyncio.run(run())
+        self.assertEqual(error.retry_after, 30.0)
+        self.assertEqual(hits, {"busy": 1, "spare": 5})
+        self.assertGreaterEqual(retry_delay(0, error), 30.0)
+
+    def test_token_bucket_paces_requests(self) -> None:
+        async def run() -> float:
+            bucket = TokenBucket(rate=50, burst=1)
+            started = time.monotonic()
+            for _ in range(6):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        # One burst token, then five more at 20ms each
+        self.assertGreaterEqual(asyncio.run(run()), 0.09)
+
+    def test_retry_delay_is_jittered_and_capped(self) -> None:
+        delays = [retry_delay(3) for _ in range(50)]
+        self.assertTrue(all(0 <= d <= 1.6 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertLessEqual(retry_delay(30), 10.0)
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+class ReadJsonTest(unittest.TestCase):
+    def test_sliced_parse_matches_json_loads_and_yields(self) -> None:
+        log_item = {"address": "0xabc", "topics": ["0x01", "0x02"], "data": "0x" + "00" * 64, "removed": False}
+        documents = [
+            {"jsonrpc": "2.0", "id": 1, "result": [dict(log_item, logIndex=hex(i)) for i in range(300)]},
+            [
+                {"jsonrpc": "2.0", "id": i, "result": {"number": hex(i), "transactions": [log_item] * 20, "uncles": []}}
+                for i in range(30)
+            ] + [{"jsonrpc": "2.0", "id": 99, "error": {"code": -32000, "message": "h\u00e9 \"quoted\""}}],
+            {"a": [], "b": {}, "c": [1.5, -2e3, None, True, "\u4e2d"], "d": {"e": [[1, 2], {"f": None}]}},
+        ]
+
+        async def parse(body: bytes) -> tuple[object, int]:
+            ticks = 0
+
+            async def ticker() -> None:
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            try:
+                return await read_json(httpx.Response(200, content=body)), ticks
+            finally:
+                task.cancel()
+
+        with mock.patch.object(rpc_client, "JSON_STREAM_MIN_BYTES", 0), \
+                mock.patch.object(rpc_client, "JSON_SLICE_CHARS", 512):
+            for document in documents:
+                for body in (json.dumps(document), json.dumps(document, indent=2, ensure_ascii=False)):
+                    parsed, ticks = asyncio.run(parse(body.encode()))
+                    self.assertEqual(parsed, document)
+                    if len(body) > 4096:
+                        self.assertGreater(ticks, 2)
+            for bad in (b'{"a": [1, 2}', b'[1, 2] 3', b'{"a" 1}', b'[{"a": 1},]'):
+                with self.assertRaises(json.JSONDecodeError):
+                    asyncio.run(parse(bad))
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+    def test_limit_settles_where_latency_starts_to_climb(self) -> None:
+        state = {"inflight": 0, "peak": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            # Node serves 4 requests at once; beyond that, requests queue
+            state["inflight"] += 1
+            state["peak"] = max(state["peak"], state["inflight"])
+            try:
+                await asyncio.sleep(0.01 * max(1.0, state["inflight"] / 4))
+            finally:
+                state["inflight"] -= 1
+            return json_rpc_reply(request)
+
+        async def run() -> AdaptiveLimiter:
+            async with RpcPool(["http://node"], concurrency=64, transport=httpx.MockTransport(handler)) as rpc:
+                async def worker() -> None:
+                    for _ in range(10):
+                        await rpc.post({"id": 1})
+
+                await asyncio.gather(*(worker() for _ in range(64)))
+                return rpc.limiter
+
+        limiter = asyncio.run(run())
+        self.assertLess(limiter.current, 32)
+        self.assertLess(state["peak"], 32)
+
+    def test_burst_of_failures_is_one_decrease(self) -> None:
+        async def run() -> AdaptiveLimiter:
+            limiter = AdaptiveLimiter(16, initial=16)
+            tokens = [await limiter.acquire() for _ in range(8)]
+            for token in tokens:
+                limiter.release(token, dropped=True)
+            return limiter
+
+        limiter = asyncio.run(run())
+        self.assertEqual(limiter.current, 12)
+        self.assertEqual(limiter.drops, 1)
+
+    def test_waiters_wake_when_slots_free(self) -> None:
+        async def run() -> int:
+            limiter = AdaptiveLimiter(2, initial=2)
+            peak = 0
+
+            async def job() -> None:
+                nonlocal peak
+                token = await limiter.acquire()
+                peak = max(peak, limiter.inflight)
+                await asyncio.sleep(0.001)
+                limiter.release(token, sample=False)
+
+            await asyncio.wait_for(asyncio.gather(*(job() for _ in range(10))), timeout=5)
+            return peak
+
+        self.assertEqual(asyncio.run(run()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import database
+import event_processor
+import topic_index
+from test_event_processor import TOKEN, TRANSFER_ABI, TRANSFER_TOPIC, address_topic, make_transfer_log
+
+NFT_TRANSFER_ABI = [
+    {
+        "type": "event",
+        "name": "Transfer",
+        "anonymous": False,
+        "inputs": [
+            {"name": "from", "type": "address", "indexed": True},
+            {"name": "to", "type": "address", "indexed": True},
+            {"name": "tokenId", "type": "uint256", "indexed": True},
+        ],
+    }
+]
+
+
+class TopicIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(database.close_writers)
+        self.abi_dir = os.path.join(self.temp_dir.name, "abi")
+        for name, abi in (("IERC20", TRANSFER_ABI), ("IToken", TRANSFER_ABI), ("IERC721", NFT_TRANSFER_ABI)):
+            os.makedirs(os.path.join(self.abi_dir, f"{name}.sol"))
+            with open(os.path.join(self.abi_dir, f"{name}.sol", f"{name}.json"), "w") as f:
+                json.dump({"abi": abi}, f)
+        self.index_file = os.path.join(self.temp_dir.name, "topic_index.json")
+
+    def test_layouts_are_deduplicated_and_picked_by_topic_count(self) -> None:
+        index = topic_index.TopicIndex.build(self.abi_dir)
+        self.assertEqual(len(index.events[TRANSFER_TOPIC]), 2)
+        self.assertEqual(index.sources[(TRANSFER_TOPIC, 0)], ["IERC20", "IToken"])
+        self.assertEqual(topic_index.signature_topic("Transfer(address, address, uint256)"), TRANSFER_TOPIC)
+
+        erc20 = index.decode(make_transfer_log(3, value=42))
+        self.assertEqual((erc20.contract_name, erc20.fields()["value"]), ("IERC20", 42))
+        nft_log = make_transfer_log(3)
+        nft_log["topics"] = nft_log["topics"] + [address_topic(9)]
+        nft_log["data"] = "0x"
+        nft = index.decode(nft_log)
+        self.assertEqual((nft.contract_name, nft.fields()["tokenId"]), ("IERC721", 9))
+
+    def test_persisted_index_is_reused_until_an_abi_changes(self) -> None:
+        built = topic_index.load_topic_index(self.index_file, self.abi_dir)
+        with open(self.index_file) as f:
+            loaded = topic_index.TopicIndex.from_json(json.load(f))
+        self.assertTrue(loaded.is_current(self.abi_dir))
+        self.assertEqual(loaded.events, built.events)
+        self.assertEqual(loaded.sources, built.sources)
+
+        with open(os.path.join(self.abi_dir, "IERC721.sol", "IERC721.json"), "w") as f:
+            json.dump({"abi": []}, f)
+        self.assertFalse(loaded.is_current(self.abi_dir))
+        refreshed = topic_index.load_topic_index(self.index_file, self.abi_dir)
+        self.assertEqual(len(refreshed.events[TRANSFER_TOPIC]), 1)
+
+    def test_receipt_logs_of_configured_contracts_are_skipped(self) -> None:
+        index = topic_index.TopicIndex.build(self.abi_dir)
+        other = make_transfer_log(5, log_index=1)
+        other["address"] = "0x2222222222222222222222222222222222222222"
+        unknown = make_transfer_log(5, log_index=2)
+        unknown["address"] = other["address"]
+        unknown["topics"] = ["0x" + "ee" * 32]
+        receipts = {"0xaa": {"logs": [make_transfer_log(5), other, unknown]}, "0xbb": None}
+        decoded, undecoded = topic_index.decode_receipt_logs(receipts, index, {TOKEN.lower()})
+        self.assertEqual([e.log_index for e in decoded], [1])
+        self.assertEqual(undecoded, 1)
+
+        db_path = os.path.join(self.temp_dir.name, "events.db")
+        event_processor.init_db(db_path)
+        with sqlite3.connect(db_path) as conn:
+            self.assertEqual(event_processor.insert_events(conn, decoded, table="receipt_events"), 1)
+            row = conn.execute("SELECT contract_name, event_name FROM receipt_events").fetchone()
+        self.assertEqual(row, ("IERC20", "Transfer"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Global topic0 index over the abi/ tree.
+
+Walks every ABI JSON under abi/ once and maps each event topic0 to its decoded
+EventDef, deduplicated across ABIs (interfaces, implementations and *Events files
+repeat the same events). Logs from emitters that are not in contracts.json can then
+be decoded with one dict lookup instead of loading ABI files per contract.
+
+Some topic0s have several indexed layouts (ERC20 and ERC721 Transfer share a
+signature); the variant is picked by the number of topics in the log.
+
+The index is persisted as JSON together with the mtime and size of every ABI file
+it was built from, and rebuilt when any of them changes. block_processor keeps it
+next to the database (see --receipt-events).
+
+    python topic_index.py --index db/<network>/topic_index.json   # build/refresh and summarize
+    python topic_index.py 0xddf252ad...                            # look up topic0s
+    python topic_index.py --signature "Transfer(address,address,uint256)"
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict
+
+from eth_utils import keccak
+
+from event_processor import (
+    AbiRegistry,
+    EventDef,
+    EventParam,
+    EventRecord,
+    log,
+    resolve_abi_path,
+)
+
+# Relative to this script's directory, like the abi_files of contracts.json
+DEFAULT_ABI_DIR = "../../abi"
+INDEX_FILE_NAME = "topic_index.json"
+
+# Bump when the index file layout changes
+TOPIC_INDEX_VERSION = 1
+
+
+def canonical_type(param_type: str, components: list | None) -> str:
+    """Solidity type as it appears in an event signature (tuples expanded)."""
+    if param_type.startswith("tuple"):
+        inner = ",".join(canonical_type(c.get("type", ""), c.get("components")) for c in components or [])
+        return f"({inner}){param_type[len('tuple'):]}"
+    return param_type
+
+
+def event_signature(name: str, params: list[EventParam]) -> str:
+    return f"{name}({','.join(canonical_type(p.type, p.components) for p in params)})"
+
+
+def signature_topic(signature: str) -> str:
+    return "0x" + keccak(text=signature.replace(" ", "")).hex()
+
+
+def abi_files_under(abi_dir: str) -> list[str]:
+    """Every ABI JSON under abi_dir, in a stable order."""
+    files = []
+    for root, dirs, names in os.walk(abi_dir):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".json"))
+    return files
+
+
+def fingerprint(files: list[str]) -> dict[str, list[int]]:
+    result = {}
+    for path in files:
+        stat = os.stat(path)
+        result[path] = [stat.st_mtime_ns, stat.st_size]
+    return result
+
+
+class TopicIndex:
+    """topic0 -> EventDef variants, one per distinct indexed layout"""
+
+    def __init__(self):
+        self.events: dict[str, list[EventDef]] = {}
+        self.sources: dict[tuple[str, int], list[str]] = {}
+        self.fingerprint: dict[str, list[int]] = {}
+
+    def add(self, topic0: str, name: str, params: list[EventParam], source: str) -> bool:
+        """Add one ABI event; returns False when an equal variant is already indexed."""
+        layout = tuple(p.indexed for p in params)
+        variants = self.events.setdefault(topic0, [])
+        for i, existing in enumerate(variants):
+            if tuple(p.indexed for p in existing.params) == layout:
+                if source not in self.sources[(topic0, i)]:
+                    self.sources[(topic0, i)].append(source)
+                return False
+        self.sources[(topic0, len(variants))] = [source]
+        variants.append(EventDef(name=name, params=params, topic0=topic0, contract_name=source, start_block=0))
+        return True
+
+    @classmethod
+    def build(cls, abi_dir: str, registry: AbiRegistry | None = None) -> "TopicIndex":
+        registry = registry or AbiRegistry()
+        index = cls()
+        files = abi_files_under(abi_dir)
+        for path in files:
+            source = os.path.splitext(os.path.basename(path))[0]
+            for topic0, name, params in registry.event_table(path):
+                index.add(topic0, name, params, source)
+        index.fingerprint = fingerprint(files)
+        return index
+
+    def lookup(self, topic0: str, topic_count: int | None = None) -> EventDef | None:
+        """The variant of topic0 whose indexed params fill topic_count topics (any variant if None)."""
+        variants = self.events.get(topic0)
+        if not variants:
+            return None
+        if topic_count is None:
+            return variants[0]
+        for event_def in variants:
+            if sum(1 for p in event_def.params if p.indexed) + 1 == topic_count:
+                return event_def
+        return None
+
+    def decode(self, raw_log: dict) -> EventRecord | None:
+        """Decode a raw RPC log from any emitter; None for unknown topics."""
+        topics = raw_log.get("topics") or []
+        if not topics:
+            return None
+        event_def = self.lookup(topics[0], len(topics))
+        return event_def.decoder.decode(raw_log) if event_def else None
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def to_json(self) -> dict:
+        return {
+            "version": TOPIC_INDEX_VERSION,
+            "abi_files": self.fingerprint,
+            "events": {
+                topic0: [
+                    {
+                        "name": ed.name,
+                        "signature": event_signature(ed.name, ed.params),
+                        "sources": self.sources[(topic0, i)],
+                        "params": [asdict(p) for p in ed.params],
+                    }
+                    for i, ed in enumerate(variants)
+                ]
+                for topic0, variants in self.events.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "TopicIndex":
+        if data.get("version") != TOPIC_INDEX_VERSION:
+            raise ValueError(f"unsupported topic index version {data.get('version')}")
+        index = cls()
+        for topic0, variants in data["events"].items():
+            for variant in variants:
+                params = [EventParam(**p) for p in variant["params"]]
+                for source in variant["sources"]:
+                    index.add(topic0, variant["name"], params, source)
+        index.fingerprint = data.get("abi_files", {})
+        return index
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_json(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    def is_current(self, abi_dir: str) -> bool:
+        try:
+            return fingerprint(abi_files_under(abi_dir)) == self.fingerprint
+        except OSError:
+            return False
+
+
+def load_topic_index(
+    index_file: str | None,
+    abi_dir: str = DEFAULT_ABI_DIR,
+    registry: AbiRegistry | None = None,
+) -> TopicIndex:
+    """The persisted index if it still matches abi_dir, otherwise a rebuilt (and re-saved) one."""
+    abi_dir = resolve_abi_path(abi_dir)
+    if index_file and os.path.exists(index_file):
+        try:
+            with open(index_file, "r") as f:
+                index = TopicIndex.from_json(json.load(f))
+            if index.is_current(abi_dir):
+                return index
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log(f"⚠️  Rebuilding topic index {index_file}: {e}")
+    index = TopicIndex.build(abi_dir, registry)
+    if index_file:
+        try:
+            index.save(index_file)
+        except OSError as e:
+            log(f"⚠️  Could not write topic index {index_file}: {e}")
+    return index
+
+
+def decode_receipt_logs(
+    receipts: dict[str, dict | None],
+    index: TopicIndex,
+    skip_addresses: set[str] = frozenset(),
+) -> tuple[list[EventRecord], int]:
+    """
+    Decode the logs of transaction receipts with the index, skipping emitters in
+    skip_addresses (lowercase; the configured contracts event_processor already stores).
+    Returns (decoded_events, undecoded_count).
+    """
+    decoded_events = []
+    undecoded = 0
+    for receipt in receipts.values():
+        for raw_log in (receipt or {}).get("logs") or []:
+            if (raw_log.get("address") or "").lower() in skip_addresses:
+                continue
+            decoded = index.decode(raw_log)
+            if decoded:
+                decoded_events.append(decoded)
+            else:
+                undecoded += 1
+    return decoded_events, undecoded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the topic0 index of every ABI under abi/")
+    parser.add_argument("topics", nargs="*", help="topic0 hashes to look up")
+    parser.add_argument("--abi-dir", default=DEFAULT_ABI_DIR, help="ABI directory (relative paths are resolved from this script)")
+    parser.add_argument("--index", help="Index file to refresh and read (default: build in memory)")
+    parser.add_argument("--signature", "-s", action="append", default=[],
+                        help="Event signature to hash, e.g. 'Transfer(address,address,uint256)'")
+    args = parser.parse_args()
+
+    index = load_topic_index(args.index, args.abi_dir)
+    variants = sum(len(v) for v in index.events.values())
+    log(f"📚 {len(index.fingerprint)} ABI files, {len(index):,} topic0s, {variants:,} event layouts")
+
+    for signature in args.signature:
+        topic0 = signature_topic(signature)
+        print(f"{topic0}  {signature}")
+        args.topics.append(topic0)
+
+    missing = 0
+    for topic0 in args.topics:
+        topic0 = topic0.lower()
+        variants = index.events.get(topic0)
+        if not variants:
+            print(f"{topic0}  (unknown)")
+            missing += 1
+            continue
+        for i, ed in enumerate(variants):
+            indexed = sum(1 for p in ed.params if p.indexed)
+            sources = ", ".join(index.sources[(topic0, i)])
+            print(f"{topic0}  {event_signature(ed.name, ed.params)}  [{indexed} indexed]  {sources}")
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()